@@ -5,8 +5,8 @@ a = Analysis(
     ['gui_main.py'],
     pathex=[],
     binaries=[],
-    datas=[('.env', '.'), ('requirements.txt', '.')],
-    hiddenimports=['dotenv', 'tkinter', 'core', 'i18n'],
+    datas=[('.env', '.'), ('requirements.txt', '.'), ('data/draft_classes.bin', 'data')],
+    hiddenimports=['dotenv', 'tkinter', 'core', 'i18n', 'storage', 'league', 'profiling', 'gui_history', 'gui_heatmap', 'gui_search', 'gui_calendar', 'draftclasses', 'export', 'hooks'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
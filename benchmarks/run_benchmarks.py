@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the core operations.
+
+    python benchmarks/run_benchmarks.py                    # run, compare with baseline.json
+    python benchmarks/run_benchmarks.py --update-baseline  # record a new baseline
+    python benchmarks/run_benchmarks.py --max-regression 0.2 --output result.json
+
+Each benchmark reports ops/sec, latency percentiles and peak traced memory as
+JSON. The run exits with status 1 when any benchmark's ops/sec falls more than
+--max-regression below the stored baseline. Baselines are machine-specific and
+are not committed: baseline.json records the machine it was measured on, and
+the comparison is skipped (with a note on stderr) when run anywhere else.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Isolated data dir, set before core is imported (core binds its file paths at import time)
+DATA_DIR = tempfile.mkdtemp(prefix="draft_picker_bench_")
+os.environ['DRAFT_PICKER_DATA_DIR'] = DATA_DIR
+atexit.register(shutil.rmtree, DATA_DIR, True)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core  # noqa: E402
+from core import (  # noqa: E402
+    save_current_year, load_draft_weights, save_draft_weights, reset_weights,
+    load_draft_history, append_draft_history, perform_draft, clear_read_cache,
+    PseudoRandomPicker, FenwickSampler, NBA_TEAMS, CURRENT_YEAR_FILE, DRAFT_WEIGHTS_FILE, DRAFT_HISTORY_FILE,
+    STATE_VERSION_FILE, LOSS_LEDGER_FILE, DRAFT_REDO_FILE, DRAFT_CALENDAR_FILE, RESET_LOG_FILE,
+)
+from i18n import t, set_language  # noqa: E402
+from simulation import LeagueState, simulate  # noqa: E402
+
+os.environ.pop('SIMULATION_START_YEAR', None)
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+HISTORY_SIZES = (100, 1000, 10000)
+
+
+def _clean_state():
+    for path in (CURRENT_YEAR_FILE, DRAFT_WEIGHTS_FILE, DRAFT_HISTORY_FILE, STATE_VERSION_FILE,
+                 LOSS_LEDGER_FILE, DRAFT_REDO_FILE, DRAFT_CALENDAR_FILE, RESET_LOG_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    clear_read_cache()
+
+
+def _write_history(size):
+    players = [(NBA_TEAMS[i], "PG") for i in range(core.NUM_PLAYERS_TO_LOSE)]
+    lines = [json.dumps({'sim_year': 2026 + i, 'drafted_year': 1980 + i % 46,
+                         'players': [list(p) for p in players]}, ensure_ascii=False)
+             for i in range(size)]
+    with open(DRAFT_HISTORY_FILE, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    clear_read_cache()
+
+
+# --- Benchmarks: each returns (setup, op) ---
+def bench_full_draft():
+    def setup():
+        _clean_state()
+        save_current_year(2026)
+    return setup, perform_draft
+
+
+def bench_load_draft_weights():
+    def setup():
+        _clean_state()
+        save_current_year(2026)
+        reset_weights()
+    return setup, load_draft_weights
+
+
+def bench_load_draft_weights_cold():
+    def op():
+        clear_read_cache()
+        load_draft_weights()
+    return bench_load_draft_weights()[0], op
+
+
+def bench_save_draft_weights():
+    weights = {}
+
+    def setup():
+        _clean_state()
+        save_current_year(2026)
+        weights.update(reset_weights())
+    return setup, lambda: save_draft_weights(weights)
+
+
+def make_bench_load_history(size):
+    def bench():
+        def op():
+            clear_read_cache()
+            load_draft_history()
+        return lambda: _write_history(size), op
+    return bench
+
+
+def make_bench_append_history(size):
+    def bench():
+        players = [(team, "C") for team in NBA_TEAMS[:core.NUM_PLAYERS_TO_LOSE]]
+        return lambda: _write_history(size), lambda: append_draft_history(2026, 1990, players)
+    return bench
+
+
+def bench_picker_throughput():
+    picker = PseudoRandomPicker(NBA_TEAMS)
+
+    def op():
+        for _ in range(1000):
+            picker.pick()
+    return None, op
+
+
+def bench_fenwick_sampler():
+    import random
+    rng = random.Random(0)
+    sampler = FenwickSampler([1.0] * 1000)
+
+    def op():
+        for _ in range(1000):
+            i = sampler.sample(rng)
+            sampler.update(i, rng.random())
+    return None, op
+
+
+def make_bench_simulate(selection):
+    def bench():
+        def op():
+            for _ in simulate(1000, seed=1, state=LeagueState(2026, selection=selection)):
+                pass
+        return None, op
+    return bench
+
+
+def bench_t_rendering():
+    def setup():
+        set_language("en")
+
+    def op():
+        teams = t('teams')
+        positions = t('positions')
+        for i, team in enumerate(NBA_TEAMS[:core.NUM_PLAYERS_TO_LOSE]):
+            t('player_line', index=i + 1, team=teams[team], position=positions["PG"], team_en=team)
+    return setup, op
+
+
+def bench_multi_season():
+    def op():
+        _clean_state()
+        save_current_year(2026)
+        for _ in range(50):
+            perform_draft()
+    return None, op
+
+
+def bench_plan_calendar_spread():
+    def setup():
+        _clean_state()
+        save_current_year(2026)
+    return setup, lambda: core.plan_draft_calendar(200, seed=1, strategy=core.CALENDAR_SPREAD)
+
+
+BENCHMARKS = {
+    "full_draft": (bench_full_draft, 200),
+    "load_draft_weights": (bench_load_draft_weights, 2000),
+    "load_draft_weights_cold": (bench_load_draft_weights_cold, 500),
+    "save_draft_weights": (bench_save_draft_weights, 500),
+    "picker_1000_picks": (bench_picker_throughput, 500),
+    "t_render_draft_result": (bench_t_rendering, 2000),
+    "multi_season_50": (bench_multi_season, 10),
+    "fenwick_1000_sample_update": (bench_fenwick_sampler, 200),
+    "simulate_1000_uniform": (make_bench_simulate(core.SELECTION_UNIFORM), 20),
+    "simulate_1000_weighted": (make_bench_simulate(core.SELECTION_WEIGHTED), 20),
+    "plan_calendar_spread_200": (bench_plan_calendar_spread, 20),
+}
+for _size in HISTORY_SIZES:
+    BENCHMARKS[f"load_draft_history_{_size}"] = (make_bench_load_history(_size), max(5, 20000 // _size))
+    BENCHMARKS[f"append_draft_history_{_size}"] = (make_bench_append_history(_size), 200)
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmark(factory, iterations):
+    setup, op = factory()
+    if setup:
+        setup()
+    op()  # warm-up
+
+    latencies = []
+    total_start = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        op()
+        latencies.append(time.perf_counter() - start)
+    total = time.perf_counter() - total_start
+
+    # Memory is measured in a separate pass so tracing overhead doesn't skew timings
+    setup, op = factory()
+    if setup:
+        setup()
+    tracemalloc.start()
+    for _ in range(min(iterations, 20)):
+        op()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / total if total else float("inf"),
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "peak_memory_bytes": peak,
+    }
+
+
+def machine_fingerprint():
+    """What a baseline's timings depend on; baselines from another machine are not compared."""
+    return {
+        "node": platform.node(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+    }
+
+
+def load_baseline(path):
+    """(machine fingerprint or None, {name: result}) from a baseline file; empty when missing."""
+    if not os.path.exists(path):
+        return None, {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if "results" not in data:
+        return None, data    # older baselines without a fingerprint
+    return data.get("machine"), data["results"]
+
+
+def compare(results, baseline, max_regression):
+    """Return a list of human-readable regression messages."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        floor = base["ops_per_sec"] * (1 - max_regression)
+        if result["ops_per_sec"] < floor:
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:.1f} ops/s < {floor:.1f} "
+                f"(baseline {base['ops_per_sec']:.1f}, allowed -{max_regression:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark 2K Draft Picker core operations.")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--max-regression", type=float, default=0.30,
+                        help="allowed ops/sec drop as a fraction of baseline (default 0.30)")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply iteration counts (e.g. 0.1 for a quick run)")
+    parser.add_argument("--only", nargs="*", help="run only these benchmarks")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, (factory, iterations) in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = run_benchmark(factory, max(1, int(iterations * args.scale)))
+        print(f"{name:<28} {results[name]['ops_per_sec']:>12.1f} ops/s  "
+              f"p95 {results[name]['p95_ms']:.3f} ms", file=sys.stderr)
+
+    machine = machine_fingerprint()
+    baseline_machine, baseline = load_baseline(args.baseline)
+    same_machine = baseline_machine == machine
+    skipped = None
+    if args.update_baseline:
+        if not same_machine:
+            baseline = {}
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({"machine": machine, "results": baseline}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        regressions = []
+    elif baseline and not same_machine:
+        skipped = f"baseline {args.baseline} was recorded on another machine; run with --update-baseline here"
+        regressions = []
+    else:
+        regressions = compare(results, baseline, args.max_regression)
+
+    report = {"results": results, "max_regression": args.max_regression, "regressions": regressions,
+              "machine": machine, "baseline_skipped": skipped}
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if skipped:
+        print(f"NOTE {skipped}", file=sys.stderr)
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
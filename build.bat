@@ -98,10 +98,21 @@ echo.
     !ICON_OPTION! ^
     --add-data ".env;." ^
     --add-data "requirements.txt;." ^
+    --add-data "data\draft_classes.bin;data" ^
     --hidden-import=dotenv ^
     --hidden-import=tkinter ^
     --hidden-import=core ^
     --hidden-import=i18n ^
+    --hidden-import=storage ^
+    --hidden-import=league ^
+    --hidden-import=profiling ^
+    --hidden-import=gui_history ^
+    --hidden-import=gui_heatmap ^
+    --hidden-import=gui_search ^
+    --hidden-import=gui_calendar ^
+    --hidden-import=export ^
+    --hidden-import=hooks ^
+    --hidden-import=draftclasses ^
     gui_main.py
 
 if !errorlevel! neq 0 (
@@ -3,12 +3,21 @@ Shared core logic for 2K Draft Picker.
 Both main.py (CLI) and gui_main.py (GUI) import from this module.
 """
 
+import bisect
+import heapq
+import math
 import random
 import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+import hooks
+import profiling
+from profiling import instrument
+from storage import FileStorage
+from league import load_league
+
 
 def get_app_data_dir() -> Path:
     override = os.environ.get("DRAFT_PICKER_DATA_DIR")
@@ -26,34 +35,90 @@ load_dotenv(DATA_DIR / ".env")
 load_dotenv()
 
 # --- Constants ---
-CURRENT_YEAR_FILE = str(DATA_DIR / "current_year.json")
-DRAFT_WEIGHTS_FILE = str(DATA_DIR / "draft_weights.json")
+# State entry names inside the storage backend; the *_FILE paths are their
+# locations under DATA_DIR for the default FileStorage.
+CURRENT_YEAR_NAME = "current_year.json"
+DRAFT_WEIGHTS_NAME = "draft_weights.json"
+DRAFT_HISTORY_NAME = "draft_history.jsonl"
+STATE_VERSION_NAME = "state_version.json"
+DRAFT_REDO_NAME = "draft_redo.jsonl"
+TEAM_LOTTERY_NAME = "team_lottery.json"
+LOSS_LEDGER_NAME = "loss_ledger.json"
+LEAGUES_NAME = "leagues.json"
+DRAFT_CALENDAR_NAME = "draft_calendar.json"
+RESET_LOG_NAME = "reset_log.jsonl"
+CURRENT_YEAR_FILE = str(DATA_DIR / CURRENT_YEAR_NAME)
+DRAFT_WEIGHTS_FILE = str(DATA_DIR / DRAFT_WEIGHTS_NAME)
+DRAFT_HISTORY_FILE = str(DATA_DIR / DRAFT_HISTORY_NAME)
+STATE_VERSION_FILE = str(DATA_DIR / STATE_VERSION_NAME)
+DRAFT_REDO_FILE = str(DATA_DIR / DRAFT_REDO_NAME)
+TEAM_LOTTERY_FILE = str(DATA_DIR / TEAM_LOTTERY_NAME)
+LOSS_LEDGER_FILE = str(DATA_DIR / LOSS_LEDGER_NAME)
+LEAGUES_FILE = str(DATA_DIR / LEAGUES_NAME)
+DRAFT_CALENDAR_FILE = str(DATA_DIR / DRAFT_CALENDAR_NAME)
+RESET_LOG_FILE = str(DATA_DIR / RESET_LOG_NAME)
 INITIAL_SIMULATION_YEAR = 2026
-EARLIEST_DRAFT_YEAR = 1980
-LATEST_HISTORICAL_DRAFT_YEAR = 2025
-COOL_DOWN_PERIOD = 20
-NUM_PLAYERS_TO_LOSE = 8
 
-# Internal IDs — display names are in i18n.py
-NBA_TEAMS = [
-    "Lakers", "Celtics", "Warriors", "Nets", "76ers", "Bucks", "Suns", "Clippers", "Nuggets", "Heat",
-    "Mavericks", "Jazz", "Knicks", "Bulls", "Hawks", "Raptors", "Wizards", "Pacers", "Hornets", "Cavaliers",
-    "Pistons", "Magic", "Thunder", "Kings", "Timberwolves", "Pelicans", "Spurs", "Rockets", "Grizzlies", "Trail Blazers"
-]
-POSITIONS = ["PG", "SG", "SF", "PF", "C"]
+# League profile — DRAFT_PICKER_LEAGUE 选择（默认 NBA），可在 leagues.json 中自定义，见 league.py.
+# 下面的常量都取自当前联盟，派生的索引表、年份集合等由 LEAGUE 缓存，每届选秀直接复用。
+# 配置有误的联盟被跳过、选中的联盟不可用时退回 NBA，问题记在 LEAGUE_PROBLEMS 中由 CLI/GUI 提示。
+LEAGUE, LEAGUE_PROBLEMS = load_league(os.environ.get("DRAFT_PICKER_LEAGUE"), LEAGUES_FILE)
+EARLIEST_DRAFT_YEAR = LEAGUE.earliest_year
+LATEST_HISTORICAL_DRAFT_YEAR = LEAGUE.latest_year
+COOL_DOWN_PERIOD = LEAGUE.cooldown
+NUM_PLAYERS_TO_LOSE = LEAGUE.players_to_lose
+
+# Internal IDs — display names are in i18n.py (or in the league profile)
+NBA_TEAMS = list(LEAGUE.teams)
+POSITIONS = list(LEAGUE.positions)
+
+# Year status — the rules behind load_draft_weights()
+YEAR_AVAILABLE = "available"
+YEAR_IN_WINDOW = "window"
+YEAR_COOLING = "cooling"
+YEAR_USED = "used"
+
+# Year selection modes — DRAFT_PICKER_SELECTION 环境变量选择，默认 uniform
+SELECTION_UNIFORM = "uniform"      # 所有可用年份等概率（原有行为）
+SELECTION_WEIGHTED = "weighted"    # 按 year_weight() 加权
+SELECTION_MODES = (SELECTION_UNIFORM, SELECTION_WEIGHTED)
+
+# Draft calendar strategies
+CALENDAR_RANDOM = "random"         # 每届按选秀模式随机（与不使用日程时相同）
+CALENDAR_SPREAD = "spread"         # 优先选未使用时间最长的年份，尽量均匀地用到每一届
+CALENDAR_STRATEGIES = (CALENDAR_RANDOM, CALENDAR_SPREAD)
+LEGENDARY_DRAFT_CLASSES = LEAGUE.legendary_classes
+LEGENDARY_BOOST = 2.0
+OLD_CLASS_BONUS = 1.0              # 最早一届的权重是最近一届的 1 + OLD_CLASS_BONUS 倍
+RECOVERY_SEASONS = 10              # 冷却结束后权重在这么多个赛季内逐步恢复
+
+# Team lottery — team_lottery.json 中未给出的项使用这些默认值
+DEFAULT_TEAM_LOTTERY = {
+    'enabled': False,
+    'recent_seasons': 5,           # 统计最近几届的失去球员数
+    'recent_loss_penalty': 0.5,    # 每失去一名球员，权重除以 (1 + penalty)
+    'standings': {},               # 球队 -> 排名（1 为最好）
+    'standings_weight': 1.0,       # 排名第一的球队权重为 1 + standings_weight，最后一名为 1
+    'payroll_tiers': {},           # 球队 -> 工资档位
+    'payroll_factors': {'high': 1.5, 'mid': 1.0, 'low': 0.75},
+    'position_constraints': {},    # 球队 -> 允许失去的位置列表
+    'balance': False,              # 为 True 时按 loss_ledger.json 优先选择历史上失去球员最少的球队
+}
 
 
 # --- Helper Classes ---
 class PseudoRandomPicker:
-    def __init__(self, items):
+    def __init__(self, items, rng=None):
         self.original_items = list(items)
+        self.rng = rng or random
         self.items = []
         self.shuffle()
         self.index = 0
 
+    @instrument("PseudoRandomPicker.shuffle")
     def shuffle(self):
         self.items = list(self.original_items)
-        random.shuffle(self.items)
+        self.rng.shuffle(self.items)
         self.index = 0
 
     def pick(self):
@@ -63,14 +128,550 @@ class PseudoRandomPicker:
         self.index += 1
         return item
 
+    def pick_from(self, allowed):
+        """从当前这一轮剩下的项中取第一个属于 allowed 的；这一轮没有时重新洗牌。"""
+        for _ in range(2):
+            for i in range(self.index, len(self.items)):
+                if self.items[i] in allowed:
+                    self.items[self.index], self.items[i] = self.items[i], self.items[self.index]
+                    return self.pick()
+            self.shuffle()
+        raise ValueError(f"none of {sorted(allowed)} can be picked")
+
+
+class FenwickSampler:
+    """
+    按权重抽取下标的 Fenwick 树：抽样和修改单个权重都是 O(log n).
+    权重为 0 的项不会被抽中；多次修改后定期重建，避免浮点误差累积。
+    """
+
+    def __init__(self, weights):
+        self._weights = [float(w) for w in weights]
+        self._rebuild()
+
+    def __len__(self):
+        return len(self._weights)
+
+    def _rebuild(self):
+        n = len(self._weights)
+        tree = [0.0] * (n + 1)
+        for i, w in enumerate(self._weights, 1):
+            tree[i] += w
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._updates = 0
+        self._top = 1 << (n.bit_length() - 1) if n else 0
+        self.nonzero = sum(1 for w in self._weights if w > 0)
+
+    def weight(self, index):
+        return self._weights[index]
+
+    def total(self):
+        tree = self._tree
+        i = len(self._weights)
+        result = 0.0
+        while i > 0:
+            result += tree[i]
+            i -= i & -i
+        return result
+
+    def update(self, index, weight):
+        old = self._weights[index]
+        if weight == old:
+            return
+        self.nonzero += (weight > 0) - (old > 0)
+        self._weights[index] = weight
+        n = len(self._weights)
+        self._updates += 1
+        if self._updates > max(64, 8 * n):
+            self._rebuild()
+            return
+        delta = weight - old
+        tree = self._tree
+        i = index + 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def sample(self, rng=None):
+        if not self.nonzero:
+            raise ValueError("no item has a positive weight")
+        u = (rng or random).random() * self.total()
+        tree = self._tree
+        n = len(self._weights)
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= u:
+                pos = nxt
+                u -= tree[nxt]
+            step >>= 1
+        if pos >= n or self._weights[pos] <= 0:
+            # 浮点误差落在边界上：取最近的正权重项
+            pos = next((i for i in range(min(pos, n - 1), -1, -1) if self._weights[i] > 0), None)
+            if pos is None:
+                pos = next(i for i in range(n) if self._weights[i] > 0)
+        return pos
+
+
+class WeightedLotteryPicker:
+    """
+    按权重不放回抽取，接口与 PseudoRandomPicker 相同.
+    基于 FenwickSampler：每次 pick() 为 O(log n)，被抽中的项权重置 0；全部抽完后重新装满。
+    """
+
+    def __init__(self, items, weights, rng=None):
+        self.original_items = list(items)
+        self.weights = [float(w) for w in weights]
+        self.rng = rng or random
+        self.refill()
+
+    def refill(self):
+        self.sampler = FenwickSampler(self.weights)
+
+    def pick(self):
+        if not self.sampler.nonzero:
+            self.refill()
+        index = self.sampler.sample(self.rng)
+        self.sampler.update(index, 0.0)
+        return self.original_items[index]
+
+
+class LossLedger:
+    """
+    各球队、各位置累计失去的球员数（loss_ledger.json），每届选秀后增量更新.
+    fewest_losses() 用小顶堆维护候选顺序：计数变化时压入新条目、旧条目弹出时惰性丢弃，
+    不需要重新扫描历史，也不需要每届重新排序。
+    """
+
+    def __init__(self, teams=None, positions=None, drafts=0):
+        self.teams = dict(teams or {})
+        self.positions = dict(positions or {})
+        self.drafts = drafts
+        self._heap = None
+        self._candidates = None
+        self._dirty = set()     # 计数变化、尚未压入堆的球队
+
+    def to_json(self):
+        return json.dumps({'drafts': self.drafts, 'teams': self.teams, 'positions': self.positions},
+                          ensure_ascii=False, indent=2)
+
+    def record(self, players, sign=1):
+        """记入（sign=-1 时撤销）一届失去的球员。"""
+        self.drafts += sign
+        for team, position in players:
+            self.teams[team] = self.teams.get(team, 0) + sign
+            self.positions[position] = self.positions.get(position, 0) + sign
+            self._dirty.add(team)
+
+    def _push(self, team, tiebreak):
+        heapq.heappush(self._heap, (self.teams.get(team, 0), tiebreak, team))
+
+    def fewest_losses(self, k, candidates=None, rng=None):
+        """失去球员最少的 k 支球队（默认从联盟所有球队中选），次数相同时随机；O(k log n)，首次调用建堆 O(n)。"""
+        rng = rng or random
+        if candidates is None:
+            candidates, candidate_set = LEAGUE.teams, LEAGUE.team_set
+        else:
+            candidate_set = frozenset(candidates)
+        if self._heap is None or self._candidates != candidate_set \
+                or len(self._heap) > 4 * len(self._candidates):
+            # 首次使用、候选变化或过期条目太多时（重新）建堆
+            self._candidates = candidate_set
+            self._heap = [(self.teams.get(team, 0), rng.random(), team) for team in candidates]
+            heapq.heapify(self._heap)
+        else:
+            # 计数有变化的球队压入新条目（同样次数时的先后由 rng 决定）
+            for team in sorted(self._dirty & self._candidates):
+                self._push(team, rng.random())
+        self._dirty.clear()
+
+        chosen = []
+        seen = set()
+        while self._heap and len(chosen) < k:
+            count, _, team = heapq.heappop(self._heap)
+            if team in seen or count != self.teams.get(team, 0):
+                continue
+            seen.add(team)
+            chosen.append(team)
+        for team in chosen:
+            self._push(team, rng.random())
+        return chosen
+
+    def report(self, teams=None):
+        """联盟公平性统计，只依赖计数表，与历史长度无关。"""
+        counts = sorted(((self.teams.get(team, 0), team) for team in teams or LEAGUE.teams))
+        values = [count for count, _ in counts]
+        n = len(values)
+        mean = sum(values) / n if n else 0.0
+        stdev = math.sqrt(sum((v - mean) ** 2 for v in values) / n) if n else 0.0
+        total = sum(values)
+        # 基尼系数（已排序）：0 表示完全平均
+        gini = (sum((2 * i - n + 1) * v for i, v in enumerate(values)) / (n * total)) if total else 0.0
+        return {
+            'drafts': self.drafts,
+            'teams': [(team, count) for count, team in counts],
+            'positions': dict(self.positions),
+            'min': values[0] if values else 0,
+            'max': values[-1] if values else 0,
+            'mean': mean,
+            'stdev': stdev,
+            'gini': gini,
+        }
+
+
+class DraftCalendar:
+    """
+    未来 horizon 届的选秀年份计划（draft_calendar.json），每届选秀后向后滚动一届.
+    每届的选择只由 (seed, 模拟年份) 和该届之前的状态决定，所以状态变化（手动重置、
+    修改年份、撤销、冷却期改变）后 repair() 只需按规则逐届检查：仍然合法的条目保留，
+    不合法或缺失的条目就地重新生成，而不是整个日程从头再来。
+
+    CALENDAR_SPREAD 策略每届选"空闲间隔"最长的可用年份（从上次使用、或从未使用时从进入
+    可选范围算起），即最久未用优先的贪心：可选年份多于冷却期时每个年份轮流使用、不会
+    自动重置，最长空闲间隔不超过可选年份数；可选年份不足时每次自动重置前用遍所有年份，
+    重置次数也最少。randomness（0–1）是每届改为随机选择的概率。
+    """
+
+    def __init__(self, seed, horizon, entries=None, state_version=None,
+                 strategy=CALENDAR_RANDOM, randomness=0.0, rules=None):
+        self.seed = seed
+        self.horizon = horizon
+        self.entries = list(entries or [])   # [{'sim_year', 'year', 'auto_reset'}, ...]
+        self.state_version = state_version   # 上次检查时的状态版本，未变化时无需 repair
+        self.strategy = strategy
+        self.randomness = randomness
+        self.rules = rules                   # 上次检查时的联盟规则（见 _calendar_rules），改变后需要 repair
+
+    def to_json(self):
+        return json.dumps({'seed': self.seed, 'horizon': self.horizon, 'state_version': self.state_version,
+                           'rules': self.rules, 'strategy': self.strategy, 'randomness': self.randomness,
+                           'entries': self.entries}, ensure_ascii=False, indent=2)
+
+    def planned_year(self, sim_year):
+        for entry in self.entries:
+            if entry['sim_year'] == sim_year:
+                return entry['year']
+        return None
+
+    def _choose(self, sim_year, available, last_used, mode):
+        rng = random.Random(f"{self.seed}:{sim_year}")
+        if self.strategy == CALENDAR_SPREAD and rng.random() >= self.randomness:
+            gaps = [sim_year - _unused_since(year, last_used) for year in available]
+            longest = max(gaps)
+            return rng.choice([year for year, gap in zip(available, gaps) if gap == longest])
+        if mode == SELECTION_WEIGHTED:
+            weights = [year_weight(year, sim_year, last_used.get(year), SELECTION_WEIGHTED) for year in available]
+            return rng.choices(available, weights)[0]
+        return rng.choice(available)
+
+    def repair(self, sim_year, last_used, mode=SELECTION_UNIFORM):
+        """
+        从 sim_year 起按当前冷却状态 last_used（{年份: 上次使用的模拟年份}）检查 horizon 届计划，
+        返回重新生成的条目数。已经过去的条目被丢弃。
+        """
+        planned = {entry['sim_year']: entry for entry in self.entries if entry['sim_year'] >= sim_year}
+        last_used = {year: used for year, used in last_used.items() if used is not None}
+        entries = []
+        regenerated = 0
+        for season in range(sim_year, sim_year + self.horizon):
+            available = _available_years(season, last_used)
+            auto_reset = not available
+            if auto_reset:
+                # 与 perform_draft 相同：全部不可用时清空冷却记录，只保留年龄窗口规则
+                last_used = {}
+                available = sorted(LEAGUE.eligible_years(season))
+            entry = planned.get(season)
+            if entry is None or entry['year'] not in available or entry.get('auto_reset', False) != auto_reset:
+                if not available:
+                    break
+                entry = {'sim_year': season, 'year': self._choose(season, available, last_used, mode),
+                         'auto_reset': auto_reset}
+                regenerated += 1
+            entries.append(entry)
+            last_used[entry['year']] = season
+        self.entries = entries
+        return regenerated
+
+    def spread_stats(self, last_used, end_year=None):
+        """
+        日程的分散程度 {'max_gap', 'auto_resets'}：max_gap 为计划期间（到 end_year，默认日程结束）
+        任一年份最长的空闲届数，last_used 为日程开始前的冷却状态。
+        """
+        since = {year: _unused_since(year, last_used) for year in LEAGUE.draft_years}
+        if end_year is None:
+            end_year = self.entries[-1]['sim_year'] + 1 if self.entries else 0
+        max_gap = 0
+        auto_resets = 0
+        for entry in self.entries:
+            auto_resets += entry['auto_reset']
+            max_gap = max(max_gap, entry['sim_year'] - since[entry['year']])
+            since[entry['year']] = entry['sim_year']
+        # 到日程结束仍未使用的年份
+        max_gap = max([max_gap] + [end_year - start for start in since.values() if start < end_year])
+        return {'max_gap': max_gap, 'auto_resets': auto_resets}
+
+
+class HistoryTimeline:
+    """
+    联盟历史的时间索引：回答"第 sim_year 届开始时"（该届选秀之前）的冷却状态、
+    可用年份和累计失去球员数，不需要重放历史.
+
+    每个选秀年份的使用记录是按模拟年份排序的列表，重置（手动重置和选秀时的自动重置）
+    也是一个排序列表，查询一个年份的上次使用只需两次二分查找 O(log n)；失去球员的
+    累计计数每 CHECKPOINT_INTERVAL 届保存一个检查点，查询时从最近的检查点补上
+    不超过 CHECKPOINT_INTERVAL 届。
+
+    冷却状态只索引最近一个"时代"：年份被改回过去（如重置模拟年份）后，之前的记录不再参与
+    查询；失去球员的计数与 loss_ledger.json 一样包括全部历史，之前时代的计数作为新时代的起点。
+    """
+
+    CHECKPOINT_INTERVAL = 64
+
+    def __init__(self, history=(), resets=()):
+        """history 为 load_draft_history() 的记录，resets 为 reset_log.jsonl 的记录（见 reset_weights）。"""
+        self._ledger = LossLedger()
+        self._start()
+        resets = sorted(resets, key=lambda reset: reset['seasons'])
+        r = 0
+        for index, entry in enumerate(history):
+            while r < len(resets) and resets[r]['seasons'] <= index:
+                self._add_reset(resets[r]['sim_year'])
+                r += 1
+            self._add_draft(entry)
+        for reset in resets[r:]:
+            self._add_reset(reset['sim_year'])
+
+    def _start(self):
+        self._sim_years = []      # 每届选秀的模拟年份（递增）
+        self._drafted = []        # 对应的选中年份
+        self._players = []
+        self._uses = {}           # {选秀年份: [使用它的模拟年份, ...]}
+        self.resets = []          # 重置发生的模拟年份（递增）
+        self._checkpoints = []    # 第 i 个为前 i * CHECKPOINT_INTERVAL 届之后的 (teams, positions, drafts)
+        self._checkpoint()
+
+    def _checkpoint(self):
+        ledger = self._ledger
+        self._checkpoints.append((dict(ledger.teams), dict(ledger.positions), ledger.drafts))
+
+    def _add_reset(self, sim_year):
+        if (self._sim_years and sim_year <= self._sim_years[-1]) or (self.resets and sim_year < self.resets[-1]):
+            self._start()
+        self.resets.append(sim_year)
+
+    def _add_draft(self, entry):
+        sim_year = entry['sim_year']
+        if (self._sim_years and sim_year <= self._sim_years[-1]) or (self.resets and sim_year < self.resets[-1]):
+            self._start()
+        if 'reset_snapshot' in entry.get('undo', {}):
+            self.resets.append(sim_year)
+        self._sim_years.append(sim_year)
+        self._drafted.append(entry['drafted_year'])
+        self._players.append(entry['players'])
+        self._uses.setdefault(entry['drafted_year'], []).append(sim_year)
+        self._ledger.record(entry['players'])
+        if len(self._sim_years) % self.CHECKPOINT_INTERVAL == 0:
+            self._checkpoint()
+
+    def __len__(self):
+        return len(self._sim_years)
+
+    def drafts_before(self, sim_year):
+        """sim_year 之前的选秀届数。"""
+        return bisect.bisect_left(self._sim_years, sim_year)
+
+    def resets_before(self, sim_year):
+        """sim_year 之前的重置次数（手动重置当届计入之后的届）。"""
+        return bisect.bisect_left(self.resets, sim_year)
+
+    def draft_at(self, sim_year):
+        """sim_year 那一届的 (选中年份, 失去的球员)；那一届没有选秀时返回 None。"""
+        i = bisect.bisect_left(self._sim_years, sim_year)
+        if i < len(self._sim_years) and self._sim_years[i] == sim_year:
+            return self._drafted[i], self._players[i]
+        return None
+
+    def last_used(self, year, sim_year):
+        """year 在 sim_year 开始时的 last_used_year；期间重置过或从未使用时为 None。"""
+        uses = self._uses.get(year)
+        i = bisect.bisect_left(uses, sim_year) if uses else 0
+        if not i:
+            return None
+        used = uses[i - 1]
+        # 重置清除在它之前的使用记录（自动重置那一届选中的年份在重置之后使用）
+        j = bisect.bisect_left(self.resets, sim_year)
+        if j and used < self.resets[j - 1]:
+            return None
+        return used
+
+    def year_status(self, year, sim_year):
+        return year_status(year, sim_year, self.last_used(year, sim_year))
+
+    def season_status(self, year, sim_year):
+        """year 在 sim_year 这一届的状态（可用性热图的一格）：当届选中的年份为 YEAR_USED，其余同 year_status()。"""
+        draft = self.draft_at(sim_year)
+        if draft is not None and draft[0] == year:
+            return YEAR_USED
+        return self.year_status(year, sim_year)
+
+    def uses(self, year):
+        """当前时代中使用 year 的模拟年份（升序）。"""
+        return tuple(self._uses.get(year, ()))
+
+    def weights_as_of(self, sim_year):
+        """sim_year 开始时的权重表，格式与 load_draft_weights() 相同。"""
+        weights = {}
+        for year in LEAGUE.draft_years:
+            last_used_year = self.last_used(year, sim_year)
+            weights[year] = {
+                'available': 1 if year_status(year, sim_year, last_used_year) == YEAR_AVAILABLE else 0,
+                'last_used_year': last_used_year,
+            }
+        return weights
+
+    def ledger_as_of(self, sim_year):
+        """sim_year 开始时的累计失去球员统计（新的 LossLedger）。"""
+        count = self.drafts_before(sim_year)
+        checkpoint = count // self.CHECKPOINT_INTERVAL
+        ledger = LossLedger(*self._checkpoints[checkpoint])
+        for players in self._players[checkpoint * self.CHECKPOINT_INTERVAL:count]:
+            ledger.record(players)
+        return ledger
+
+
+# --- Storage ---
+# 所有状态读写都经过可替换的存储后端：默认是 DATA_DIR 下的文件，
+# 测试和批量模拟可以换成 MemoryStorage 或临时目录，互不干扰。
+_storage = FileStorage(DATA_DIR)
+
+
+def get_storage():
+    return _storage
+
+
+def set_storage(storage):
+    """切换存储后端并清空读缓存，返回之前的后端以便恢复。"""
+    global _storage
+    previous = _storage
+    _storage = storage
+    clear_read_cache()
+    return previous
+
+
+# --- Read Cache ---
+# 以后端提供的指纹作为缓存键（文件为 (mtime_ns, size, inode)）；指纹不变时直接
+# 返回已解析的数据，其他进程修改文件后指纹改变，下次读取自动重新解析。
+_read_cache = {}
+_read_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _read_cached(name, parse):
+    """
+    返回 parse(文本)，内容未变化时不读文件.
+    不存在时抛出 FileNotFoundError；parse 抛出的异常原样向上传递且不缓存。
+    """
+    fingerprint = _storage.fingerprint(name)
+    cached = _read_cache.get(name)
+    if cached is not None and cached[0] == fingerprint and cached[1] is parse:
+        _read_cache_stats['hits'] += 1
+        return cached[2]
+
+    _read_cache_stats['misses'] += 1
+    text = _storage.read_text(name)
+    if profiling.is_enabled():
+        profiling.record_io('read', len(text.encode('utf-8')))
+    data = parse(text)
+    _read_cache[name] = (fingerprint, parse, data)
+    return data
+
+
+def _invalidate_read_cache(name):
+    _read_cache.pop(name, None)
+
+
+def _write_text(name, text, append=False, atomic=False):
+    """写入（或追加）文本并使读缓存失效；写入失败时静默忽略，与原有行为一致。"""
+    try:
+        if append:
+            _storage.append_text(name, text)
+        else:
+            _storage.write_text(name, text, atomic=atomic)
+        if profiling.is_enabled():
+            profiling.record_io('write', len(text.encode('utf-8')))
+    except IOError:
+        pass
+    _invalidate_read_cache(name)
+
+
+def _pop_last_line(name):
+    """删除并返回最后一行；不存在或为空时返回 None。"""
+    try:
+        line = _storage.pop_last_line(name)
+    except IOError:
+        return None
+    finally:
+        _invalidate_read_cache(name)
+    if line is not None and profiling.is_enabled():
+        profiling.record_io('write', len(line.encode('utf-8')))
+    return line
+
+
+def _tail_lines(name, count):
+    """最后 count 个非空行（从旧到新），只从文件末尾向前读需要的部分；不存在时返回 []。"""
+    try:
+        lines = _storage.tail_lines(name, count)
+    except IOError:
+        return []
+    if profiling.is_enabled():
+        profiling.record_io('read', sum(len(line.encode('utf-8')) for line in lines))
+    return lines
+
+
+def _delete(name):
+    _storage.delete(name)
+    _invalidate_read_cache(name)
+
+
+def clear_read_cache():
+    _read_cache.clear()
+    _read_cache_stats['hits'] = 0
+    _read_cache_stats['misses'] = 0
+
+
+def get_read_cache_stats():
+    """返回 {'hits': ..., 'misses': ...} 的副本。"""
+    return dict(_read_cache_stats)
+
+
+# --- State Version ---
+def get_state_version():
+    """
+    单调递增的状态版本号，每次写入联盟状态都会加一.
+    GUI 轮询它判断 CLI 等其他进程是否修改了状态；文件未变时只需一次 stat。
+    """
+    try:
+        return _read_cached(STATE_VERSION_NAME, json.loads).get('version', 0)
+    except (json.JSONDecodeError, IOError, AttributeError):
+        return 0
+
+
+def _bump_state_version():
+    _write_text(STATE_VERSION_NAME, json.dumps({'version': get_state_version() + 1}), atomic=True)
+
 
 # --- Core Logic Functions ---
-def random_lose_player(team_picker, position_picker):
+def random_lose_player(team_picker, position_picker, position_constraints=None):
     random_team = team_picker.pick()
-    random_position = position_picker.pick()
+    allowed = position_constraints.get(random_team) if position_constraints else None
+    random_position = position_picker.pick_from(allowed) if allowed else position_picker.pick()
     return random_team, random_position
 
 
+@instrument("core.get_current_year")
 def get_current_year():
     """
     获取当前年份.
@@ -78,15 +679,13 @@ def get_current_year():
     文件优先，这样年份可以正常推进。
     """
     # 1. 首先尝试从文件读取
-    if os.path.exists(CURRENT_YEAR_FILE):
-        try:
-            with open(CURRENT_YEAR_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                year = data.get('current_year')
-                if year is not None:
-                    return year
-        except (json.JSONDecodeError, IOError):
-            pass
+    try:
+        data = _read_cached(CURRENT_YEAR_NAME, json.loads)
+        year = data.get('current_year')
+        if year is not None:
+            return year
+    except (json.JSONDecodeError, IOError):
+        pass
 
     # 2. 如果文件无效或不存在，尝试从环境变量获取
     start_year_from_env = os.environ.get('SIMULATION_START_YEAR')
@@ -104,13 +703,11 @@ def get_current_year():
 
 
 def save_current_year(year):
-    try:
-        with open(CURRENT_YEAR_FILE, 'w', encoding='utf-8') as f:
-            json.dump({'current_year': year}, f, ensure_ascii=False, indent=2)
-    except IOError:
-        pass
+    _write_text(CURRENT_YEAR_NAME, json.dumps({'current_year': year}, ensure_ascii=False, indent=2))
+    _bump_state_version()
 
 
+@instrument("core.increment_year")
 def increment_year():
     current_year = get_current_year()
     new_year = current_year + 1
@@ -118,28 +715,85 @@ def increment_year():
     return new_year
 
 
+def year_status(year, sim_year, last_used_year):
+    """
+    某个历史选秀年份在指定模拟年份的状态.
+    window  -- 在近20年窗口 (sim_year-20, sim_year] 内
+    used    -- 正是在这一年被选中
+    cooling -- 使用后仍在冷却期内
+    """
+    if sim_year - COOL_DOWN_PERIOD < year <= sim_year:
+        return YEAR_IN_WINDOW
+    if last_used_year is not None:
+        if last_used_year == sim_year:
+            return YEAR_USED
+        if sim_year - last_used_year < COOL_DOWN_PERIOD:
+            return YEAR_COOLING
+    return YEAR_AVAILABLE
+
+
+def year_weight(year, sim_year, last_used_year, mode=SELECTION_UNIFORM, cooldown=COOL_DOWN_PERIOD):
+    """
+    某个年份在指定模拟年份的抽取权重，不可用时为 0.
+    uniform  -- 可用即为 1
+    weighted -- 越早的选秀年份权重越高，传奇选秀年份加倍，
+                刚结束冷却的年份权重较低，RECOVERY_SEASONS 个赛季内逐步恢复
+    """
+    if sim_year - cooldown < year <= sim_year:
+        return 0.0
+    if last_used_year is not None and sim_year - last_used_year < cooldown:
+        return 0.0
+    if mode == SELECTION_UNIFORM:
+        return 1.0
+
+    span = (LATEST_HISTORICAL_DRAFT_YEAR - EARLIEST_DRAFT_YEAR) or 1
+    weight = 1.0 + OLD_CLASS_BONUS * max(0, LATEST_HISTORICAL_DRAFT_YEAR - year) / span
+    if year in LEAGUE.legendary_set:
+        weight *= LEGENDARY_BOOST
+    if last_used_year is not None:
+        since_cooldown = sim_year - last_used_year - cooldown
+        if since_cooldown < RECOVERY_SEASONS:
+            weight *= (since_cooldown + 1) / (RECOVERY_SEASONS + 1)
+    return weight
+
+
+def next_weight_change(year, sim_year, last_used_year, cooldown=COOL_DOWN_PERIOD):
+    """
+    year_weight() 在 sim_year 之后第一次可能变化的模拟年份；之后不再变化时返回 None.
+    批量模拟据此只在权重真正变化的赛季更新抽样树。
+    """
+    candidates = [year, year + cooldown]
+    if last_used_year is not None:
+        recovered = last_used_year + cooldown
+        if recovered <= sim_year < recovered + RECOVERY_SEASONS:
+            candidates.append(sim_year + 1)
+        else:
+            candidates.append(recovered)
+    later = [c for c in candidates if c > sim_year]
+    return min(later) if later else None
+
+
+def get_selection_mode():
+    mode = os.environ.get('DRAFT_PICKER_SELECTION', SELECTION_UNIFORM).strip().lower()
+    return mode if mode in SELECTION_MODES else SELECTION_UNIFORM
+
+
+@instrument("core.load_draft_weights")
 def load_draft_weights():
     current_sim_year = get_current_year()
     draft_weights = {}
 
     raw_loaded_weights = {}
-    if os.path.exists(DRAFT_WEIGHTS_FILE):
-        try:
-            with open(DRAFT_WEIGHTS_FILE, 'r', encoding='utf-8') as f:
-                raw_loaded_weights = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
+    try:
+        raw_loaded_weights = _read_cached(DRAFT_WEIGHTS_NAME, json.loads)
+    except (json.JSONDecodeError, IOError):
+        pass
 
-    for year_to_check in range(EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR + 1):
+    for year_to_check in LEAGUE.draft_years:
         year_str = str(year_to_check)
         last_used_sim_year = raw_loaded_weights.get(year_str, {}).get('last_used_year')
 
-        is_available = True
-        if current_sim_year - COOL_DOWN_PERIOD < year_to_check <= current_sim_year:
-            is_available = False
-        elif last_used_sim_year is not None and \
-             current_sim_year - last_used_sim_year < COOL_DOWN_PERIOD:
-            is_available = False
+        is_available = year_status(year_to_check, current_sim_year, last_used_sim_year) == YEAR_AVAILABLE
 
         draft_weights[year_to_check] = {
             'available': 1 if is_available else 0,
@@ -149,22 +803,43 @@ def load_draft_weights():
     return draft_weights
 
 
+@instrument("core.save_draft_weights")
 def save_draft_weights(weights):
     weights_to_save = {str(year): data for year, data in weights.items()}
-    try:
-        with open(DRAFT_WEIGHTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(weights_to_save, f, ensure_ascii=False, indent=2)
-    except IOError:
-        pass
+    _write_text(DRAFT_WEIGHTS_NAME, json.dumps(weights_to_save, ensure_ascii=False, indent=2))
+    _bump_state_version()
 
 
 def reset_weights():
+    """
+    手动重置所有年份的冷却记录，并记入 reset_log.jsonl 供 HistoryTimeline 查询.
+    n 是重置的序号，选秀记录的撤销信息里保存当时的序号，撤销时据此判断之后有没有重置。
+    """
+    last = _last_reset()
+    reset = {'sim_year': get_current_year(), 'seasons': len(load_draft_history()),
+             'n': (last or {}).get('n', 0) + 1}
+    _write_text(RESET_LOG_NAME, json.dumps(reset) + '\n', append=True)
+    weights = _reset_cooldowns()
+    hooks.emit(hooks.EVENT_WEIGHTS_RESET, sim_year=reset['sim_year'])
+    return weights
+
+
+def reset_to_year(year):
+    """把模拟年份重置为 year 并重置所有冷却记录（CLI 选项 4、GUI "重置所有数据"），返回新的权重表。"""
+    save_current_year(year)
+    weights = reset_weights()
+    hooks.emit(hooks.EVENT_YEAR_RESET, sim_year=year)
+    return weights
+
+
+def _reset_cooldowns():
+    clear_redo()
     current_sim_year = get_current_year()
+    eligible = LEAGUE.eligible_years(current_sim_year)
     weights = {}
-    for year_to_check in range(EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR + 1):
-        is_age_eligible = (year_to_check <= current_sim_year - COOL_DOWN_PERIOD or year_to_check > current_sim_year)
+    for year_to_check in LEAGUE.draft_years:
         weights[year_to_check] = {
-            'available': 1 if is_age_eligible else 0,
+            'available': 1 if year_to_check in eligible else 0,
             'last_used_year': None
         }
     save_draft_weights(weights)
@@ -173,3 +848,529 @@ def reset_weights():
 
 def is_all_weights_zero(weights):
     return all(data['available'] == 0 for data in weights.values())
+
+
+# --- Draft History ---
+def append_draft_history(sim_year, drafted_year, players, undo=None):
+    """
+    追加一条选秀记录到 draft_history.jsonl（每行一个 JSON 对象）.
+    追加写入，历史再长也不需要重写整个文件。
+    undo 为撤销这次选秀所需的信息（见 perform_draft），没有时这条记录不能撤销。
+    """
+    entry = {
+        'sim_year': sim_year,
+        'drafted_year': drafted_year,
+        'players': [[team, position] for team, position in players],
+    }
+    if undo is not None:
+        entry['undo'] = undo
+    ledger = load_loss_ledger()
+    _write_text(DRAFT_HISTORY_NAME, json.dumps(entry, ensure_ascii=False) + '\n', append=True)
+    ledger.record(players)
+    _save_loss_ledger(ledger)
+    _bump_state_version()
+
+
+def _parse_draft_history(text):
+    history = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        entry['players'] = [tuple(p) for p in entry.get('players', [])]
+        history.append(entry)
+    return history
+
+
+def load_draft_history():
+    """按选秀顺序返回所有历史记录，跳过损坏的行。"""
+    try:
+        return list(_read_cached(DRAFT_HISTORY_NAME, _parse_draft_history))
+    except IOError:
+        return []
+
+
+def iter_draft_history():
+    """
+    按选秀顺序逐条读取历史记录的生成器，跳过损坏的行. 不经过读缓存，内存占用与
+    历史长度无关，用于导出等一次性遍历。
+    """
+    try:
+        for line in _storage.iter_lines(DRAFT_HISTORY_NAME):
+            yield from _parse_draft_history(line)
+    except FileNotFoundError:
+        return
+
+
+def filter_draft_history(history, sim_year=None, drafted_year=None, team=None, position=None):
+    """
+    按模拟年份、选秀年份、球队、位置过滤历史记录.
+    球队/位置条件：该届任意一个被废球员匹配即保留。
+    """
+    result = []
+    for entry in history:
+        if sim_year is not None and entry['sim_year'] != sim_year:
+            continue
+        if drafted_year is not None and entry['drafted_year'] != drafted_year:
+            continue
+        if team is not None and not any(p[0] == team for p in entry['players']):
+            continue
+        if position is not None and not any(p[1] == position for p in entry['players']):
+            continue
+        result.append(entry)
+    return result
+
+
+# --- History Timeline ---
+_TIMELINE_CACHE_KEY = '<history timeline>'
+
+
+def _last_reset():
+    """reset_log.jsonl 的最后一条（只读文件末尾），没有时返回 None。"""
+    for line in _tail_lines(RESET_LOG_NAME, 1):
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+def _load_reset_log():
+    try:
+        text = _storage.read_text(RESET_LOG_NAME)
+    except IOError:
+        return []
+    resets = []
+    for line in text.splitlines():
+        try:
+            resets.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return resets
+
+
+def _fingerprint_or_none(name):
+    try:
+        return _storage.fingerprint(name)
+    except IOError:
+        return None
+
+
+def load_history_timeline():
+    """
+    当前历史的 HistoryTimeline. 放在读缓存中，历史和重置记录都未变化时直接复用
+    （只读使用）；变化后下次调用时重新建立，之后的查询都是 O(log n)。
+    """
+    fingerprint = (_fingerprint_or_none(DRAFT_HISTORY_NAME), _fingerprint_or_none(RESET_LOG_NAME))
+    cached = _read_cache.get(_TIMELINE_CACHE_KEY)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[2]
+    timeline = HistoryTimeline(load_draft_history(), _load_reset_log())
+    _read_cache[_TIMELINE_CACHE_KEY] = (fingerprint, HistoryTimeline, timeline)
+    return timeline
+
+
+# --- Loss Ledger ---
+def _parse_loss_ledger(text):
+    data = json.loads(text)
+    return LossLedger(data.get('teams'), data.get('positions'), data.get('drafts', 0))
+
+
+def _rebuild_loss_ledger():
+    ledger = LossLedger()
+    for entry in load_draft_history():
+        ledger.record(entry['players'])
+    return ledger
+
+
+def load_loss_ledger():
+    """
+    读取失去球员统计. 返回缓存中的同一个对象（只读使用）；
+    文件不存在或损坏时从选秀历史重建一次并保存。
+    """
+    try:
+        return _read_cached(LOSS_LEDGER_NAME, _parse_loss_ledger)
+    except (json.JSONDecodeError, AttributeError, IOError):
+        ledger = _rebuild_loss_ledger()
+        _save_loss_ledger(ledger)
+        return ledger
+
+
+def _save_loss_ledger(ledger):
+    _write_text(LOSS_LEDGER_NAME, ledger.to_json())
+    # 写入后直接把对象放回缓存，保留其中的堆，下一届无需重建
+    try:
+        _read_cache[LOSS_LEDGER_NAME] = (_storage.fingerprint(LOSS_LEDGER_NAME), _parse_loss_ledger, ledger)
+    except IOError:
+        pass
+
+
+def fairness_report():
+    return load_loss_ledger().report()
+
+
+# --- Team Lottery ---
+def load_team_lottery_config():
+    """
+    读取 team_lottery.json 并与 DEFAULT_TEAM_LOTTERY 合并.
+    文件不存在或损坏时返回默认配置（不启用）；未知球队和位置被忽略。
+    """
+    config = dict(DEFAULT_TEAM_LOTTERY)
+    try:
+        loaded = _read_cached(TEAM_LOTTERY_NAME, json.loads)
+    except (json.JSONDecodeError, IOError):
+        return config
+    if isinstance(loaded, dict):
+        config.update({key: value for key, value in loaded.items() if key in DEFAULT_TEAM_LOTTERY})
+
+    constraints = {}
+    for team, positions in (config.get('position_constraints') or {}).items():
+        allowed = LEAGUE.position_set.intersection(positions)
+        if team in LEAGUE.team_set and allowed:
+            constraints[team] = allowed
+    config['position_constraints'] = constraints
+    return config
+
+
+def save_team_lottery_config(config):
+    data = {key: config[key] for key in DEFAULT_TEAM_LOTTERY if key in config}
+    if 'position_constraints' in data:
+        data['position_constraints'] = {team: sorted(positions)
+                                        for team, positions in data['position_constraints'].items()}
+    _write_text(TEAM_LOTTERY_NAME, json.dumps(data, ensure_ascii=False, indent=2))
+    _bump_state_version()
+
+
+def recent_team_losses(seasons, history=None):
+    """最近 seasons 届选秀中每支球队失去的球员数（未传 history 时只从文件末尾读 seasons 行，不解析全部历史）。"""
+    if seasons <= 0:
+        return {}
+    if history is None:
+        history = _parse_draft_history("\n".join(_tail_lines(DRAFT_HISTORY_NAME, seasons)))
+    losses = {}
+    for entry in history[max(0, len(history) - seasons):]:
+        for team, _ in entry['players']:
+            losses[team] = losses.get(team, 0) + 1
+    return losses
+
+
+def team_lottery_weights(config, teams=None, recent_losses=None):
+    """每支球队失去球员的相对权重：排名、工资档位和最近失去的球员数共同决定。"""
+    if recent_losses is None:
+        recent_losses = recent_team_losses(int(config.get('recent_seasons', 0)))
+    standings = config.get('standings') or {}
+    ranked = len(standings)
+    tiers = config.get('payroll_tiers') or {}
+    factors = config.get('payroll_factors') or {}
+    standings_weight = float(config.get('standings_weight', 0))
+    penalty = float(config.get('recent_loss_penalty', 0))
+
+    weights = []
+    for team in teams or LEAGUE.teams:
+        weight = 1.0
+        rank = standings.get(team)
+        if rank is not None and ranked > 1:
+            weight *= 1 + standings_weight * (ranked - min(max(rank, 1), ranked)) / (ranked - 1)
+        weight *= float(factors.get(tiers.get(team), 1.0))
+        weight /= (1 + penalty) ** recent_losses.get(team, 0)
+        weights.append(max(weight, 1e-9))
+    return weights
+
+
+# --- Draft Calendar ---
+def _available_years(sim_year, last_used):
+    """按 year_status 规则在 sim_year 可选的年份（升序）；last_used 为 {年份: 上次使用的模拟年份}。"""
+    return [year for year in sorted(LEAGUE.eligible_years(sim_year))
+            if last_used.get(year) is None or sim_year - last_used[year] >= COOL_DOWN_PERIOD]
+
+
+def _unused_since(year, last_used):
+    """year 从哪一届开始空闲：上次使用的模拟年份，从未使用时为进入可选范围的那一届。"""
+    used = last_used.get(year)
+    return used if used is not None else year + COOL_DOWN_PERIOD
+
+
+def _current_last_used():
+    return {year: data['last_used_year'] for year, data in load_draft_weights().items()}
+
+
+def _calendar_rules():
+    """决定日程是否合法的联盟规则；状态版本只在进程内递增，修改 leagues.json 后重启不会改变它。"""
+    return {'league': LEAGUE.name, 'cooldown': COOL_DOWN_PERIOD,
+            'earliest_year': EARLIEST_DRAFT_YEAR, 'latest_year': LATEST_HISTORICAL_DRAFT_YEAR}
+
+
+def _parse_draft_calendar(text):
+    data = json.loads(text)
+    return DraftCalendar(data['seed'], data['horizon'], data.get('entries'), data.get('state_version'),
+                         data.get('strategy', CALENDAR_RANDOM), data.get('randomness', 0.0), data.get('rules'))
+
+
+def _save_draft_calendar(calendar):
+    calendar.state_version = get_state_version()
+    calendar.rules = _calendar_rules()
+    _write_text(DRAFT_CALENDAR_NAME, calendar.to_json(), atomic=True)
+
+
+def plan_draft_calendar(seasons, seed=None, strategy=CALENDAR_RANDOM, randomness=0.0):
+    """
+    从当前模拟年份起生成 seasons 届的选秀日程并保存；seed 为空时随机生成。
+    strategy 见 CALENDAR_STRATEGIES，randomness 为 CALENDAR_SPREAD 每届改为随机选择的概率。
+    """
+    if seasons < 1:
+        raise ValueError("seasons must be at least 1")
+    if strategy not in CALENDAR_STRATEGIES:
+        raise ValueError(f"unknown calendar strategy {strategy!r}")
+    if not 0 <= randomness <= 1:
+        raise ValueError("randomness must be between 0 and 1")
+    calendar = DraftCalendar(random.randrange(2 ** 31) if seed is None else seed, seasons,
+                             strategy=strategy, randomness=randomness)
+    calendar.repair(get_current_year(), _current_last_used(), get_selection_mode())
+    _save_draft_calendar(calendar)
+    _bump_state_version()
+    return calendar
+
+
+def load_draft_calendar():
+    """
+    读取选秀日程，没有时返回 None. 联盟状态或规则（联盟、冷却期、年份范围）自上次检查后
+    有变化时先按当前状态修复，只重新生成受影响的条目。
+    """
+    try:
+        calendar = _parse_draft_calendar(_storage.read_text(DRAFT_CALENDAR_NAME))
+    except (json.JSONDecodeError, KeyError, TypeError, IOError):
+        return None
+    if calendar.state_version != get_state_version() or calendar.rules != _calendar_rules():
+        calendar.repair(get_current_year(), _current_last_used(), get_selection_mode())
+        _save_draft_calendar(calendar)
+    return calendar
+
+
+def draft_calendar_stats(calendar):
+    """按当前冷却状态计算日程的分散程度，见 DraftCalendar.spread_stats()。"""
+    return calendar.spread_stats(_current_last_used())
+
+
+def clear_draft_calendar():
+    _delete(DRAFT_CALENDAR_NAME)
+    _bump_state_version()
+
+
+# --- Draft Flow ---
+def perform_draft(rng=None, mode=None):
+    """
+    执行一次完整选秀：选年份、标记冷却、抽取被废球员、记录历史、推进年份.
+    CLI 和 GUI 都只负责展示返回的结果。rng 可传入 random.Random 以复现结果。
+    mode 为年份抽取方式（SELECTION_MODES），默认取 get_selection_mode()。
+
+    返回 dict:
+        auto_reset     -- 是否因全部不可用而自动重置
+        sim_year       -- 选秀发生的模拟年份
+        selected_year  -- 选中的历史年份；没有可用年份时为 None
+        players        -- [(team, position), ...]，按球队 ID 排序
+        new_sim_year   -- 推进后的模拟年份
+        weights        -- 选秀后的权重表
+    """
+    current_sim_year = get_current_year()
+    calendar = load_draft_calendar()
+    draft_weights = load_draft_weights()
+
+    auto_reset = False
+    reset_snapshot = None
+    if is_all_weights_zero(draft_weights):
+        reset_snapshot = {str(year): data['last_used_year'] for year, data in draft_weights.items()
+                          if data['last_used_year'] is not None}
+        # 自动重置记录在这届的选秀历史里（reset_snapshot），不写入 reset_log
+        draft_weights = _reset_cooldowns()
+        auto_reset = True
+
+    result = {
+        'auto_reset': auto_reset,
+        'sim_year': current_sim_year,
+        'selected_year': None,
+        'players': [],
+        'new_sim_year': current_sim_year,
+        'weights': draft_weights,
+    }
+
+    available_years = [year for year, data in draft_weights.items() if data['available'] == 1]
+    if not available_years:
+        return result
+
+    lottery = load_team_lottery_config()
+    if lottery['enabled'] and lottery['balance']:
+        team_picker = PseudoRandomPicker(load_loss_ledger().fewest_losses(NUM_PLAYERS_TO_LOSE, rng=rng), rng)
+        constraints = lottery['position_constraints']
+    elif lottery['enabled']:
+        team_picker = WeightedLotteryPicker(LEAGUE.teams, team_lottery_weights(lottery), rng)
+        constraints = lottery['position_constraints']
+    else:
+        team_picker = PseudoRandomPicker(LEAGUE.teams, rng)
+        constraints = None
+    position_picker = PseudoRandomPicker(LEAGUE.positions, rng)
+    planned_year = calendar.planned_year(current_sim_year) if calendar else None
+    if planned_year is not None and draft_weights[planned_year]['available'] == 1:
+        # 按日程选秀；日程在读取时已按当前状态修复，这里的检查只是保险
+        selected_year = planned_year
+    elif (mode or get_selection_mode()) == SELECTION_WEIGHTED:
+        sampler = FenwickSampler([year_weight(year, current_sim_year, draft_weights[year]['last_used_year'],
+                                              SELECTION_WEIGHTED) for year in available_years])
+        selected_year = available_years[sampler.sample(rng)]
+    else:
+        year_picker = PseudoRandomPicker(available_years, rng)
+        selected_year = year_picker.pick()
+    undo = {'prev_last_used_year': draft_weights[selected_year]['last_used_year'],
+            'resets': (_last_reset() or {}).get('n', 0)}
+    if reset_snapshot is not None:
+        undo['reset_snapshot'] = reset_snapshot
+    draft_weights[selected_year]['available'] = 0
+    draft_weights[selected_year]['last_used_year'] = current_sim_year
+
+    selected_players = []
+    for _ in range(NUM_PLAYERS_TO_LOSE):
+        team, position = random_lose_player(team_picker, position_picker, constraints)
+        selected_players.append((team, position))
+    selected_players.sort(key=lambda x: x[0])
+
+    save_draft_weights(draft_weights)
+    append_draft_history(current_sim_year, selected_year, selected_players, undo)
+    clear_redo()
+
+    result['selected_year'] = selected_year
+    result['players'] = selected_players
+    result['new_sim_year'] = increment_year()
+    if calendar is not None:
+        # 日程向后滚动一届；按计划选秀时剩下的条目都仍然合法，只需补上最后一届
+        calendar.repair(result['new_sim_year'], {year: data['last_used_year'] for year, data in draft_weights.items()},
+                        mode or get_selection_mode())
+        _save_draft_calendar(calendar)
+    hooks.emit(hooks.EVENT_DRAFT_COMPLETED, sim_year=current_sim_year, selected_year=selected_year,
+               players=list(selected_players), auto_reset=auto_reset, new_sim_year=result['new_sim_year'])
+    return result
+
+
+# --- Undo / Redo ---
+# 每条选秀记录都带有撤销所需的信息（选中年份之前的 last_used_year，自动重置时
+# 还有重置前的冷却快照），撤销只需弹出历史最后一行并改回一个年份的冷却记录，
+# 不需要重放历史。被撤销的记录压入 draft_redo.jsonl，新的选秀或重置会清空它。
+def _load_raw_weights():
+    try:
+        raw = _read_cached(DRAFT_WEIGHTS_NAME, json.loads)
+    except (json.JSONDecodeError, IOError):
+        return {}
+    return {year: dict(data) for year, data in raw.items()}
+
+
+def _set_last_used(raw_weights, year, last_used_year, sim_year):
+    raw_weights[str(year)] = {
+        'available': 1 if year_status(year, sim_year, last_used_year) == YEAR_AVAILABLE else 0,
+        'last_used_year': last_used_year,
+    }
+
+
+def _restore_snapshot(raw_weights, snapshot, sim_year):
+    for year in LEAGUE.draft_years:
+        _set_last_used(raw_weights, year, snapshot.get(str(year)), sim_year)
+
+
+def _parse_entry(line):
+    entries = _parse_draft_history(line)
+    return entries[0] if entries else None
+
+
+def clear_redo():
+    """清空重做栈；任何产生新选秀记录的操作都应调用。"""
+    _delete(DRAFT_REDO_NAME)
+
+
+def _reset_after(entry):
+    """
+    entry（最后一条选秀记录）之后是否有手动重置：reset_log 里记的位置不随撤销移动，不能跨重置撤销.
+    只比较两个文件的最后一行；没有重置序号的旧记录才按历史长度判断。
+    """
+    last = _last_reset()
+    if last is None:
+        return False
+    if 'resets' in entry['undo']:
+        return last.get('n', 0) > entry['undo']['resets']
+    return last.get('seasons', 0) >= len(load_draft_history())
+
+
+def _last_draft():
+    lines = _tail_lines(DRAFT_HISTORY_NAME, 1)
+    return _parse_entry(lines[0]) if lines else None
+
+
+def can_undo():
+    """O(1)：只读选秀历史和重置记录的最后一行。"""
+    entry = _last_draft()
+    return (entry is not None and 'undo' in entry and entry['sim_year'] + 1 == get_current_year()
+            and not _reset_after(entry))
+
+
+def can_redo():
+    try:
+        redo = _read_cached(DRAFT_REDO_NAME, _parse_draft_history)
+    except IOError:
+        return False
+    return bool(redo) and redo[-1]['sim_year'] == get_current_year()
+
+
+@instrument("core.undo_last_draft")
+def undo_last_draft():
+    """
+    撤销最近一次选秀：恢复选中年份的冷却记录（自动重置时恢复重置前的快照）、
+    删除历史记录、年份退回一年. 返回被撤销的记录；无法撤销时返回 None。
+    只有年份仍停留在那次选秀之后、之后没有手动重置、且记录带有撤销信息时才能撤销。
+    """
+    if not can_undo():
+        return None
+    ledger = load_loss_ledger()
+    line = _pop_last_line(DRAFT_HISTORY_NAME)
+    entry = _parse_entry(line)
+
+    sim_year = entry['sim_year']
+    undo = entry['undo']
+    raw_weights = _load_raw_weights()
+    if 'reset_snapshot' in undo:
+        _restore_snapshot(raw_weights, undo['reset_snapshot'], sim_year)
+    else:
+        _set_last_used(raw_weights, entry['drafted_year'], undo['prev_last_used_year'], sim_year)
+    save_draft_weights(raw_weights)
+    ledger.record(entry['players'], -1)
+    _save_loss_ledger(ledger)
+    save_current_year(sim_year)
+    _write_text(DRAFT_REDO_NAME, line + '\n', append=True)
+    return entry
+
+
+@instrument("core.redo_draft")
+def redo_draft():
+    """
+    重做最近撤销的选秀，结果与原来完全相同. 返回重做的记录；
+    没有可重做的记录或年份已经改变时返回 None（并清空重做栈）。
+    """
+    line = _pop_last_line(DRAFT_REDO_NAME)
+    if line is None:
+        return None
+    entry = _parse_entry(line)
+    if entry is None or entry['sim_year'] != get_current_year():
+        _delete(DRAFT_REDO_NAME)
+        return None
+
+    sim_year = entry['sim_year']
+    raw_weights = _load_raw_weights()
+    if 'reset_snapshot' in entry['undo']:
+        _restore_snapshot(raw_weights, {}, sim_year)
+    _set_last_used(raw_weights, entry['drafted_year'], sim_year, sim_year)
+    save_draft_weights(raw_weights)
+    ledger = load_loss_ledger()
+    _write_text(DRAFT_HISTORY_NAME, line + '\n', append=True)
+    ledger.record(entry['players'])
+    _save_loss_ledger(ledger)
+    save_current_year(sim_year + 1)
+    return entry
@@ -0,0 +1,349 @@
+"""
+Year-indexed store of historical draft classes (data/draft_classes.bin).
+
+Layout (little-endian):
+
+    header   magic b'2KDC', format version, first year, year count
+    offsets  year count + 1 uint32 offsets of each year's block, relative to the data start
+    blocks   per year: uint16 pick count, then per pick
+                 uint16 pick number and four uint8-length-prefixed UTF-8 strings:
+                 player, position, team (a league team ID, see league.py) and
+                 college (or pre-draft team, "" when unknown)
+
+Version 1 stores had no college string; they are still read, with college "".
+
+Opening a store reads only the header and offset table; draft_class(year) is one
+seek and one read of that year's block, decoded on demand and kept in a small cache.
+
+SearchIndex answers incremental (search-as-you-type) queries over players, colleges,
+teams and positions, including their localized names. It is built on first use: a
+trigram index for queries of three or more characters and a sorted word list
+for shorter (word prefix) queries, so each keystroke only touches the matching
+postings.
+
+The bundled file is built from data/draft_classes.csv (year,pick,player,position,team,college;
+the college column is optional).
+It is deliberately scoped to the first pick of each year (full classes need a
+verifiable source and are not shipped); a CSV with full classes builds the same
+way, and first_picks_only() tells the UI which one it has:
+
+    python draftclasses.py build data/draft_classes.csv
+    python draftclasses.py show 2003
+"""
+
+import bisect
+import csv
+import os
+import struct
+import sys
+import threading
+import unicodedata
+from collections import namedtuple
+
+MAGIC = b'2KDC'
+FORMAT_VERSION = 2
+DATA_DIR = os.path.join(getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_STORE = os.path.join(DATA_DIR, 'draft_classes.bin')
+DEFAULT_SOURCE = os.path.join(DATA_DIR, 'draft_classes.csv')
+CACHE_SIZE = 64
+
+_HEADER = struct.Struct('<4sHHH')
+_OFFSET = struct.Struct('<I')
+_COUNT = struct.Struct('<H')
+
+DraftPick = namedtuple('DraftPick', 'pick player position team college', defaults=('',))
+_STRING_FIELDS = {1: 3, 2: 4}     # strings per pick by format version
+
+
+def _pack_string(text):
+    data = text.encode('utf-8')
+    if len(data) > 255:
+        raise ValueError(f"{text!r} is longer than 255 bytes")
+    return bytes((len(data),)) + data
+
+
+def write_store(path, classes):
+    """
+    Write {year: [DraftPick or (pick, player, position, team[, college]), ...]};
+    years in between are stored empty.
+    """
+    if not classes:
+        raise ValueError("no draft classes to write")
+    first_year, last_year = min(classes), max(classes)
+    blocks = []
+    for year in range(first_year, last_year + 1):
+        picks = sorted(DraftPick(*pick) for pick in classes.get(year, ()))
+        block = [_COUNT.pack(len(picks))]
+        for pick in picks:
+            block.append(_COUNT.pack(pick.pick))
+            block.extend(_pack_string(value) for value in (pick.player, pick.position, pick.team, pick.college))
+        blocks.append(b''.join(block))
+
+    offsets = [0]
+    for block in blocks:
+        offsets.append(offsets[-1] + len(block))
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, first_year, len(blocks)))
+        f.write(b''.join(_OFFSET.pack(offset) for offset in offsets))
+        f.write(b''.join(blocks))
+
+
+def read_csv(path):
+    """{year: [DraftPick, ...]} from a year,pick,player,position,team[,college] CSV."""
+    classes = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            pick = DraftPick(int(row['pick']), row['player'].strip(), row['position'].strip(), row['team'].strip(),
+                             (row.get('college') or '').strip())
+            classes.setdefault(int(row['year']), []).append(pick)
+    return classes
+
+
+class DraftClassStore:
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self._file = open(path, 'rb')
+        magic, version, self.first_year, year_count = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a draft class store")
+        if version not in _STRING_FIELDS:
+            self.close()
+            raise ValueError(f"unsupported draft class store version {version}")
+        self._string_fields = _STRING_FIELDS[version]
+        table = self._file.read(_OFFSET.size * (year_count + 1))
+        self._offsets = [offset for (offset,) in _OFFSET.iter_unpack(table)]
+        self._data_start = _HEADER.size + len(table)
+        self.years = range(self.first_year, self.first_year + year_count)
+        self._cache = {}
+        self._max_class_size = None
+        self._lock = threading.Lock()     # the GUI may read from a worker thread
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def __contains__(self, year):
+        return year in self.years
+
+    def draft_class(self, year):
+        """Picks of one year in pick order; [] for years outside the store or without data."""
+        if year not in self.years:
+            return []
+        picks = self._cache.get(year)
+        if picks is None:
+            index = year - self.first_year
+            start, end = self._offsets[index], self._offsets[index + 1]
+            with self._lock:
+                self._file.seek(self._data_start + start)
+                block = self._file.read(end - start)
+            picks = _decode_block(block, self._string_fields)
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[year] = picks
+        return list(picks)
+
+    def max_class_size(self):
+        """Most picks stored for any one year (1 for a first-pick-only dataset like the bundled one)."""
+        if self._max_class_size is None:
+            self._max_class_size = max((len(self.draft_class(year)) for year in self.years), default=0)
+        return self._max_class_size
+
+
+def _decode_block(block, string_fields):
+    (count,), offset = _COUNT.unpack_from(block, 0), _COUNT.size
+    picks = []
+    for _ in range(count):
+        (number,) = _COUNT.unpack_from(block, offset)
+        offset += _COUNT.size
+        values = []
+        for _ in range(string_fields):
+            length = block[offset]
+            values.append(block[offset + 1:offset + 1 + length].decode('utf-8'))
+            offset += 1 + length
+        picks.append(DraftPick(number, *values))
+    return tuple(picks)
+
+
+_stores = {}
+
+
+def _league_store_path():
+    from core import LEAGUE
+    return os.path.join(DATA_DIR, LEAGUE.draft_classes) if LEAGUE.draft_classes else None
+
+
+def draft_class(year, path=None):
+    """
+    Picks of one year from path, by default the active league's bundled store.
+    [] when the league has no store or the file is missing; opened stores stay open.
+    """
+    store = _open_store(path)
+    return store.draft_class(year) if store is not None else []
+
+
+def first_picks_only(path=None):
+    """True when the store (default: the active league's) has at most one pick per year, e.g. the bundled sample."""
+    store = _open_store(path)
+    return store is not None and store.max_class_size() == 1
+
+
+def _open_store(path=None):
+    path = path or _league_store_path()
+    if path is None:
+        return None
+    store = _stores.get(path)
+    if store is None:
+        try:
+            store = _stores[path] = DraftClassStore(path)
+        except (OSError, ValueError):
+            return None
+    return store
+
+
+def normalize(text):
+    """Case- and accent-insensitive form used for indexing and queries."""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """
+    Substring search over draft picks. documents is [(year, DraftPick, [searchable text, ...]), ...];
+    results come back ordered by year, then pick.
+    """
+
+    def __init__(self, documents):
+        self.documents = sorted(documents, key=lambda doc: (doc[0], doc[1].pick))
+        self._texts = []
+        self._grams = {}
+        words = set()
+        for doc_id, (_, _, texts) in enumerate(self.documents):
+            text = '\n'.join(normalize(value) for value in texts)
+            self._texts.append(text)
+            for gram in _trigrams(text):
+                self._grams.setdefault(gram, []).append(doc_id)
+            words.update((word, doc_id) for word in text.split())
+        self._words = sorted(words)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _candidates(self, query):
+        if len(query) >= 3:
+            postings = sorted((self._grams.get(gram, ()) for gram in _trigrams(query)), key=len)
+            if not postings or not postings[0]:
+                return []
+            ids = set(postings[0])
+            for posting in postings[1:]:
+                ids.intersection_update(posting)
+                if not ids:
+                    return []
+            return [doc_id for doc_id in sorted(ids) if query in self._texts[doc_id]]
+        if not query.isascii():
+            # one or two CJK characters are usually a whole name part, so match anywhere
+            return [doc_id for doc_id, text in enumerate(self._texts) if query in text]
+        # one or two letters: prefixes of words
+        start = bisect.bisect_left(self._words, (query,))
+        ids = set()
+        for word, doc_id in self._words[start:]:
+            if not word.startswith(query):
+                break
+            ids.add(doc_id)
+        return sorted(ids)
+
+    def search(self, query, years=None, limit=None):
+        """[(year, DraftPick), ...] matching query; years (a set) restricts the result to those years."""
+        query = normalize(query.strip())
+        if not query:
+            return []
+        results = []
+        for doc_id in self._candidates(query):
+            year, pick, _ = self.documents[doc_id]
+            if years is not None and year not in years:
+                continue
+            results.append((year, pick))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+
+_search_index = None
+
+
+def search_index():
+    """The active league's SearchIndex over all its draft years, built on first use."""
+    global _search_index
+    if _search_index is None:
+        from core import LEAGUE
+        from i18n import TRANSLATIONS, SUPPORTED_LANGUAGES
+        names = {kind: [LEAGUE.display_names(kind, lang, TRANSLATIONS[lang].get(kind))
+                        for lang in SUPPORTED_LANGUAGES] for kind in ('teams', 'positions')}
+        documents = []
+        for year in LEAGUE.draft_years:
+            for pick in draft_class(year):
+                texts = [pick.player, pick.college, pick.team, pick.position]
+                texts += [table.get(pick.team, '') for table in names['teams']]
+                texts += [table.get(pick.position, '') for table in names['positions']]
+                documents.append((year, pick, texts))
+        _search_index = SearchIndex(documents)
+    return _search_index
+
+
+def render_draft_class(year):
+    """Localized lines showing one year's draft class, rendered with i18n.t()."""
+    from i18n import t
+    picks = draft_class(year)
+    if not picks:
+        return t('draft_class_missing', year=year)
+    teams_dict = t('teams')
+    positions_dict = t('positions')
+    if len(picks) == 1:
+        # the bundled sample has one pick per year: a single line that says which pick it is
+        pick = picks[0]
+        return t('draft_class_single', year=year, pick=pick.pick, player=pick.player,
+                 position=positions_dict.get(pick.position, pick.position),
+                 team=teams_dict.get(pick.team, pick.team))
+    lines = [t('draft_class_header', year=year)]
+    for pick in picks:
+        lines.append(t('draft_class_line', pick=pick.pick, player=pick.player,
+                       position=positions_dict.get(pick.position, pick.position),
+                       team=teams_dict.get(pick.team, pick.team)))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Build or inspect the draft class store.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="build the binary store from a CSV")
+    build.add_argument('csv', nargs='?', default=DEFAULT_SOURCE)
+    build.add_argument('-o', '--output', default=DEFAULT_STORE)
+    show = sub.add_parser('show', help="print one year's draft class")
+    show.add_argument('year', type=int)
+    show.add_argument('--store', default=DEFAULT_STORE)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        classes = read_csv(args.csv)
+        write_store(args.output, classes)
+        print(f"{args.output}: {min(classes)}-{max(classes)}, "
+              f"{sum(len(picks) for picks in classes.values())} picks")
+        return 0
+    with DraftClassStore(args.store) as store:
+        for pick in store.draft_class(args.year):
+            print(f"{pick.pick:>3}  {pick.player}  {pick.position}  {pick.team}  {pick.college}".rstrip())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
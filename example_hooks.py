@@ -0,0 +1,56 @@
+"""
+Example hook plugin: keeps a shared spreadsheet and a stream overlay up to date.
+
+    DRAFT_PICKER_HOOKS=example_hooks python main.py
+
+- draft_results.csv: one row per draft appended (sim year, drafted year, teams, positions)
+- overlay.txt: the latest draft, rewritten after every draft or reset, for an OBS text source
+
+Both are written to DRAFT_PICKER_HOOK_DIR (default: the data directory). The hooks
+run in the hook worker thread, so a slow network share does not slow the draft down.
+"""
+
+import csv
+import os
+
+import hooks
+from core import DATA_DIR
+from i18n import t, sort_players
+
+OUTPUT_DIR = os.environ.get("DRAFT_PICKER_HOOK_DIR") or str(DATA_DIR)
+
+
+def _path(name):
+    return os.path.join(OUTPUT_DIR, name)
+
+
+def append_spreadsheet_row(payload):
+    path = _path("draft_results.csv")
+    players = sort_players(payload['players'])
+    new_file = not os.path.exists(path)
+    with open(path, 'a', encoding='utf-8-sig' if new_file else 'utf-8', newline='') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow([t('history_col_' + column) for column in ('sim_year', 'drafted_year', 'teams',
+                                                                        'positions')])
+        writer.writerow([payload['sim_year'], payload['selected_year'],
+                         ", ".join(team for team, _ in players), ", ".join(pos for _, pos in players)])
+
+
+def refresh_overlay(payload):
+    if payload['event'] == hooks.EVENT_DRAFT_COMPLETED:
+        teams_dict = t('teams')
+        lines = [t('selected_year', year=payload['selected_year'])]
+        lines += [teams_dict.get(team, team) for team, _ in sort_players(payload['players'])]
+    else:
+        lines = [t('sim_year', year=payload['sim_year'])]
+    tmp = _path("overlay.txt.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, _path("overlay.txt"))
+
+
+def register_hooks(dispatcher):
+    dispatcher.register(hooks.EVENT_DRAFT_COMPLETED, append_spreadsheet_row)
+    for event in hooks.EVENTS:
+        dispatcher.register(event, refresh_overlay)
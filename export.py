@@ -0,0 +1,135 @@
+"""
+Streaming export of the draft history to CSV, JSONL or a Markdown report.
+
+History records come from core.iter_draft_history() one line at a time and
+output is written in chunks of at most CHUNK_ROWS lines, so memory stays
+constant however long the league has run. Team and position names are the
+i18n display names of the language active when the HistoryExport is created
+(captured up front, so an export running in a background thread is not affected
+by a language switch); each season's players are in the same collation order the
+CLI and GUI show.
+
+    python main.py export history.csv
+    python main.py export history.md --lang en
+"""
+
+import csv
+import io
+import json
+import os
+
+from core import iter_draft_history
+from i18n import t, player_sort_key
+
+FORMATS = ('csv', 'jsonl', 'md')
+CHUNK_ROWS = 1000
+COLUMNS = ('sim_year', 'drafted_year', 'teams', 'positions')
+_EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.md': 'md', '.markdown': 'md'}
+
+
+def format_for_path(path, default='csv'):
+    """Export format implied by path's extension (default when unknown)."""
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+
+class HistoryExport:
+    """
+    One export of the draft history in fmt (see FORMATS). Display names, headers and
+    the player order are captured when it is created, so write() can run in a worker
+    thread. history defaults to streaming the persisted history.
+    """
+
+    def __init__(self, fmt='csv', history=None):
+        if fmt not in _WRITERS:
+            raise ValueError(f"unknown export format {fmt!r}")
+        self.fmt = fmt
+        self.history = history
+        self.rows = 0
+        self._teams = t('teams')
+        self._positions = t('positions')
+        self._player_key = player_sort_key()
+        self._headers = [t('history_col_' + column) for column in COLUMNS]
+        self._title = t('export_md_title')
+
+    def iter_rows(self):
+        """(sim_year, drafted_year, [(team, team name, position, position name), ...]) per season."""
+        for entry in iter_draft_history() if self.history is None else self.history:
+            players = [(team, self._teams.get(team, team), position, self._positions.get(position, position))
+                       for team, position in sorted(entry['players'], key=self._player_key)]
+            self.rows += 1
+            yield entry['sim_year'], entry['drafted_year'], players
+
+    def lines(self):
+        return _WRITERS[self.fmt](self, self.iter_rows())
+
+    def write(self, out, chunk_rows=CHUNK_ROWS):
+        """Write to the text stream out, chunk_rows lines per write. Returns the number of seasons written."""
+        self.rows = 0
+        chunk = []
+        for line in self.lines():
+            chunk.append(line)
+            if len(chunk) >= chunk_rows:
+                out.write(''.join(chunk))
+                chunk.clear()
+        if chunk:
+            out.write(''.join(chunk))
+        return self.rows
+
+    def write_to_path(self, path, chunk_rows=CHUNK_ROWS):
+        # utf-8-sig so spreadsheet apps detect the encoding of Chinese names in CSV
+        encoding = 'utf-8-sig' if self.fmt == 'csv' else 'utf-8'
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            return self.write(f, chunk_rows)
+
+
+def _names(players, index):
+    return ", ".join(player[index] for player in players)
+
+
+def _csv_lines(export, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(export._headers)
+    yield buffer.getvalue()
+    for sim_year, drafted_year, players in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow([sim_year, drafted_year, _names(players, 1), _names(players, 3)])
+        yield buffer.getvalue()
+
+
+def _jsonl_lines(export, rows):
+    for sim_year, drafted_year, players in rows:
+        record = {
+            'sim_year': sim_year,
+            'drafted_year': drafted_year,
+            'players': [{'team': team, 'team_name': team_name, 'position': position, 'position_name': position_name}
+                        for team, team_name, position, position_name in players],
+        }
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _md_cell(text):
+    return str(text).replace('|', '\\|')
+
+
+def _md_lines(export, rows):
+    yield f"# {export._title}\n\n"
+    yield "| " + " | ".join(export._headers) + " |\n"
+    yield "|" + "---|" * len(COLUMNS) + "\n"
+    for sim_year, drafted_year, players in rows:
+        cells = [sim_year, drafted_year, _names(players, 1), _names(players, 3)]
+        yield "| " + " | ".join(_md_cell(cell) for cell in cells) + " |\n"
+
+
+_WRITERS = {'csv': _csv_lines, 'jsonl': _jsonl_lines, 'md': _md_lines}
+
+
+def export_history(out, fmt='csv', history=None, chunk_rows=CHUNK_ROWS):
+    """Write the history to the text stream out in fmt. Returns the number of seasons written."""
+    return HistoryExport(fmt, history).write(out, chunk_rows)
+
+
+def export_to_path(path, fmt=None, history=None, chunk_rows=CHUNK_ROWS):
+    """export_history() into a file; fmt defaults to the one implied by the extension."""
+    return HistoryExport(fmt or format_for_path(path), history).write_to_path(path, chunk_rows)
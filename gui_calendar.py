@@ -0,0 +1,128 @@
+"""
+Draft calendar tab for the GUI: the planned draft year for each upcoming season.
+The calendar itself lives in core (draft_calendar.json); reading it repairs it
+against the current league state, so this tab only renders and plans.
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from core import (load_draft_calendar, plan_draft_calendar, clear_draft_calendar, draft_calendar_stats,
+                  CALENDAR_STRATEGIES, CALENDAR_RANDOM)
+from i18n import t
+
+
+class DraftCalendarView(ttk.Frame):
+    DEFAULT_SEASONS = 10
+    COLUMNS = ("sim_year", "year", "note")
+
+    def __init__(self, parent, on_change=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.on_change = on_change
+        self.setup_ui()
+
+    def setup_ui(self):
+        control_frame = ttk.Frame(self)
+        control_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+
+        self.seasons_label = ttk.Label(control_frame, text=t("calendar_seasons"))
+        self.seasons_label.grid(row=0, column=0, padx=(0, 2))
+        self.seasons_var = tk.StringVar(value=str(self.DEFAULT_SEASONS))
+        ttk.Spinbox(control_frame, from_=1, to=200, textvariable=self.seasons_var, width=5).grid(
+            row=0, column=1, padx=(0, 8))
+
+        self.seed_label = ttk.Label(control_frame, text=t("calendar_seed"))
+        self.seed_label.grid(row=0, column=2, padx=(0, 2))
+        self.seed_var = tk.StringVar()
+        ttk.Entry(control_frame, textvariable=self.seed_var, width=10).grid(row=0, column=3, padx=(0, 8))
+
+        self.strategy_label = ttk.Label(control_frame, text=t("calendar_strategy"))
+        self.strategy_label.grid(row=0, column=4, padx=(0, 2))
+        self.strategy_var = tk.StringVar()
+        self.strategy_combo = ttk.Combobox(control_frame, textvariable=self.strategy_var,
+                                           width=12, state="readonly")
+        self.strategy_combo.grid(row=0, column=5, padx=(0, 8))
+        self._strategy = CALENDAR_RANDOM
+        self.strategy_combo.bind("<<ComboboxSelected>>", self._on_strategy_selected)
+
+        self.randomness_label = ttk.Label(control_frame, text=t("calendar_randomness"))
+        self.randomness_label.grid(row=0, column=6, padx=(0, 2))
+        self.randomness_var = tk.StringVar(value="0")
+        ttk.Spinbox(control_frame, from_=0, to=1, increment=0.1, textvariable=self.randomness_var,
+                    width=5).grid(row=0, column=7, padx=(0, 8))
+
+        self.plan_btn = ttk.Button(control_frame, text=t("btn_plan_calendar"), command=self.plan)
+        self.plan_btn.grid(row=0, column=8, padx=(0, 5))
+        self.clear_btn = ttk.Button(control_frame, text=t("btn_clear_calendar"), command=self.clear)
+        self.clear_btn.grid(row=0, column=9)
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings", height=12)
+        self.tree.column("sim_year", width=100, anchor=tk.CENTER, stretch=False)
+        self.tree.column("year", width=100, anchor=tk.CENTER, stretch=False)
+        self.tree.column("note", width=300)
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.summary_label = ttk.Label(self, text="")
+        self.summary_label.grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.refresh_text()
+
+    def refresh_text(self):
+        self.seasons_label.config(text=t("calendar_seasons"))
+        self.seed_label.config(text=t("calendar_seed"))
+        self.strategy_label.config(text=t("calendar_strategy"))
+        self.randomness_label.config(text=t("calendar_randomness"))
+        # Combobox values are display names; the selected strategy survives language switches
+        self.strategy_combo["values"] = [t("calendar_strategy_" + strategy) for strategy in CALENDAR_STRATEGIES]
+        self.strategy_var.set(t("calendar_strategy_" + self._strategy))
+        self.plan_btn.config(text=t("btn_plan_calendar"))
+        self.clear_btn.config(text=t("btn_clear_calendar"))
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=t("calendar_col_" + column))
+        self.refresh()
+
+    def refresh(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        calendar = load_draft_calendar()
+        if calendar is None:
+            self.summary_label.config(text=t("calendar_empty"))
+            return
+        for entry in calendar.entries:
+            note = t("calendar_auto_reset") if entry.get('auto_reset') else ""
+            self.tree.insert("", tk.END, values=(entry['sim_year'], entry['year'], note))
+        self.summary_label.config(text=t("calendar_summary", count=len(calendar.entries), seed=calendar.seed,
+                                         strategy=t("calendar_strategy_" + calendar.strategy),
+                                         **draft_calendar_stats(calendar)))
+
+    def _on_strategy_selected(self, event=None):
+        self._strategy = CALENDAR_STRATEGIES[self.strategy_combo.current()]
+
+    def plan(self):
+        try:
+            seasons = int(self.seasons_var.get())
+            seed_text = self.seed_var.get().strip()
+            plan_draft_calendar(seasons, int(seed_text) if seed_text else None,
+                                self._strategy, float(self.randomness_var.get()))
+        except ValueError as e:
+            messagebox.showerror(t("err_calendar_title"), t("err_calendar", error=str(e)))
+            return
+        self._changed()
+
+    def clear(self):
+        clear_draft_calendar()
+        self._changed()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+        else:
+            self.refresh()
@@ -0,0 +1,213 @@
+"""
+Availability heatmap for the GUI: historical draft years (rows) against sim
+seasons (columns). Cells are created lazily as they scroll into view, and a
+refresh only recolors the cells whose status actually changed.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from core import (
+    get_current_year, load_draft_weights, load_draft_history, load_history_timeline, year_status,
+    COOL_DOWN_PERIOD, EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR,
+    YEAR_AVAILABLE, YEAR_IN_WINDOW, YEAR_COOLING, YEAR_USED,
+)
+from i18n import t
+
+STATUS_COLORS = {
+    YEAR_AVAILABLE: "#66bb6a",
+    YEAR_IN_WINDOW: "#bdbdbd",
+    YEAR_COOLING: "#ffb74d",
+    YEAR_USED: "#e53935",
+}
+
+
+class AvailabilityHeatmap(ttk.Frame):
+    CELL = 12
+    LABEL_WIDTH = 40
+    LABEL_HEIGHT = 20
+    HORIZON = 40
+
+    def __init__(self, parent, first_year=EARLIEST_DRAFT_YEAR, last_year=LATEST_HISTORICAL_DRAFT_YEAR,
+                 horizon=HORIZON, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.first_year = first_year
+        self.last_year = last_year
+        self.horizon = horizon
+
+        self.first_season = None
+        self.last_season = None
+        self.current_year = None
+        self._timeline = None
+        self._uses = {}
+        self._resets = []
+        self._current_last_used = {}
+        self._columns = {}           # season -> {year: [item id, status]}
+        self._current_marker = None
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.canvas = tk.Canvas(self, background="white", highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.x_scroll = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.x_scroll.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.y_scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.y_scroll.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.canvas.configure(xscrollcommand=self._on_x_scroll, yscrollcommand=self.y_scroll.set)
+        self.canvas.bind("<Configure>", lambda event: self._draw_visible())
+
+        legend = ttk.Frame(self)
+        legend.grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        self.legend_labels = {}
+        for i, status in enumerate(STATUS_COLORS):
+            swatch = tk.Canvas(legend, width=self.CELL, height=self.CELL, highlightthickness=0,
+                               background=STATUS_COLORS[status])
+            swatch.grid(row=0, column=i * 2, padx=(0, 3))
+            label = ttk.Label(legend, text=t("heatmap_" + status, years=COOL_DOWN_PERIOD))
+            label.grid(row=0, column=i * 2 + 1, padx=(0, 10))
+            self.legend_labels[status] = label
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+    def refresh_text(self):
+        for status, label in self.legend_labels.items():
+            label.config(text=t("heatmap_" + status, years=COOL_DOWN_PERIOD))
+
+    def refresh(self, weights=None, history=None):
+        """
+        Re-read state and recolor changed cells.
+        Past seasons come from the history timeline, which applies manual resets and
+        auto-resets; the current and future seasons use the live last_used_year values.
+        """
+        previous_year = self.current_year
+        self.current_year = get_current_year()
+        if weights is None:
+            weights = load_draft_weights()
+        if history is None:
+            history = load_draft_history()
+
+        current_last_used = {year: data['last_used_year'] for year, data in weights.items()}
+        first_season = min([self.current_year] + [entry['sim_year'] for entry in history])
+        self._timeline = load_history_timeline()
+        uses = {year: self._timeline.uses(year) for year in range(self.first_year, self.last_year + 1)}
+
+        # Past columns only change for years whose use history changed, or everywhere
+        # when the resets changed; columns from the earlier of the old/new current
+        # season onwards follow the live weights.
+        if self._timeline.resets != self._resets:
+            dirty_years = set(uses)
+        else:
+            dirty_years = {year for year in uses
+                           if uses[year] != self._uses.get(year)
+                           or current_last_used.get(year) != self._current_last_used.get(year)}
+        boundary = self.current_year if previous_year is None else min(previous_year, self.current_year)
+        self._uses = uses
+        self._resets = list(self._timeline.resets)
+        self._current_last_used = current_last_used
+
+        last_season = self.current_year + self.horizon
+        if (first_season, last_season) != (self.first_season, self.last_season):
+            self._set_season_range(first_season, last_season)
+
+        for season, cells in self._columns.items():
+            years = cells.keys() if season >= boundary else dirty_years
+            for year in years:
+                cell = cells[year]
+                new_status = self._cell_status(year, season)
+                if new_status != cell[1]:
+                    self.canvas.itemconfig(cell[0], fill=STATUS_COLORS[new_status])
+                    cell[1] = new_status
+
+        self._move_current_marker()
+        self._draw_visible()
+
+    def _cell_status(self, year, season):
+        if season >= self.current_year:
+            return year_status(year, season, self._current_last_used.get(year))
+        return self._timeline.season_status(year, season)
+
+    def _set_season_range(self, first_season, last_season):
+        """
+        Cells keep their position relative to first_season, so moving it redraws everything;
+        a smaller last_season (after an undo or reset) only drops the columns past the new end.
+        """
+        if first_season != self.first_season:
+            self.canvas.delete("all")
+            self._columns.clear()
+            self._current_marker = None
+            self._draw_year_labels()
+        else:
+            for season in [season for season in self._columns if season > last_season]:
+                self.canvas.delete(self._column_tag(season))
+                del self._columns[season]
+        self.first_season = first_season
+        self.last_season = last_season
+
+        width = self.LABEL_WIDTH + (last_season - first_season + 1) * self.CELL
+        height = self.LABEL_HEIGHT + (self.last_year - self.first_year + 1) * self.CELL
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+    def _draw_year_labels(self):
+        for year in range(self.first_year, self.last_year + 1, 5):
+            y = self._row_y(year) + self.CELL / 2
+            self.canvas.create_text(self.LABEL_WIDTH - 4, y, text=str(year), anchor=tk.E,
+                                    font=('Arial', 7))
+
+    def _row_y(self, year):
+        return self.LABEL_HEIGHT + (year - self.first_year) * self.CELL
+
+    def _column_x(self, season):
+        return self.LABEL_WIDTH + (season - self.first_season) * self.CELL
+
+    def _visible_seasons(self):
+        if self.first_season is None:
+            return range(0)
+        left = self.canvas.canvasx(0)
+        right = self.canvas.canvasx(self.canvas.winfo_width())
+        first = self.first_season + max(0, int((left - self.LABEL_WIDTH) // self.CELL))
+        last = self.first_season + int((right - self.LABEL_WIDTH) // self.CELL) + 1
+        return range(first, min(last, self.last_season) + 1)
+
+    def _draw_visible(self):
+        for season in self._visible_seasons():
+            if season not in self._columns:
+                self._draw_column(season)
+
+    @staticmethod
+    def _column_tag(season):
+        return "season%d" % season
+
+    def _draw_column(self, season):
+        x = self._column_x(season)
+        tag = self._column_tag(season)
+        if (season - self.first_season) % 10 == 0:
+            self.canvas.create_text(x, self.LABEL_HEIGHT - 4, text=str(season), anchor=tk.SW,
+                                    font=('Arial', 7), tags=tag)
+        cells = {}
+        for year in range(self.first_year, self.last_year + 1):
+            status = self._cell_status(year, season)
+            y = self._row_y(year)
+            item = self.canvas.create_rectangle(x, y, x + self.CELL, y + self.CELL,
+                                                fill=STATUS_COLORS[status], outline="white", tags=tag)
+            cells[year] = [item, status]
+        self._columns[season] = cells
+        if self._current_marker is not None:
+            self.canvas.tag_raise(self._current_marker)
+
+    def _move_current_marker(self):
+        x = self._column_x(self.current_year)
+        y0 = self.LABEL_HEIGHT
+        y1 = self._row_y(self.last_year + 1)
+        if self._current_marker is None:
+            self._current_marker = self.canvas.create_rectangle(x, y0, x + self.CELL, y1,
+                                                                outline="black", width=2)
+        else:
+            self.canvas.coords(self._current_marker, x, y0, x + self.CELL, y1)
+        self.canvas.tag_raise(self._current_marker)
+
+    def _on_x_scroll(self, first, last):
+        self.x_scroll.set(first, last)
+        self._draw_visible()
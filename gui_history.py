@@ -0,0 +1,328 @@
+"""
+Draft history browser for the GUI.
+The Treeview holds a fixed pool of rows, as many as fit on screen; scrolling
+rebinds them to another slice of the filtered, sorted view, so it stays
+responsive however many seasons of history there are. A single new (or undone)
+draft is inserted into (or removed from) the view in place, keeping the scroll
+position, instead of re-reading and re-sorting the whole history.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from core import load_draft_history, filter_draft_history, NBA_TEAMS, POSITIONS, LEAGUE
+from i18n import t, get_language, player_sort_key, sort_ranks
+
+
+class HistoryBrowser(ttk.Frame):
+    MIN_ROWS = 12       # row pool size until the Treeview has been laid out
+    WHEEL_ROWS = 3
+    COLUMNS = ("sim_year", "drafted_year", "teams", "positions")
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._history = []
+        self._view = []         # filtered entries, always in ascending sort order
+        self._filters = {}
+        self._offset = 0        # display index of the first pooled row
+        self._rows = self.MIN_ROWS
+        self._fitted = False
+        self._pool = []         # Treeview item ids, rebound on every scroll
+        self._selected = None   # selected history entry
+        self._sort_column = "sim_year"
+        self._sort_reverse = True
+        self._team_filter = None
+        self._position_filter = None
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        # Filter row
+        filter_frame = ttk.Frame(self)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+
+        self.sim_year_label = ttk.Label(filter_frame, text=t("history_filter_sim_year"))
+        self.sim_year_label.grid(row=0, column=0, padx=(0, 2))
+        self.sim_year_var = tk.StringVar()
+        sim_year_entry = ttk.Entry(filter_frame, textvariable=self.sim_year_var, width=6)
+        sim_year_entry.grid(row=0, column=1, padx=(0, 8))
+        sim_year_entry.bind("<Return>", self.apply_filters)
+
+        self.drafted_year_label = ttk.Label(filter_frame, text=t("history_filter_drafted_year"))
+        self.drafted_year_label.grid(row=0, column=2, padx=(0, 2))
+        self.drafted_year_var = tk.StringVar()
+        drafted_year_entry = ttk.Entry(filter_frame, textvariable=self.drafted_year_var, width=6)
+        drafted_year_entry.grid(row=0, column=3, padx=(0, 8))
+        drafted_year_entry.bind("<Return>", self.apply_filters)
+
+        self.team_label = ttk.Label(filter_frame, text=t("history_filter_team"))
+        self.team_label.grid(row=0, column=4, padx=(0, 2))
+        self.team_var = tk.StringVar()
+        self.team_combo = ttk.Combobox(filter_frame, textvariable=self.team_var,
+                                       width=12, state="readonly")
+        self.team_combo.grid(row=0, column=5, padx=(0, 8))
+        self.team_combo.bind("<<ComboboxSelected>>", self.apply_filters)
+
+        self.position_label = ttk.Label(filter_frame, text=t("history_filter_position"))
+        self.position_label.grid(row=0, column=6, padx=(0, 2))
+        self.position_var = tk.StringVar()
+        self.position_combo = ttk.Combobox(filter_frame, textvariable=self.position_var,
+                                           width=10, state="readonly")
+        self.position_combo.grid(row=0, column=7, padx=(0, 8))
+        self.position_combo.bind("<<ComboboxSelected>>", self.apply_filters)
+
+        self.clear_btn = ttk.Button(filter_frame, text=t("history_filter_clear"),
+                                    command=self.clear_filters)
+        self.clear_btn.grid(row=0, column=8)
+
+        # Table: the scrollbar drives self._offset, the Treeview itself never scrolls
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings", height=self.MIN_ROWS,
+                                 selectmode="browse")
+        for column in self.COLUMNS:
+            self.tree.heading(column, command=lambda c=column: self.sort_by(c))
+        self.tree.column("sim_year", width=80, anchor=tk.CENTER, stretch=False)
+        self.tree.column("drafted_year", width=80, anchor=tk.CENTER, stretch=False)
+        self.tree.column("teams", width=320)
+        self.tree.column("positions", width=200)
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+
+        self.tree.bind("<Configure>", self._fit_rows)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self._scroll_by(-self.WHEEL_ROWS if e.delta > 0 else self.WHEEL_ROWS))
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-self.WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(self.WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._rows))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._rows))
+        self.tree.bind("<Home>", lambda e: self._move_selection(-len(self._view)))
+        self.tree.bind("<End>", lambda e: self._move_selection(len(self._view)))
+
+        self.count_label = ttk.Label(self, text="")
+        self.count_label.grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.refresh_text()
+
+    def refresh_text(self):
+        self.sim_year_label.config(text=t("history_filter_sim_year"))
+        self.drafted_year_label.config(text=t("history_filter_drafted_year"))
+        self.team_label.config(text=t("history_filter_team"))
+        self.position_label.config(text=t("history_filter_position"))
+        self.clear_btn.config(text=t("history_filter_clear"))
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=t("history_col_" + column))
+
+        # Combobox values are display names; the selected IDs survive language switches
+        teams_dict = t("teams")
+        positions_dict = t("positions")
+        self.team_combo["values"] = [""] + [teams_dict.get(team, team) for team in NBA_TEAMS]
+        self.position_combo["values"] = [""] + [positions_dict.get(pos, pos) for pos in POSITIONS]
+        self.team_var.set(teams_dict.get(self._team_filter, "") if self._team_filter else "")
+        self.position_var.set(positions_dict.get(self._position_filter, "") if self._position_filter else "")
+
+        # team/position order follows the display names of the new language
+        if self._sort_column in ("teams", "positions"):
+            self._view.sort(key=self._sort_key(self._sort_column))
+        self._render()
+
+    def refresh(self, history=None):
+        """
+        Show the persisted history (or history). One draft appended or undone since the
+        last refresh is applied to the view in place; any other change re-applies the
+        filters and sort, keeping the scroll position.
+        """
+        history = load_draft_history() if history is None else history
+        old, self._history = self._history, history
+        if len(history) == len(old) and (not old or history[-1] == old[-1]):
+            return
+        if len(history) == len(old) + 1 and (not old or history[-2] == old[-1]):
+            self._insert(history[-1])
+        elif len(history) == len(old) - 1 and (not history or history[-1] == old[-2]):
+            self._remove(old[-1])
+        else:
+            self._rebuild()
+
+    def clear_filters(self):
+        self.sim_year_var.set("")
+        self.drafted_year_var.set("")
+        self.team_var.set("")
+        self.position_var.set("")
+        self.apply_filters()
+
+    def apply_filters(self, event=None):
+        self._team_filter = self._selected_id(self.team_var, self._team_choices())
+        self._position_filter = self._selected_id(self.position_var, self._position_choices())
+        self._filters = {
+            'sim_year': self._int_or_none(self.sim_year_var.get()),
+            'drafted_year': self._int_or_none(self.drafted_year_var.get()),
+            'team': self._team_filter,
+            'position': self._position_filter,
+        }
+        self._offset = 0
+        self._rebuild()
+
+    def sort_by(self, column):
+        if column == self._sort_column:
+            # the view stays ascending; only the display order flips
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_column = column
+            self._sort_reverse = False
+            self._view.sort(key=self._sort_key(column))
+        self._offset = 0
+        self._render()
+
+    def _rebuild(self):
+        self._view = filter_draft_history(self._history, **self._filters)
+        self._view.sort(key=self._sort_key(self._sort_column))
+        self._render()
+
+    def _insert(self, entry):
+        if not filter_draft_history([entry], **self._filters):
+            return
+        key = self._sort_key(self._sort_column)
+        value = key(entry)
+        low, high = 0, len(self._view)
+        while low < high:
+            mid = (low + high) // 2
+            if value < key(self._view[mid]):
+                high = mid
+            else:
+                low = mid + 1
+        self._view.insert(low, entry)
+        # keep the rows on screen in place when the new one lands above them
+        if self._display_index(low) < self._offset:
+            self._offset += 1
+        self._render()
+
+    def _remove(self, entry):
+        for index in range(len(self._view) - 1, -1, -1):
+            if self._view[index] is entry:
+                if self._display_index(index) < self._offset:
+                    self._offset -= 1
+                del self._view[index]
+                self._render()
+                return
+
+    def _display_index(self, index):
+        return len(self._view) - 1 - index if self._sort_reverse else index
+
+    def _entry_at(self, display_index):
+        return self._view[self._display_index(display_index)]
+
+    def _render(self):
+        """Bind the row pool to the view's rows [offset, offset + rows)."""
+        self._offset = max(0, min(self._offset, len(self._view) - self._rows))
+        end = min(self._offset + self._rows, len(self._view))
+        count = end - self._offset
+        while len(self._pool) > count:
+            self.tree.delete(self._pool.pop())
+        while len(self._pool) < count:
+            self._pool.append(self.tree.insert("", tk.END))
+
+        teams_dict = t("teams")
+        positions_dict = t("positions")
+        player_key = player_sort_key()
+        selected = []
+        for iid, display_index in zip(self._pool, range(self._offset, end)):
+            entry = self._entry_at(display_index)
+            players = sorted(entry['players'], key=player_key)
+            teams = ", ".join(teams_dict.get(team, team) for team, _ in players)
+            positions = ", ".join(positions_dict.get(pos, pos) for _, pos in players)
+            self.tree.item(iid, values=(entry['sim_year'], entry['drafted_year'], teams, positions))
+            if entry is self._selected:
+                selected.append(iid)
+        self.tree.selection_set(selected)
+
+        total = len(self._view)
+        self.scrollbar.set(self._offset / total if total else 0.0, end / total if total else 1.0)
+        self.count_label.config(text=t("history_count", first=self._offset + 1 if count else 0,
+                                       last=end, total=total))
+        if not self._fitted and count:
+            self.after_idle(self._fit_rows)
+
+    def _fit_rows(self, event=None):
+        # size the pool to the rows that fit, measured from the first row's bounding box
+        bbox = self.tree.bbox(self._pool[0]) if self._pool else ""
+        if not bbox:
+            return
+        self._fitted = True
+        _, top, _, row_height = bbox
+        rows = max(1, (self.tree.winfo_height() - top) // max(1, row_height))
+        if rows != self._rows:
+            self._rows = rows
+            self._render()
+
+    def _scroll_by(self, rows):
+        self._scroll_to(self._offset + rows)
+        return "break"
+
+    def _scroll_to(self, offset):
+        offset = max(0, min(offset, len(self._view) - self._rows))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * len(self._view)))
+        elif action == "scroll":
+            self._scroll_by(int(amount) * (self._rows if unit == "pages" else 1))
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._pool:
+            self._selected = self._entry_at(self._offset + self._pool.index(selection[0]))
+
+    def _move_selection(self, step):
+        if not self._view:
+            return "break"
+        selection = self.tree.selection()
+        if selection and selection[0] in self._pool:
+            index = self._offset + self._pool.index(selection[0]) + step
+        else:
+            # nothing selected on screen: arrows start at the first visible row, page keys move from it
+            index = self._offset + (step if abs(step) > 1 else 0)
+        index = max(0, min(index, len(self._view) - 1))
+        self._selected = self._entry_at(index)
+        if index < self._offset:
+            self._offset = index
+        elif index >= self._offset + self._rows:
+            self._offset = index - self._rows + 1
+        self._render()
+        return "break"
+
+    @staticmethod
+    def _sort_key(column):
+        # team/position columns sort by the displayed names' collation ranks, not the IDs
+        if column in ("teams", "positions"):
+            ranks = sort_ranks(column)
+            part = 0 if column == "teams" else 1
+            unknown = len(ranks)
+            return lambda entry: sorted(ranks.get(player[part], unknown) for player in entry['players'])
+        return lambda entry: (entry[column], entry['sim_year'])
+
+    @staticmethod
+    def _team_choices():
+        return LEAGUE.ids_by_display_name("teams", get_language(), t("teams"))
+
+    @staticmethod
+    def _position_choices():
+        return LEAGUE.ids_by_display_name("positions", get_language(), t("positions"))
+
+    @staticmethod
+    def _selected_id(var, choices):
+        return choices.get(var.get()) or None
+
+    @staticmethod
+    def _int_or_none(text):
+        try:
+            return int(text.strip())
+        except ValueError:
+            return None
@@ -3,20 +3,34 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, simpledialog
+from tkinter import ttk, scrolledtext, messagebox, simpledialog, filedialog
 import os
+import sys
+import threading
 
 from core import (
-    get_current_year, save_current_year, increment_year,
-    load_draft_weights, save_draft_weights, reset_weights,
-    is_all_weights_zero, PseudoRandomPicker, random_lose_player,
-    NBA_TEAMS, POSITIONS, COOL_DOWN_PERIOD, NUM_PLAYERS_TO_LOSE,
-    INITIAL_SIMULATION_YEAR,
+    get_current_year, reset_to_year,
+    load_draft_weights, perform_draft, load_draft_history,
+    get_state_version, undo_last_draft, redo_draft, can_undo, can_redo,
+    COOL_DOWN_PERIOD, NUM_PLAYERS_TO_LOSE,
+    INITIAL_SIMULATION_YEAR, LEAGUE_PROBLEMS,
 )
-from i18n import t, set_language, get_language, SUPPORTED_LANGUAGES
+from i18n import t, set_language, get_language, sort_players, SUPPORTED_LANGUAGES
+import profiling
+import hooks
+from profiling import profiled_action
+from gui_history import HistoryBrowser
+from gui_heatmap import AvailabilityHeatmap
+from gui_search import DraftClassSearch
+from gui_calendar import DraftCalendarView
+from draftclasses import render_draft_class
+from export import HistoryExport, format_for_path
 
 
 class DraftApp:
+    STATE_POLL_MS = 1000
+    EXPORT_POLL_MS = 100
+
     def __init__(self, root):
         self.root = root
         self.root.title(t("app_title"))
@@ -25,10 +39,29 @@ class DraftApp:
         style = ttk.Style()
         style.theme_use('clam')
 
+        self.state_version = None
+        self._export_thread = None
+
         self.setup_ui()
         self.update_display()
+        self.root.after(self.STATE_POLL_MS, self.poll_state_version)
+
+    def poll_state_version(self):
+        """Refresh when another process (e.g. the CLI) has changed the league state."""
+        try:
+            if get_state_version() != self.state_version:
+                self.update_display()
+        finally:
+            self.root.after(self.STATE_POLL_MS, self.poll_state_version)
 
     def setup_ui(self):
+        # Menu bar
+        self.menubar = tk.Menu(self.root)
+        self.file_menu = tk.Menu(self.menubar, tearoff=0)
+        self.file_menu.add_command(label=t("menu_export"), command=self.export_history)
+        self.menubar.add_cascade(label=t("menu_file"), menu=self.file_menu)
+        self.root.config(menu=self.menubar)
+
         # Main frame
         self.main_frame = ttk.Frame(self.root, padding="10")
         self.main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -89,9 +122,20 @@ class DraftApp:
                                    command=self.quit_app, width=15)
         self.quit_btn.grid(row=0, column=3, padx=5, pady=5)
 
-        # Result frame
-        self.result_frame = ttk.LabelFrame(self.main_frame, text=t("draft_result_frame"), padding="10")
-        self.result_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        self.undo_btn = ttk.Button(button_frame, text=t("btn_undo"),
+                                   command=self.undo_draft, width=15)
+        self.undo_btn.grid(row=1, column=0, padx=5, pady=5)
+
+        self.redo_btn = ttk.Button(button_frame, text=t("btn_redo"),
+                                   command=self.redo_draft, width=15)
+        self.redo_btn.grid(row=1, column=1, padx=5, pady=5)
+
+        # Result / history tabs
+        self.notebook = ttk.Notebook(self.main_frame)
+        self.notebook.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+
+        self.result_frame = ttk.LabelFrame(self.notebook, text=t("draft_result_frame"), padding="10")
+        self.notebook.add(self.result_frame, text=t("tab_result"))
 
         self.result_text = scrolledtext.ScrolledText(self.result_frame,
                                                      height=15,
@@ -99,6 +143,18 @@ class DraftApp:
                                                      font=('Courier New', 10))
         self.result_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
+        self.history_browser = HistoryBrowser(self.notebook, padding="10")
+        self.notebook.add(self.history_browser, text=t("tab_history"))
+
+        self.heatmap = AvailabilityHeatmap(self.notebook, padding="10")
+        self.notebook.add(self.heatmap, text=t("tab_heatmap"))
+
+        self.search = DraftClassSearch(self.notebook, padding="10")
+        self.notebook.add(self.search, text=t("tab_search"))
+
+        self.calendar_view = DraftCalendarView(self.notebook, on_change=self.update_display, padding="10")
+        self.notebook.add(self.calendar_view, text=t("tab_calendar"))
+
         # Years info
         self.years_frame = ttk.LabelFrame(self.main_frame, text=t("years_info_frame"), padding="10")
         self.years_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -121,6 +177,8 @@ class DraftApp:
 
     def refresh_all_text(self):
         self.root.title(t("app_title"))
+        self.menubar.entryconfig(0, label=t("menu_file"))
+        self.file_menu.entryconfig(0, label=t("menu_export"))
         self.title_label.config(text=t("app_title"))
         self.lang_label.config(text=t("language_label"))
         self.status_frame.config(text=t("status_frame"))
@@ -128,11 +186,24 @@ class DraftApp:
         self.view_years_btn.config(text=t("btn_view_years"))
         self.reset_all_btn.config(text=t("btn_reset_all"))
         self.quit_btn.config(text=t("btn_quit"))
+        self.undo_btn.config(text=t("btn_undo"))
+        self.redo_btn.config(text=t("btn_redo"))
         self.result_frame.config(text=t("draft_result_frame"))
+        self.notebook.tab(self.result_frame, text=t("tab_result"))
+        self.notebook.tab(self.history_browser, text=t("tab_history"))
+        self.notebook.tab(self.heatmap, text=t("tab_heatmap"))
+        self.notebook.tab(self.search, text=t("tab_search"))
+        self.notebook.tab(self.calendar_view, text=t("tab_calendar"))
+        self.history_browser.refresh_text()
+        self.heatmap.refresh_text()
+        self.search.refresh_text()
+        self.calendar_view.refresh_text()
         self.years_frame.config(text=t("years_info_frame"))
         self.update_display()
 
+    @profiled_action("update_display")
     def update_display(self):
+        self.state_version = get_state_version()
         current_year = get_current_year()
         self.year_label.config(text=t("sim_year", year=current_year))
 
@@ -156,65 +227,55 @@ class DraftApp:
 
         self.years_info.config(text=years_text)
 
+        history = load_draft_history()
+        self.history_browser.refresh(history)
+        self.heatmap.refresh(weights, history)
+        self.search.refresh(weights)
+        self.calendar_view.refresh()
+
+        self.undo_btn.config(state=tk.NORMAL if can_undo() else tk.DISABLED)
+        self.redo_btn.config(state=tk.NORMAL if can_redo() else tk.DISABLED)
+
+    @profiled_action("run_draft")
     def run_draft(self):
         try:
-            current_sim_year = get_current_year()
+            result = perform_draft()
 
-            draft_weights = load_draft_weights()
-
-            if is_all_weights_zero(draft_weights):
+            if result['auto_reset']:
                 messagebox.showinfo(t("auto_reset_title"), t("auto_reset"))
-                draft_weights = reset_weights()
-
-            available_years = [year for year, data in draft_weights.items() if data['available'] == 1]
 
-            if not available_years:
+            selected_year = result['selected_year']
+            if selected_year is None:
                 messagebox.showwarning(t("no_available_title"), t("no_available_msg"))
                 return
 
-            team_picker = PseudoRandomPicker(NBA_TEAMS)
-            position_picker = PseudoRandomPicker(POSITIONS)
-            year_picker = PseudoRandomPicker(available_years)
-
-            selected_year = year_picker.pick()
-
-            draft_weights[selected_year]['available'] = 0
-            draft_weights[selected_year]['last_used_year'] = current_sim_year
-            save_draft_weights(draft_weights)
-
-            selected_players = []
-            for _ in range(NUM_PLAYERS_TO_LOSE):
-                team, position = random_lose_player(team_picker, position_picker)
-                selected_players.append((team, position))
-
-            selected_players.sort(key=lambda x: x[0])
-
+            current_sim_year = result['sim_year']
             teams_dict = t("teams")
             positions_dict = t("positions")
 
             result_text = f"{t('draft_header')}\n"
-            result_text += f"{t('selected_year', year=selected_year)}\n\n"
+            result_text += f"{t('selected_year', year=selected_year)}\n"
+            result_text += f"{render_draft_class(selected_year)}\n\n"
             result_text += t('year_used_cooldown', year=selected_year, cooldown=COOL_DOWN_PERIOD,
                              available_year=current_sim_year + COOL_DOWN_PERIOD) + "\n\n"
 
             result_text += f"{t('players_header', count=NUM_PLAYERS_TO_LOSE)}\n"
-            for i, (team, position) in enumerate(selected_players):
+            for i, (team, position) in enumerate(sort_players(result['players'])):
                 team_display = teams_dict.get(team, team)
                 pos_display = positions_dict.get(position, position)
                 result_text += t('player_line', index=i+1, team=team_display,
                                  position=pos_display, team_en=team) + "\n"
 
-            new_sim_year = increment_year()
-            result_text += t('time_advance', year=new_sim_year) + "\n"
+            result_text += t('time_advance', year=result['new_sim_year']) + "\n"
 
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, result_text)
+            self.show_result(result_text)
 
             self.update_display()
 
         except Exception as e:
             messagebox.showerror(t("err_draft_title"), t("err_draft", error=str(e)))
 
+    @profiled_action("view_years")
     def view_available_years(self):
         try:
             weights = load_draft_weights()
@@ -244,12 +305,75 @@ class DraftApp:
 
             result_text += f"\n{t('year_summary_short', available=len(available_years), cooling=len(cooling_years))}"
 
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, result_text)
+            self.show_result(result_text)
 
         except Exception as e:
             messagebox.showerror(t("err_draft_title"), t("err_view_years", error=str(e)))
 
+    @profiled_action("undo_draft")
+    def undo_draft(self):
+        try:
+            entry = undo_last_draft()
+            if entry is None:
+                message = t("undo_nothing")
+            else:
+                message = t("undo_done", sim_year=entry['sim_year'], year=entry['drafted_year'])
+            self.show_result(message)
+            self.update_display()
+        except Exception as e:
+            messagebox.showerror(t("err_draft_title"), t("err_undo", error=str(e)))
+
+    @profiled_action("redo_draft")
+    def redo_draft(self):
+        try:
+            entry = redo_draft()
+            if entry is None:
+                message = t("redo_nothing")
+            else:
+                message = t("redo_done", sim_year=entry['sim_year'], year=entry['drafted_year'],
+                            new_year=entry['sim_year'] + 1)
+            self.show_result(message)
+            self.update_display()
+        except Exception as e:
+            messagebox.showerror(t("err_draft_title"), t("err_undo", error=str(e)))
+
+    def export_history(self):
+        """Export the draft history; the file is written in a worker thread so the window stays responsive."""
+        if self._export_thread is not None and self._export_thread.is_alive():
+            messagebox.showinfo(t("export_title"), t("export_running"))
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self.root, title=t("export_title"), defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Markdown", "*.md")])
+        if not path:
+            return
+        export = HistoryExport(format_for_path(path))
+        outcome = {}
+
+        def work():
+            try:
+                outcome['count'] = export.write_to_path(path)
+            except Exception as e:
+                outcome['error'] = e
+
+        self._export_thread = threading.Thread(target=work, daemon=True)
+        self._export_thread.start()
+        self.root.after(self.EXPORT_POLL_MS, self._check_export, path, outcome)
+
+    def _check_export(self, path, outcome):
+        # Tk may only be touched from this thread, so poll for the worker instead of calling back
+        if self._export_thread.is_alive():
+            self.root.after(self.EXPORT_POLL_MS, self._check_export, path, outcome)
+        elif 'error' in outcome:
+            messagebox.showerror(t("export_title"), t("err_export", error=str(outcome['error'])))
+        else:
+            messagebox.showinfo(t("export_title"), t("export_done", count=outcome['count'], path=path))
+
+    def show_result(self, text):
+        self.notebook.select(self.result_frame)
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, text)
+
     def reset_all(self):
         try:
             current_year = get_current_year()
@@ -268,8 +392,7 @@ class DraftApp:
             confirm_message = t("confirm_reset_body", current_year=current_year, reset_year=reset_year)
 
             if messagebox.askyesno(t("confirm_reset_title"), confirm_message):
-                weights = reset_weights()
-                save_current_year(reset_year)
+                weights = reset_to_year(reset_year)
 
                 messagebox.showinfo(t("reset_success_title"),
                                     t("reset_success_body", reset_year=reset_year))
@@ -284,8 +407,7 @@ class DraftApp:
                 else:
                     years_text += t("no_available_years")
 
-                self.result_text.delete(1.0, tk.END)
-                self.result_text.insert(tk.END, years_text)
+                self.show_result(years_text)
 
         except Exception as e:
             messagebox.showerror(t("err_draft_title"), t("err_reset", error=str(e)))
@@ -295,7 +417,20 @@ class DraftApp:
             self.root.destroy()
 
 def main():
+    if '--profile' in sys.argv[1:]:
+        profiling.enable()
+    failures = hooks.load_plugins()
+
     root = tk.Tk()
+    if LEAGUE_PROBLEMS or failures:
+        root.withdraw()
+        if LEAGUE_PROBLEMS:
+            messagebox.showwarning(t("err_league_title"), "\n".join(
+                t("err_league", error=error) for error in LEAGUE_PROBLEMS))
+        if failures:
+            messagebox.showwarning(t("err_hook_plugin_title"), "\n".join(
+                t("err_hook_plugin", name=name, error=error) for name, error in failures))
+        root.deiconify()
     app = DraftApp(root)
     root.mainloop()
 
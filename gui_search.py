@@ -0,0 +1,106 @@
+"""
+Draft class search for the GUI. Results update on every keystroke from the
+lazily built draftclasses.SearchIndex; "available years only" filters them with
+the same availability rules load_draft_weights() applies.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from core import load_draft_weights
+from draftclasses import search_index, first_picks_only
+from i18n import t
+
+
+class DraftClassSearch(ttk.Frame):
+    MAX_RESULTS = 500
+    COLUMNS = ("year", "pick", "player", "college", "position", "team")
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._available_years = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        search_frame = ttk.Frame(self)
+        search_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+
+        self.search_label = ttk.Label(search_frame, text=t("search_label"))
+        self.search_label.grid(row=0, column=0, padx=(0, 2))
+        self.query_var = tk.StringVar()
+        self.query_var.trace_add("write", lambda *args: self.run_search())
+        ttk.Entry(search_frame, textvariable=self.query_var, width=30).grid(row=0, column=1, padx=(0, 8))
+
+        self.available_only_var = tk.BooleanVar(value=False)
+        self.available_only_check = ttk.Checkbutton(search_frame, text=t("search_available_only"),
+                                                    variable=self.available_only_var, command=self.run_search)
+        self.available_only_check.grid(row=0, column=2)
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings", height=12)
+        self.tree.column("year", width=70, anchor=tk.CENTER, stretch=False)
+        self.tree.column("pick", width=60, anchor=tk.CENTER, stretch=False)
+        self.tree.column("player", width=200)
+        self.tree.column("college", width=200)
+        self.tree.column("position", width=120)
+        self.tree.column("team", width=120)
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.count_label = ttk.Label(self, text="")
+        self.count_label.grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        self.sample_label = ttk.Label(self, text="", foreground="gray")
+        self.sample_label.grid(row=3, column=0, sticky=tk.W)
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.refresh_text()
+
+    def refresh_text(self):
+        self.search_label.config(text=t("search_label"))
+        self.available_only_check.config(text=t("search_available_only"))
+        self.sample_label.config(text=t("search_sample_note") if first_picks_only() else "")
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=t("search_col_" + column))
+        self.run_search()
+
+    def refresh(self, weights=None):
+        """Pick up the live availability state (call after every draft, undo or reset)."""
+        self._available_years = self._available(weights)
+        if self.available_only_var.get():
+            self.run_search()
+
+    @staticmethod
+    def _available(weights=None):
+        weights = load_draft_weights() if weights is None else weights
+        return {year for year, data in weights.items() if data['available'] == 1}
+
+    def run_search(self):
+        query = self.query_var.get()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        if not query.strip():
+            self.count_label.config(text="")
+            return
+
+        years = None
+        if self.available_only_var.get():
+            if self._available_years is None:
+                self._available_years = self._available()
+            years = self._available_years
+        results = search_index().search(query, years=years, limit=self.MAX_RESULTS + 1)
+
+        teams_dict = t("teams")
+        positions_dict = t("positions")
+        for year, pick in results[:self.MAX_RESULTS]:
+            self.tree.insert("", tk.END, values=(year, pick.pick, pick.player, pick.college,
+                                                 positions_dict.get(pick.position, pick.position),
+                                                 teams_dict.get(pick.team, pick.team)))
+        if len(results) > self.MAX_RESULTS:
+            self.count_label.config(text=t("search_count_truncated", count=self.MAX_RESULTS))
+        else:
+            self.count_label.config(text=t("search_count", count=len(results)))
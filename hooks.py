@@ -0,0 +1,275 @@
+"""
+Post-draft hooks: callbacks for league events, run off the caller's thread.
+
+core.py emits an event after each state change:
+
+    draft_completed  sim_year, selected_year, players [(team, position), ...], auto_reset, new_sim_year
+    weights_reset    sim_year
+    year_reset       sim_year (the year the league was reset to)
+
+Callbacks receive the payload dict (with 'event' and 'time' added). Events go
+into a bounded queue drained by one background worker thread, so a slow hook
+(writing a shared spreadsheet, refreshing a stream overlay, notifying a bot)
+never adds latency to run_draft(). When nothing is registered, emit() returns
+immediately and no thread is started.
+
+When the queue is full the backpressure policy decides what happens:
+
+    drop_oldest  (default) discard the oldest queued event to make room
+    drop_newest  discard the event being emitted
+    block        wait up to block_timeout seconds for room, then discard it
+
+Per-hook call counts, errors and timings are in stats(). Plugins are modules
+listed in DRAFT_PICKER_HOOKS (comma separated) that define
+register_hooks(dispatcher); main.py and gui_main.py load them at startup.
+DRAFT_PICKER_HOOK_QUEUE and DRAFT_PICKER_HOOK_POLICY configure the default
+dispatcher. With profiling enabled the stats are printed to stderr at exit.
+"""
+
+import atexit
+import importlib
+import os
+import queue
+import sys
+import threading
+import time
+
+import profiling
+
+EVENT_DRAFT_COMPLETED = "draft_completed"
+EVENT_WEIGHTS_RESET = "weights_reset"
+EVENT_YEAR_RESET = "year_reset"
+EVENTS = (EVENT_DRAFT_COMPLETED, EVENT_WEIGHTS_RESET, EVENT_YEAR_RESET)
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_DROP_NEWEST = "drop_newest"
+POLICY_BLOCK = "block"
+POLICIES = (POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_BLOCK)
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_BLOCK_TIMEOUT = 0.5
+SHUTDOWN_TIMEOUT = 2.0
+
+_STOP = object()
+
+
+class HookStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_error = None
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': self.total_seconds * 1000,
+            'mean_ms': self.total_seconds * 1000 / self.calls if self.calls else 0.0,
+            'max_ms': self.max_seconds * 1000,
+            'last_error': self.last_error,
+        }
+
+
+class HookDispatcher:
+    def __init__(self, maxsize=DEFAULT_QUEUE_SIZE, policy=POLICY_DROP_OLDEST, block_timeout=DEFAULT_BLOCK_TIMEOUT):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown backpressure policy {policy!r}")
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize)
+        self._hooks = {event: [] for event in EVENTS}    # event -> [(name, callback), ...]
+        self._stats = {}                                  # (event, name) -> HookStats
+        self._lock = threading.Lock()
+        self._worker = None
+        self.emitted = 0
+        self.dropped = 0
+
+    def __repr__(self):
+        return f"HookDispatcher(policy={self.policy!r}, queued={self._queue.qsize()}, dropped={self.dropped})"
+
+    def register(self, event, callback, name=None):
+        """Call callback(payload) in the worker thread after each event; returns callback."""
+        if event not in self._hooks:
+            raise ValueError(f"unknown event {event!r}")
+        name = name or f"{callback.__module__}.{getattr(callback, '__qualname__', repr(callback))}"
+        with self._lock:
+            self._hooks[event] = self._hooks[event] + [(name, callback)]
+            self._stats.setdefault((event, name), HookStats())
+        return callback
+
+    def unregister(self, event, callback):
+        with self._lock:
+            self._hooks[event] = [(name, cb) for name, cb in self._hooks[event] if cb is not callback]
+
+    def has_hooks(self, event=None):
+        events = EVENTS if event is None else (event,)
+        return any(self._hooks[e] for e in events)
+
+    def emit(self, event, **payload):
+        """Queue event for the worker; never waits longer than block_timeout. Returns False if it was dropped."""
+        if not self._hooks[event]:
+            return True
+        payload['event'] = event
+        payload['time'] = time.time()
+        self._ensure_worker()
+        with self._lock:
+            self.emitted += 1
+        if self.policy == POLICY_BLOCK:
+            try:
+                self._queue.put(payload, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                return self._drop()
+        while True:
+            try:
+                self._queue.put_nowait(payload)
+                return True
+            except queue.Full:
+                if self.policy == POLICY_DROP_NEWEST:
+                    return self._drop()
+            # drop_oldest: make room and try again (the worker may have taken one meanwhile)
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._drop()
+            except queue.Empty:
+                pass
+
+    def _drop(self):
+        with self._lock:
+            self.dropped += 1
+        return False
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="draft-hooks", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            payload = self._queue.get()
+            try:
+                if payload is _STOP:
+                    return
+                self._dispatch(payload)
+            finally:
+                self._queue.task_done()
+
+    def _dispatch(self, payload):
+        event = payload['event']
+        for name, callback in self._hooks[event]:
+            stats = self._stats[(event, name)]
+            start = time.perf_counter()
+            try:
+                callback(dict(payload))
+            except Exception as e:
+                stats.errors += 1
+                stats.last_error = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - start
+            stats.calls += 1
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+
+    def flush(self, timeout=None):
+        """Wait until every queued event has been handled; returns False on timeout."""
+        if self._worker is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=SHUTDOWN_TIMEOUT):
+        """Handle what is queued (up to timeout seconds) and stop the worker."""
+        if self._worker is None or not self._worker.is_alive():
+            return
+        self.flush(timeout)
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._worker.join(timeout)
+
+    def stats(self):
+        """{'emitted', 'dropped', 'queued', 'hooks': {'event:name': HookStats.as_dict()}}"""
+        with self._lock:
+            hooks = {f"{event}:{name}": stats.as_dict() for (event, name), stats in self._stats.items()}
+        return {'emitted': self.emitted, 'dropped': self.dropped, 'queued': self._queue.qsize(), 'hooks': hooks}
+
+
+def format_stats(stats):
+    lines = [f"[hooks] emitted={stats['emitted']} dropped={stats['dropped']} queued={stats['queued']}"]
+    for name, hook in sorted(stats['hooks'].items()):
+        line = (f"  {name:<56} calls={hook['calls']:<6} errors={hook['errors']:<4} "
+                f"mean={hook['mean_ms']:.3f} ms max={hook['max_ms']:.3f} ms")
+        if hook['last_error']:
+            line += f" last error: {hook['last_error']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _default_dispatcher():
+    policy = os.environ.get("DRAFT_PICKER_HOOK_POLICY", POLICY_DROP_OLDEST).strip().lower()
+    try:
+        maxsize = int(os.environ.get("DRAFT_PICKER_HOOK_QUEUE", DEFAULT_QUEUE_SIZE))
+    except ValueError:
+        maxsize = DEFAULT_QUEUE_SIZE
+    return HookDispatcher(maxsize, policy if policy in POLICIES else POLICY_DROP_OLDEST)
+
+
+_dispatcher = _default_dispatcher()
+
+
+def get_dispatcher():
+    return _dispatcher
+
+
+def register(event, callback, name=None):
+    return _dispatcher.register(event, callback, name)
+
+
+def unregister(event, callback):
+    _dispatcher.unregister(event, callback)
+
+
+def emit(event, **payload):
+    return _dispatcher.emit(event, **payload)
+
+
+def flush(timeout=None):
+    return _dispatcher.flush(timeout)
+
+
+def stats():
+    return _dispatcher.stats()
+
+
+def load_plugins(names=None):
+    """
+    Import each plugin module (default: DRAFT_PICKER_HOOKS) and call its register_hooks(dispatcher).
+    Returns [(module name, error message), ...] for the plugins that failed; the rest stay loaded.
+    """
+    if names is None:
+        names = [name.strip() for name in os.environ.get("DRAFT_PICKER_HOOKS", "").split(",") if name.strip()]
+    failures = []
+    for name in names:
+        try:
+            importlib.import_module(name).register_hooks(_dispatcher)
+        except Exception as e:
+            failures.append((name, f"{type(e).__name__}: {e}"))
+    return failures
+
+
+@atexit.register
+def _shutdown():
+    _dispatcher.close()
+    if profiling.is_enabled() and _dispatcher.has_hooks():
+        print(format_stats(_dispatcher.stats()), file=sys.stderr)
@@ -7,11 +7,13 @@ import json
 import os
 import locale
 
-from core import DATA_DIR
+from core import DATA_DIR, LEAGUE
+from profiling import instrument
 
 SETTINGS_FILE = str(DATA_DIR / "settings.json")
 
 SUPPORTED_LANGUAGES = ["zh", "en"]
+NAME_TABLES = ("teams", "positions")   # resolved through the active league profile
 
 _current_language = "zh"
 
@@ -24,8 +26,12 @@ TRANSLATIONS = {
         "menu_reset_all": "2. 重置所有年份",
         "menu_view_years": "3. 查看可用年份",
         "menu_reset_year": "4. 重置当前年份到{reset_year}",
+        "menu_undo": "5. 撤销上一次选秀",
+        "menu_redo": "6. 重做被撤销的选秀",
+        "menu_fairness": "7. 查看各球队失去球员统计",
+        "menu_as_of": "8. 查询某一届开始时的状态",
         "menu_quit": "0. 退出程序",
-        "menu_prompt": "请输入您的选择 (0-4): ",
+        "menu_prompt": "请输入您的选择 (0-8): ",
         "press_enter": "\n按回车键继续...",
 
         # 状态显示
@@ -41,6 +47,8 @@ TRANSLATIONS = {
         "btn_run_draft": "进行选秀",
         "btn_view_years": "查看可用年份",
         "btn_reset_all": "重置所有",
+        "btn_undo": "撤销选秀",
+        "btn_redo": "重做选秀",
         "btn_quit": "退出程序",
 
         # 选秀结果
@@ -48,7 +56,7 @@ TRANSLATIONS = {
         "draft_header": "===== 本次选秀年份 =====",
         "selected_year": "选中年份: {year}",
         "year_used_cooldown": "年份 {year} 已被使用，将进入{cooldown}年冷却期（{available_year}年后可再次使用）",
-        "players_header": "===== 需要废掉的{count}个球员（按球队英文名A-Z排序）=====",
+        "players_header": "===== 需要废掉的{count}个球员（按球队名拼音排序）=====",
         "player_line": "{index}. {team} {position} ({team_en})",
         "time_advance": "\n时间推进到: {year}年",
 
@@ -71,6 +79,32 @@ TRANSLATIONS = {
         "no_available_title": "没有可用年份",
         "no_available_msg": "当前没有可用的选秀年份！",
         "reset_success": "所有年份的权重和冷却状态已重置.",
+        "undo_done": "已撤销 {sim_year} 年的选秀（选中年份 {year}），当前模拟年份回到 {sim_year} 年。",
+        "undo_nothing": "没有可以撤销的选秀。",
+        "redo_done": "已重做 {sim_year} 年的选秀（选中年份 {year}），时间推进到 {new_year} 年。",
+        "redo_nothing": "没有可以重做的选秀。",
+        "draft_class_header": "{year}年选秀:",
+        "draft_class_line": "  第{pick}顺位 {player}（{team}，{position}）",
+        "draft_class_missing": "（没有{year}年的选秀数据）",
+        "draft_class_single": "{year}年选秀（仅收录第{pick}顺位）: {player}（{team}，{position}）",
+        "fairness_header": "===== 各球队累计失去球员（共 {drafts} 届）=====",
+        "fairness_team_line": "{team}: {count}",
+        "fairness_positions": "按位置: {detail}",
+        "fairness_summary": "每队平均 {mean:.1f}，最少 {min}，最多 {max}，标准差 {stdev:.2f}，基尼系数 {gini:.3f}",
+        "menu_file": "文件",
+        "menu_export": "导出选秀历史...",
+        "export_title": "导出选秀历史",
+        "export_running": "正在导出，请稍候。",
+        "export_md_title": "选秀历史",
+        "err_hook_plugin_title": "插件加载失败",
+        "err_hook_plugin": "无法加载钩子插件 {name}: {error}",
+        "err_league_title": "联盟配置有误",
+        "err_league": "leagues.json 中的联盟配置有误: {error}",
+        "export_done": "已导出 {count} 届选秀历史到 {path}",
+        "err_export": "导出失败: {error}",
+        "as_of_prompt": "查询哪一届开始时的状态 (直接回车默认{default_year}): ",
+        "as_of_header": "===== {year}年选秀之前：此前共 {drafts} 届选秀，{resets} 次重置 =====",
+        "as_of_previous_draft": "上一届（{year}年）选中: {drafted_year}年",
         "reset_year_prompt": "请输入起始年份 (直接回车默认{default_year}): ",
         "invalid_year": "输入的年份无效，操作取消。",
         "year_reset_done": "当前模拟年份已重置到{year}年，所有年份权重已重新计算。",
@@ -109,6 +143,7 @@ TRANSLATIONS = {
         "err_draft_title": "错误",
         "err_view_years": "查看年份时发生错误:\n{error}",
         "err_reset": "重置所有数据时发生错误:\n{error}",
+        "err_undo": "撤销/重做选秀时发生错误:\n{error}",
         "err_draft_fallback": "错误: {error}",
         "err_draft_auto_reset": "可能由于没有可用年份导致错误，自动重置所有年份状态。",
         "invalid_choice": "无效的选择，请重新输入。",
@@ -116,6 +151,57 @@ TRANSLATIONS = {
         # 语言
         "language_label": "语言:",
 
+        # 选秀历史
+        "tab_result": "选秀结果",
+        "tab_history": "选秀历史",
+        "history_col_sim_year": "模拟年份",
+        "history_col_drafted_year": "选秀年份",
+        "history_col_teams": "被废球员球队",
+        "history_col_positions": "位置",
+        "history_filter_sim_year": "模拟年份:",
+        "history_filter_drafted_year": "选秀年份:",
+        "history_filter_team": "球队:",
+        "history_filter_position": "位置:",
+        "history_filter_clear": "清除筛选",
+        "history_count": "第 {first}–{last} 条，共 {total} 条",
+        "tab_search": "选秀名单搜索",
+        "search_label": "搜索球员/学校/球队/位置:",
+        "search_available_only": "只看当前可用年份",
+        "search_col_year": "选秀年份",
+        "search_col_pick": "顺位",
+        "search_col_player": "球员",
+        "search_col_college": "学校/选秀前球队",
+        "search_col_position": "位置",
+        "search_col_team": "球队",
+        "search_count": "共 {count} 条结果",
+        "search_count_truncated": "只显示前 {count} 条结果",
+        "search_sample_note": "内置名单只收录每年的状元（第 1 顺位），导入完整名单的方法见 README",
+        "tab_calendar": "选秀日程",
+        "calendar_seasons": "计划届数:",
+        "calendar_seed": "随机种子:",
+        "calendar_strategy": "策略:",
+        "calendar_strategy_random": "随机",
+        "calendar_strategy_spread": "均匀分散",
+        "calendar_randomness": "随机程度:",
+        "btn_plan_calendar": "生成日程",
+        "btn_clear_calendar": "清除日程",
+        "calendar_col_sim_year": "模拟年份",
+        "calendar_col_year": "计划选秀年份",
+        "calendar_col_note": "备注",
+        "calendar_auto_reset": "所有年份用完，自动重置",
+        "calendar_empty": "尚未生成选秀日程，选秀时随机选择年份。",
+        "calendar_summary": "已计划未来 {count} 届（{strategy}，种子 {seed}），选秀时按日程进行；"
+                            "最长空闲 {max_gap} 届，自动重置 {auto_resets} 次",
+        "err_calendar_title": "错误",
+        "err_calendar": "无法生成选秀日程: {error}",
+
+        # 可用性热图
+        "tab_heatmap": "可用性热图",
+        "heatmap_available": "可用",
+        "heatmap_window": "{years}年窗口内",
+        "heatmap_cooling": "冷却中",
+        "heatmap_used": "当年选中",
+
         # 球队显示名
         "teams": {
             "Lakers": "湖人", "Celtics": "凯尔特人", "Warriors": "勇士", "Nets": "篮网",
@@ -142,8 +228,12 @@ TRANSLATIONS = {
         "menu_reset_all": "2. Reset All Years",
         "menu_view_years": "3. View Available Years",
         "menu_reset_year": "4. Reset Year to {reset_year}",
+        "menu_undo": "5. Undo Last Draft",
+        "menu_redo": "6. Redo Undone Draft",
+        "menu_fairness": "7. View Team Loss Statistics",
+        "menu_as_of": "8. View League State as of a Season",
         "menu_quit": "0. Quit",
-        "menu_prompt": "Enter your choice (0-4): ",
+        "menu_prompt": "Enter your choice (0-8): ",
         "press_enter": "\nPress Enter to continue...",
 
         # Status
@@ -159,6 +249,8 @@ TRANSLATIONS = {
         "btn_run_draft": "Run Draft",
         "btn_view_years": "View Years",
         "btn_reset_all": "Reset All",
+        "btn_undo": "Undo Draft",
+        "btn_redo": "Redo Draft",
         "btn_quit": "Quit",
 
         # Draft results
@@ -189,6 +281,32 @@ TRANSLATIONS = {
         "no_available_title": "No Available Years",
         "no_available_msg": "No draft years available!",
         "reset_success": "All year weights and cooldown status have been reset.",
+        "undo_done": "Undid the {sim_year} draft (year {year}); current sim year is back to {sim_year}.",
+        "undo_nothing": "Nothing to undo.",
+        "redo_done": "Redid the {sim_year} draft (year {year}); time advanced to {new_year}.",
+        "redo_nothing": "Nothing to redo.",
+        "draft_class_header": "{year} Draft:",
+        "draft_class_line": "  #{pick} {player} ({team}, {position})",
+        "draft_class_missing": "(no draft data for {year})",
+        "draft_class_single": "{year} Draft (pick #{pick} only): {player} ({team}, {position})",
+        "fairness_header": "===== Players Lost per Team ({drafts} drafts) =====",
+        "fairness_team_line": "{team}: {count}",
+        "fairness_positions": "By position: {detail}",
+        "fairness_summary": "Mean {mean:.1f} per team, min {min}, max {max}, std dev {stdev:.2f}, Gini {gini:.3f}",
+        "menu_file": "File",
+        "menu_export": "Export Draft History...",
+        "export_title": "Export Draft History",
+        "export_running": "An export is already running.",
+        "export_md_title": "Draft History",
+        "err_hook_plugin_title": "Plugin Error",
+        "err_hook_plugin": "Could not load hook plugin {name}: {error}",
+        "err_league_title": "League Profile Error",
+        "err_league": "Problem with the league profiles in leagues.json: {error}",
+        "export_done": "Exported {count} seasons of draft history to {path}",
+        "err_export": "Export failed: {error}",
+        "as_of_prompt": "Show the state at the start of which season? (press Enter for default {default_year}): ",
+        "as_of_header": "===== Before the {year} draft: {drafts} drafts and {resets} resets so far =====",
+        "as_of_previous_draft": "Previous season ({year}) drafted: {drafted_year}",
         "reset_year_prompt": "Enter start year (press Enter for default {default_year}): ",
         "invalid_year": "Invalid year input. Operation cancelled.",
         "year_reset_done": "Sim year reset to {year}. All year weights recalculated.",
@@ -227,6 +345,7 @@ TRANSLATIONS = {
         "err_draft_title": "Error",
         "err_view_years": "Error viewing years:\n{error}",
         "err_reset": "Error resetting data:\n{error}",
+        "err_undo": "Error undoing/redoing draft:\n{error}",
         "err_draft_fallback": "Error: {error}",
         "err_draft_auto_reset": "Error may be caused by no available years. Auto-resetting.",
         "invalid_choice": "Invalid choice. Please try again.",
@@ -234,6 +353,57 @@ TRANSLATIONS = {
         # Language
         "language_label": "Lang:",
 
+        # Draft history
+        "tab_result": "Draft Result",
+        "tab_history": "Draft History",
+        "history_col_sim_year": "Sim Year",
+        "history_col_drafted_year": "Draft Year",
+        "history_col_teams": "Teams Losing Players",
+        "history_col_positions": "Positions",
+        "history_filter_sim_year": "Sim Year:",
+        "history_filter_drafted_year": "Draft Year:",
+        "history_filter_team": "Team:",
+        "history_filter_position": "Position:",
+        "history_filter_clear": "Clear Filters",
+        "history_count": "Rows {first}–{last} of {total}",
+        "tab_search": "Draft Class Search",
+        "search_label": "Search players/colleges/teams/positions:",
+        "search_available_only": "Available years only",
+        "search_col_year": "Draft Year",
+        "search_col_pick": "Pick",
+        "search_col_player": "Player",
+        "search_col_college": "College/Pre-draft Team",
+        "search_col_position": "Position",
+        "search_col_team": "Team",
+        "search_count": "{count} results",
+        "search_count_truncated": "Showing the first {count} results",
+        "search_sample_note": "The bundled data only has each year's first pick; see the README to import full draft classes",
+        "tab_calendar": "Draft Calendar",
+        "calendar_seasons": "Seasons:",
+        "calendar_seed": "Seed:",
+        "calendar_strategy": "Strategy:",
+        "calendar_strategy_random": "Random",
+        "calendar_strategy_spread": "Even spread",
+        "calendar_randomness": "Randomness:",
+        "btn_plan_calendar": "Plan Calendar",
+        "btn_clear_calendar": "Clear Calendar",
+        "calendar_col_sim_year": "Sim Year",
+        "calendar_col_year": "Planned Draft Year",
+        "calendar_col_note": "Note",
+        "calendar_auto_reset": "All years used, auto reset",
+        "calendar_empty": "No draft calendar yet; drafts pick years at random.",
+        "calendar_summary": "Next {count} seasons planned ({strategy}, seed {seed}); drafts follow the calendar. "
+                            "Longest idle gap {max_gap} seasons, {auto_resets} auto resets",
+        "err_calendar_title": "Error",
+        "err_calendar": "Could not plan the draft calendar: {error}",
+
+        # Availability heatmap
+        "tab_heatmap": "Availability Map",
+        "heatmap_available": "Available",
+        "heatmap_window": "In {years}-year window",
+        "heatmap_cooling": "Cooling down",
+        "heatmap_used": "Drafted that season",
+
         # Teams (English display = same as ID)
         "teams": {
             "Lakers": "Lakers", "Celtics": "Celtics", "Warriors": "Warriors", "Nets": "Nets",
@@ -321,13 +491,17 @@ def get_language():
     return _current_language
 
 
+@instrument("i18n.t")
 def t(key, **kwargs):
     """
     Get translated string for the current language.
     Supports {named_placeholder} formatting via kwargs.
-    For dict values (teams, positions), returns the dict directly.
+    For dict values (teams, positions), returns the dict directly; those two
+    cover the active league's IDs, with the profile's own names taking priority.
     """
     lang_dict = TRANSLATIONS.get(_current_language, TRANSLATIONS["zh"])
+    if key in NAME_TABLES:
+        return LEAGUE.display_names(key, _current_language, lang_dict.get(key))
     value = lang_dict.get(key)
     if value is None:
         # Fallback to zh
@@ -337,5 +511,24 @@ def t(key, **kwargs):
     return value
 
 
+def sort_ranks(kind):
+    """{id: collation rank} of team or position display names in the current language (pinyin for zh)."""
+    lang_dict = TRANSLATIONS.get(_current_language, TRANSLATIONS["zh"])
+    return LEAGUE.collation_ranks(kind, _current_language, lang_dict.get(kind))
+
+
+def player_sort_key():
+    """Key function ordering (team, position) pairs by displayed team name, then position."""
+    team_ranks, position_ranks = sort_ranks("teams"), sort_ranks("positions")
+    unknown_team, unknown_position = len(team_ranks), len(position_ranks)
+    return lambda player: (team_ranks.get(player[0], unknown_team), player[0],
+                           position_ranks.get(player[1], unknown_position), player[1])
+
+
+def sort_players(players):
+    """Players in display order for the current language."""
+    return sorted(players, key=player_sort_key())
+
+
 # Initialize language on import
 _current_language = detect_language()
@@ -0,0 +1,309 @@
+"""
+League profiles: teams, positions, draft-year range and draft rules.
+
+A LeagueProfile is frozen and validated when it is built. Everything derived
+from its lists (the draft-year range, index maps, membership sets, age-eligible
+years per sim year, display-name tables) is computed once per profile and then
+shared by every draft instead of being rebuilt from the lists each time.
+
+Built-in profiles are NBA (the default) and WNBA. leagues.json in the data
+directory can add profiles or override built-in ones; "base" copies another
+profile and only changes the given fields:
+
+    {
+      "NBA-1950": {"base": "NBA", "earliest_year": 1950},
+      "Fantasy": {"teams": ["T01", "T02", ...], "positions": ["G", "F", "C"],
+                  "earliest_year": 1990, "latest_year": 2025, "cooldown": 10,
+                  "players_to_lose": 12, "names": {"en": {"teams": {"T01": "Sharks"}}}}
+    }
+
+DRAFT_PICKER_LEAGUE selects the active profile by name. At startup a broken
+profile in leagues.json is skipped, and an unknown or broken selection falls
+back to NBA; the CLI and GUI report what was skipped (see load_league).
+"""
+
+import json
+from dataclasses import dataclass, field, fields, replace
+from functools import cached_property
+from types import MappingProxyType
+
+DEFAULT_LEAGUE = "NBA"
+NAME_KINDS = ("teams", "positions")
+_ELIGIBLE_CACHE_SIZE = 256
+
+# Pinyin (tone number last) of the characters in the built-in zh display names.
+# Custom names with other characters still sort, after these, by code point.
+PINYIN = {
+    "中": "zhong1", "人": "ren2", "侠": "xia2", "克": "ke4", "公": "gong1", "凯": "kai3", "分": "fen1",
+    "刺": "ci4", "前": "qian2", "勇": "yong3", "卫": "wei4", "后": "hou4", "国": "guo2", "塞": "sai1",
+    "士": "shi4", "大": "da4", "天": "tian1", "太": "tai4", "奇": "qi2", "女": "nv3", "小": "xiao3",
+    "尔": "er3", "尼": "ni2", "山": "shan1", "开": "kai1", "得": "de2", "快": "kuai4", "想": "xiang3",
+    "才": "cai2", "拓": "tuo4", "掘": "jue2", "控": "kong4", "斯": "si1", "星": "xing1", "暴": "bao4",
+    "术": "shu4", "林": "lin2", "梦": "meng4", "森": "sen1", "步": "bu4", "武": "wu3", "水": "shui3",
+    "活": "huo2", "湖": "hu2", "火": "huo3", "灰": "hui1", "热": "re4", "熊": "xiong2", "爵": "jue2",
+    "牌": "pai2", "牛": "niu2", "特": "te4", "狂": "kuang2", "独": "du2", "狼": "lang2", "猛": "meng3",
+    "猫": "mao1", "王": "wang2", "球": "qiu2", "由": "you2", "神": "shen2", "秘": "mi4", "空": "kong1",
+    "箭": "jian4", "篮": "lan2", "网": "wang3", "翼": "yi4", "老": "lao3", "者": "zhe3", "自": "zi4",
+    "船": "chuan2", "花": "hua1", "蜂": "feng1", "行": "xing2", "金": "jin1", "锋": "feng1", "阳": "yang2",
+    "雄": "xiong2", "雷": "lei2", "霆": "ting2", "风": "feng1", "飞": "fei1", "马": "ma3", "骑": "qi2",
+    "魔": "mo2", "鹈": "ti2", "鹕": "hu2", "鹰": "ying1", "鹿": "lu4", "黄": "huang2", "龙": "long2",
+}
+
+
+def collation_key(name, lang):
+    """Sort key for a display name: pinyin order for zh, case-insensitive alphabetical otherwise."""
+    if lang != "zh":
+        return ((0, name.casefold()),)
+    # ASCII (e.g. the "76" in 76人) first, then characters by pinyin, then unknown characters
+    return tuple((0, ch.casefold()) if ch.isascii() else (1, PINYIN[ch]) if ch in PINYIN else (2, ch)
+                 for ch in name)
+
+
+@dataclass(frozen=True)
+class LeagueProfile:
+    name: str
+    teams: tuple
+    positions: tuple
+    earliest_year: int
+    latest_year: int
+    cooldown: int = 20
+    players_to_lose: int = 8
+    legendary_classes: tuple = ()
+    draft_classes: str = ""     # draft class store bundled under data/ (see draftclasses.py), "" for none
+    # {lang: {"teams" | "positions": {id: display name}}}, merged over the i18n tables
+    names: dict = field(default_factory=dict, compare=False)
+
+    def __post_init__(self):
+        # normalize lists from JSON into immutable values; frozen, so bypass __setattr__
+        object.__setattr__(self, 'teams', tuple(self.teams))
+        object.__setattr__(self, 'positions', tuple(self.positions))
+        object.__setattr__(self, 'legendary_classes', tuple(sorted(set(self.legendary_classes))))
+        object.__setattr__(self, 'names', MappingProxyType({
+            lang: MappingProxyType({kind: MappingProxyType(dict(table.get(kind) or {})) for kind in NAME_KINDS})
+            for lang, table in (self.names or {}).items()}))
+        self._validate()
+
+    def _validate(self):
+        problems = []
+        for label, items in (("teams", self.teams), ("positions", self.positions)):
+            if not items:
+                problems.append(f"no {label}")
+            elif not all(isinstance(item, str) and item for item in items):
+                problems.append(f"{label} must be non-empty strings")
+            elif len(set(items)) != len(items):
+                problems.append(f"duplicate {label}")
+        if not isinstance(self.draft_classes, str):
+            problems.append("draft_classes must be a file name")
+        for label in ("earliest_year", "latest_year", "cooldown", "players_to_lose"):
+            if not isinstance(getattr(self, label), int) or isinstance(getattr(self, label), bool):
+                problems.append(f"{label} must be an integer")
+        if not problems:
+            if self.earliest_year > self.latest_year:
+                problems.append("earliest_year is after latest_year")
+            if self.cooldown < 1:
+                problems.append("cooldown must be at least 1")
+            # players lost in one draft come from distinct teams
+            if not 1 <= self.players_to_lose <= len(self.teams):
+                problems.append(f"players_to_lose must be between 1 and {len(self.teams)}")
+        if problems:
+            raise ValueError(f"invalid league profile {self.name!r}: {'; '.join(problems)}")
+
+    # --- Derived tables, built on first use ---
+    @cached_property
+    def draft_years(self):
+        return range(self.earliest_year, self.latest_year + 1)
+
+    @cached_property
+    def team_index(self):
+        """Team ID -> position in the profile; also the canonical sort key."""
+        return MappingProxyType({team: i for i, team in enumerate(self.teams)})
+
+    @cached_property
+    def position_index(self):
+        return MappingProxyType({pos: i for i, pos in enumerate(self.positions)})
+
+    @cached_property
+    def team_set(self):
+        return frozenset(self.teams)
+
+    @cached_property
+    def position_set(self):
+        return frozenset(self.positions)
+
+    @cached_property
+    def legendary_set(self):
+        return frozenset(self.legendary_classes)
+
+    @cached_property
+    def _eligible_cache(self):
+        return {}
+
+    @cached_property
+    def _display_cache(self):
+        return {}
+
+    def eligible_years(self, sim_year):
+        """Draft years outside the (sim_year - cooldown, sim_year] window, ignoring usage."""
+        cache = self._eligible_cache
+        years = cache.get(sim_year)
+        if years is None:
+            if len(cache) >= _ELIGIBLE_CACHE_SIZE:
+                cache.clear()
+            before = range(self.earliest_year, min(self.latest_year, sim_year - self.cooldown) + 1)
+            after = range(max(self.earliest_year, sim_year + 1), self.latest_year + 1)
+            years = cache[sim_year] = frozenset(before).union(after)
+        return years
+
+    def display_names(self, kind, lang, fallback=None):
+        """
+        {id: display name} for every team or position in lang. The profile's own
+        names win over fallback (the language's i18n table), then the ID itself.
+        Built once per (kind, lang), so fallback must not change between calls.
+        """
+        key = (kind, lang)
+        table = self._display_cache.get(key)
+        if table is None:
+            own = self.names.get(lang, {}).get(kind, {})
+            base = fallback or {}
+            ids = self.teams if kind == "teams" else self.positions
+            table = {item: own.get(item) or base.get(item) or item for item in ids}
+            self._display_cache[key] = table
+        return table
+
+    def collation_ranks(self, kind, lang, fallback=None):
+        """
+        {id: rank} with teams or positions ordered by their display names in lang
+        (see collation_key). Sorting by rank is one dict lookup per item.
+        """
+        key = ("rank", kind, lang)
+        table = self._display_cache.get(key)
+        if table is None:
+            names = self.display_names(kind, lang, fallback)
+            order = sorted(names, key=lambda item: (collation_key(names[item], lang), item))
+            table = self._display_cache[key] = {item: rank for rank, item in enumerate(order)}
+        return table
+
+    def ids_by_display_name(self, kind, lang, fallback=None):
+        """Reverse of display_names(), for turning a combobox choice back into an ID."""
+        key = ("reverse", kind, lang)
+        table = self._display_cache.get(key)
+        if table is None:
+            table = {name: item for item, name in self.display_names(kind, lang, fallback).items()}
+            self._display_cache[key] = table
+        return table
+
+
+NBA = LeagueProfile(
+    name="NBA",
+    teams=(
+        "Lakers", "Celtics", "Warriors", "Nets", "76ers", "Bucks", "Suns", "Clippers", "Nuggets", "Heat",
+        "Mavericks", "Jazz", "Knicks", "Bulls", "Hawks", "Raptors", "Wizards", "Pacers", "Hornets", "Cavaliers",
+        "Pistons", "Magic", "Thunder", "Kings", "Timberwolves", "Pelicans", "Spurs", "Rockets", "Grizzlies",
+        "Trail Blazers",
+    ),
+    positions=("PG", "SG", "SF", "PF", "C"),
+    earliest_year=1980,
+    latest_year=2025,
+    cooldown=20,
+    players_to_lose=8,
+    legendary_classes=(1984, 1996, 2003),
+    draft_classes="draft_classes.bin",
+)
+
+WNBA = LeagueProfile(
+    name="WNBA",
+    teams=("Aces", "Dream", "Fever", "Liberty", "Lynx", "Mercury", "Mystics", "Sky", "Sparks", "Storm",
+           "Sun", "Valkyries", "Wings"),
+    positions=("G", "F", "C"),
+    earliest_year=1997,
+    latest_year=2025,
+    cooldown=10,
+    players_to_lose=4,
+    names={
+        "zh": {
+            "teams": {"Aces": "王牌", "Dream": "梦想", "Fever": "狂热", "Liberty": "自由人", "Lynx": "山猫",
+                      "Mercury": "水星", "Mystics": "神秘人", "Sky": "天空", "Sparks": "火花", "Storm": "风暴",
+                      "Sun": "太阳", "Valkyries": "女武神", "Wings": "飞翼"},
+            "positions": {"G": "后卫", "F": "前锋", "C": "中锋"},
+        },
+        "en": {
+            "teams": {"Aces": "Aces", "Dream": "Dream", "Fever": "Fever", "Liberty": "Liberty", "Lynx": "Lynx",
+                      "Mercury": "Mercury", "Mystics": "Mystics", "Sky": "Sky", "Sparks": "Sparks",
+                      "Storm": "Storm", "Sun": "Sun", "Valkyries": "Valkyries", "Wings": "Wings"},
+            "positions": {"G": "Guard", "F": "Forward", "C": "Center"},
+        },
+    },
+)
+
+BUILTIN_PROFILES = {profile.name: profile for profile in (NBA, WNBA)}
+_FIELD_NAMES = frozenset(f.name for f in fields(LeagueProfile)) - {"name"}
+
+
+def _build_profile(name, spec, profiles):
+    if not isinstance(spec, dict):
+        raise ValueError(f"invalid league profile {name!r}: expected an object")
+    unknown = set(spec) - _FIELD_NAMES - {"base"}
+    if unknown:
+        raise ValueError(f"invalid league profile {name!r}: unknown fields {', '.join(sorted(unknown))}")
+    values = {key: value for key, value in spec.items() if key != "base"}
+    base_name = spec.get("base")
+    if base_name is not None:
+        if base_name not in profiles:
+            raise ValueError(f"invalid league profile {name!r}: unknown base {base_name!r}")
+        return replace(profiles[base_name], name=name, **values)
+    missing = {"teams", "positions", "earliest_year", "latest_year"} - set(values)
+    if missing:
+        raise ValueError(f"invalid league profile {name!r}: missing {', '.join(sorted(missing))}")
+    return LeagueProfile(name=name, **values)
+
+
+def load_profiles(path=None, errors=None):
+    """
+    Built-in profiles plus those in leagues.json at path. A missing or unreadable
+    file is ignored. A profile that fails validation raises ValueError, or, when an
+    errors list is given, is skipped and its message appended to errors.
+    """
+    profiles = dict(BUILTIN_PROFILES)
+    if path is None:
+        return profiles
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return profiles
+    if not isinstance(loaded, dict):
+        return profiles
+    # bases may refer to profiles defined earlier in the file
+    for name, spec in loaded.items():
+        try:
+            profiles[name] = _build_profile(name, spec, profiles)
+        except (ValueError, TypeError) as e:
+            if errors is None:
+                raise ValueError(str(e)) from e
+            errors.append(str(e))
+    return profiles
+
+
+def get_profile(name=None, path=None):
+    """The profile called name (default NBA); unknown names raise ValueError."""
+    profiles = load_profiles(path)
+    name = (name or DEFAULT_LEAGUE).strip()
+    if name not in profiles:
+        raise ValueError(f"unknown league {name!r}; known leagues: {', '.join(sorted(profiles))}")
+    return profiles[name]
+
+
+def load_league(name=None, path=None):
+    """
+    (profile, problems) for the app's startup: like get_profile(), but never raises.
+    Broken profiles in leagues.json are skipped, and an unknown or broken name falls
+    back to the default league; problems lists what was skipped, for the UI to report.
+    """
+    problems = []
+    profiles = load_profiles(path, problems)
+    name = (name or DEFAULT_LEAGUE).strip()
+    if name not in profiles:
+        problems.append(f"unknown league {name!r}; using {DEFAULT_LEAGUE} (known leagues: "
+                        f"{', '.join(sorted(profiles))})")
+        name = DEFAULT_LEAGUE
+    return profiles[name], problems
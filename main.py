@@ -2,17 +2,22 @@ import sys
 import os
 
 from core import (
-    get_current_year, save_current_year, increment_year,
-    load_draft_weights, save_draft_weights, reset_weights,
-    is_all_weights_zero, PseudoRandomPicker, random_lose_player,
-    NBA_TEAMS, POSITIONS, COOL_DOWN_PERIOD, NUM_PLAYERS_TO_LOSE,
-    INITIAL_SIMULATION_YEAR,
+    get_current_year, reset_to_year,
+    load_draft_weights, reset_weights, perform_draft,
+    undo_last_draft, redo_draft, fairness_report, load_history_timeline,
+    COOL_DOWN_PERIOD, NUM_PLAYERS_TO_LOSE, POSITIONS,
+    INITIAL_SIMULATION_YEAR, LEAGUE_PROBLEMS,
 )
-from i18n import t
+from i18n import t, sort_players, set_language, SUPPORTED_LANGUAGES
+import profiling
+import hooks
+from draftclasses import render_draft_class
+from export import export_history, export_to_path, FORMATS
 
 
-def print_draft_weights(weights):
-    current_sim_year = get_current_year()
+def print_draft_weights(weights, current_sim_year=None):
+    if current_sim_year is None:
+        current_sim_year = get_current_year()
     print(f"\n{t('sim_year', year=current_sim_year)}")
     print(t('available_years_header'))
 
@@ -46,82 +51,151 @@ def show_menu():
     print(t('menu_reset_all'))
     print(t('menu_view_years'))
     print(t('menu_reset_year', reset_year=reset_year))
+    print(t('menu_undo'))
+    print(t('menu_redo'))
+    print(t('menu_fairness'))
+    print(t('menu_as_of'))
     print(t('menu_quit'))
     choice = input(t('menu_prompt'))
     return choice
 
 
 def run_draft():
-    current_sim_year = get_current_year()
-
-    draft_weights = load_draft_weights()
+    try:
+        result = perform_draft()
+    except ValueError as e:
+        print(t('err_draft_fallback', error=e))
+        print(t('err_draft_auto_reset'))
+        reset_weights()
+        return
 
-    if is_all_weights_zero(draft_weights):
+    if result['auto_reset']:
         print(t('auto_reset'))
-        draft_weights = reset_weights()
 
-    available_years = [year for year, data in draft_weights.items() if data['available'] == 1]
-
-    if not available_years:
+    selected_year = result['selected_year']
+    if selected_year is None:
         print(t('no_available_msg'))
         return
 
-    team_picker = PseudoRandomPicker(NBA_TEAMS)
-    position_picker = PseudoRandomPicker(POSITIONS)
-    year_picker = PseudoRandomPicker(available_years)
+    current_sim_year = result['sim_year']
+    print(f"\n{t('draft_header')}")
+    print(t('selected_year', year=selected_year))
+    print(render_draft_class(selected_year))
+    print(t('year_used_cooldown', year=selected_year, cooldown=COOL_DOWN_PERIOD,
+            available_year=current_sim_year + COOL_DOWN_PERIOD))
 
-    try:
-        selected_year = year_picker.pick()
-        print(f"\n{t('draft_header')}")
-        print(t('selected_year', year=selected_year))
+    print(f"\n{t('players_header', count=NUM_PLAYERS_TO_LOSE)}")
+    teams_dict = t('teams')
+    positions_dict = t('positions')
+    for i, (team, position) in enumerate(sort_players(result['players'])):
+        team_display = teams_dict.get(team, team)
+        pos_display = positions_dict.get(position, position)
+        print(t('player_line', index=i+1, team=team_display, position=pos_display, team_en=team))
 
-        draft_weights[selected_year]['available'] = 0
-        draft_weights[selected_year]['last_used_year'] = current_sim_year
-        print(t('year_used_cooldown', year=selected_year, cooldown=COOL_DOWN_PERIOD,
-                available_year=current_sim_year + COOL_DOWN_PERIOD))
+    print(t('time_advance', year=result['new_sim_year']))
 
-        print(f"\n{t('players_header', count=NUM_PLAYERS_TO_LOSE)}")
-        selected_players = []
-        for _ in range(NUM_PLAYERS_TO_LOSE):
-            team, position = random_lose_player(team_picker, position_picker)
-            selected_players.append((team, position))
+    print_draft_weights(result['weights'])
 
-        selected_players.sort(key=lambda x: x[0])
 
-        teams_dict = t('teams')
-        positions_dict = t('positions')
-        for i, (team, position) in enumerate(selected_players):
-            team_display = teams_dict.get(team, team)
-            pos_display = positions_dict.get(position, position)
-            print(t('player_line', index=i+1, team=team_display, position=pos_display, team_en=team))
-
-        save_draft_weights(draft_weights)
-
-        new_sim_year = increment_year()
-        print(t('time_advance', year=new_sim_year))
+def undo_draft():
+    entry = undo_last_draft()
+    if entry is None:
+        print(t('undo_nothing'))
+        return
+    print(t('undo_done', sim_year=entry['sim_year'], year=entry['drafted_year']))
+    print_draft_weights(load_draft_weights())
 
-        print_draft_weights(draft_weights)
 
-    except ValueError as e:
-        print(t('err_draft_fallback', error=e))
-        print(t('err_draft_auto_reset'))
-        reset_weights()
+def redo_last_undone_draft():
+    entry = redo_draft()
+    if entry is None:
+        print(t('redo_nothing'))
+        return
+    print(t('redo_done', sim_year=entry['sim_year'], year=entry['drafted_year'], new_year=entry['sim_year'] + 1))
+    print_draft_weights(load_draft_weights())
+
+
+def print_fairness_report(report=None):
+    if report is None:
+        report = fairness_report()
+    teams_dict = t('teams')
+    positions_dict = t('positions')
+    print(f"\n{t('fairness_header', drafts=report['drafts'])}")
+    for team, count in report['teams']:
+        print(t('fairness_team_line', team=teams_dict.get(team, team), count=count))
+    detail = ", ".join(f"{positions_dict.get(pos, pos)} {report['positions'].get(pos, 0)}" for pos in POSITIONS)
+    print(t('fairness_positions', detail=detail))
+    print(t('fairness_summary', mean=report['mean'], min=report['min'], max=report['max'],
+            stdev=report['stdev'], gini=report['gini']))
+
+
+def print_state_as_of():
+    default_year = get_current_year()
+    year_input = input(t('as_of_prompt', default_year=default_year)).strip()
+    try:
+        sim_year = int(year_input) if year_input else default_year
+    except ValueError:
+        print(t('invalid_year'))
+        return
+    timeline = load_history_timeline()
+    header = t('as_of_header', year=sim_year, drafts=timeline.drafts_before(sim_year),
+               resets=timeline.resets_before(sim_year))
+    print(f"\n{header}")
+    previous = timeline.draft_at(sim_year - 1)
+    if previous is not None:
+        print(t('as_of_previous_draft', year=sim_year - 1, drafted_year=previous[0]))
+    print_draft_weights(timeline.weights_as_of(sim_year), sim_year)
+    print_fairness_report(timeline.ledger_as_of(sim_year).report())
+
+
+def export_command(argv):
+    """python main.py export OUTPUT [--format csv|jsonl|md] [--lang zh|en]; OUTPUT '-' writes to stdout."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="main.py export", description="Export the draft history.")
+    parser.add_argument('output', help="output file ('-' for stdout); the format defaults to its extension")
+    parser.add_argument('--format', choices=FORMATS)
+    parser.add_argument('--lang', choices=SUPPORTED_LANGUAGES)
+    args = parser.parse_args(argv)
+    if args.lang:
+        set_language(args.lang)
+    try:
+        if args.output == '-':
+            count = export_history(sys.stdout, args.format or 'csv')
+        else:
+            count = export_to_path(args.output, args.format)
+    except OSError as e:
+        print(t('err_export', error=e), file=sys.stderr)
+        return 1
+    print(t('export_done', count=count, path=args.output), file=sys.stderr if args.output == '-' else sys.stdout)
+    return 0
 
 
 def main():
+    if sys.argv[1:2] == ['export']:
+        sys.exit(export_command(sys.argv[2:]))
+    if '--profile' in sys.argv[1:]:
+        profiling.enable()
+    for error in LEAGUE_PROBLEMS:
+        print(t('err_league', error=error), file=sys.stderr)
+    for name, error in hooks.load_plugins():
+        print(t('err_hook_plugin', name=name, error=error), file=sys.stderr)
+
     while True:
         choice = show_menu()
 
         if choice == '1':
-            run_draft()
+            with profiling.action('run_draft'):
+                run_draft()
             input(t('press_enter'))
         elif choice == '2':
-            reset_weights()
-            print(t('reset_success'))
-            print_draft_weights(load_draft_weights())
+            with profiling.action('reset_weights'):
+                reset_weights()
+                print(t('reset_success'))
+                print_draft_weights(load_draft_weights())
             input(t('press_enter'))
         elif choice == '3':
-            print_draft_weights(load_draft_weights())
+            with profiling.action('view_years'):
+                print_draft_weights(load_draft_weights())
             input(t('press_enter'))
         elif choice == '4':
             default_reset_year = int(os.environ.get('SIMULATION_START_YEAR', INITIAL_SIMULATION_YEAR))
@@ -135,9 +209,25 @@ def main():
                     continue
             else:
                 reset_year = default_reset_year
-            save_current_year(reset_year)
-            reset_weights()
-            print(t('year_reset_done', year=reset_year))
+            with profiling.action('reset_year'):
+                reset_to_year(reset_year)
+                print(t('year_reset_done', year=reset_year))
+            input(t('press_enter'))
+        elif choice == '5':
+            with profiling.action('undo_draft'):
+                undo_draft()
+            input(t('press_enter'))
+        elif choice == '6':
+            with profiling.action('redo_draft'):
+                redo_last_undone_draft()
+            input(t('press_enter'))
+        elif choice == '7':
+            with profiling.action('fairness_report'):
+                print_fairness_report()
+            input(t('press_enter'))
+        elif choice == '8':
+            with profiling.action('state_as_of'):
+                print_state_as_of()
             input(t('press_enter'))
         elif choice == '0':
             print(t('goodbye'))
@@ -0,0 +1,151 @@
+"""
+Hot-path instrumentation for 2K Draft Picker.
+
+Enable with the DRAFT_PICKER_PROFILE=1 environment variable or the --profile
+flag of main.py / gui_main.py. Each top-level action (run draft, view years,
+reset ...) then prints call counts, cumulative wall time and file I/O to stderr.
+Set DRAFT_PICKER_PROFILE_OUT to a directory to also dump one cProfile file
+per action (open with `python -m pstats` or snakeviz).
+When disabled, instrumented functions cost one global lookup per call.
+"""
+
+import cProfile
+import functools
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+_enabled = os.environ.get("DRAFT_PICKER_PROFILE", "") not in ("", "0")
+_cprofile_dir = os.environ.get("DRAFT_PICKER_PROFILE_OUT") or None
+
+_calls = {}      # name -> [count, seconds]
+_io = {"read": [0, 0], "write": [0, 0]}    # kind -> [count, bytes]
+_action_depth = 0
+_dump_count = 0
+
+
+def enable(cprofile_dir=None):
+    global _enabled, _cprofile_dir
+    _enabled = True
+    if cprofile_dir:
+        _cprofile_dir = cprofile_dir
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    _calls.clear()
+    for counters in _io.values():
+        counters[0] = counters[1] = 0
+
+
+def instrument(name=None):
+    """Decorator: count calls and cumulative wall time while profiling is enabled."""
+    def decorator(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                counters = _calls.setdefault(label, [0, 0.0])
+                counters[0] += 1
+                counters[1] += time.perf_counter() - start
+        return wrapper
+    return decorator
+
+
+def record_io(kind, nbytes):
+    """Record one file read or write ('read' / 'write') of nbytes bytes."""
+    if _enabled:
+        counters = _io[kind]
+        counters[0] += 1
+        counters[1] += nbytes
+
+
+def snapshot():
+    return {
+        "calls": {name: tuple(counters) for name, counters in _calls.items()},
+        "io": {kind: tuple(counters) for kind, counters in _io.items()},
+    }
+
+
+def diff(before, after):
+    calls = {}
+    for name, (count, seconds) in after["calls"].items():
+        prev_count, prev_seconds = before["calls"].get(name, (0, 0.0))
+        if count != prev_count:
+            calls[name] = (count - prev_count, seconds - prev_seconds)
+    io = {kind: (count - before["io"][kind][0], nbytes - before["io"][kind][1])
+          for kind, (count, nbytes) in after["io"].items()}
+    return {"calls": calls, "io": io}
+
+
+def format_report(action_name, elapsed, stats):
+    lines = [f"[profile] {action_name}: {elapsed * 1000:.2f} ms"]
+    for name, (count, seconds) in sorted(stats["calls"].items(), key=lambda item: -item[1][1]):
+        lines.append(f"  {name:<40} calls={count:<6} total={seconds * 1000:.3f} ms")
+    read_count, read_bytes = stats["io"]["read"]
+    write_count, write_bytes = stats["io"]["write"]
+    lines.append(f"  file reads: {read_count} ({read_bytes} bytes), "
+                 f"file writes: {write_count} ({write_bytes} bytes)")
+    return "\n".join(lines)
+
+
+@contextmanager
+def action(action_name, stream=None):
+    """
+    Wrap one top-level user action. Nested actions are folded into the outermost one.
+    """
+    global _action_depth, _dump_count
+    if not _enabled or _action_depth:
+        _action_depth += 1
+        try:
+            yield
+        finally:
+            _action_depth -= 1
+        return
+
+    profiler = cProfile.Profile() if _cprofile_dir else None
+    before = snapshot()
+    start = time.perf_counter()
+    _action_depth += 1
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        _action_depth -= 1
+        elapsed = time.perf_counter() - start
+        report = format_report(action_name, elapsed, diff(before, snapshot()))
+        print(report, file=stream or sys.stderr)
+        if profiler:
+            os.makedirs(_cprofile_dir, exist_ok=True)
+            _dump_count += 1
+            filename = f"{action_name}-{time.strftime('%Y%m%d_%H%M%S')}-{os.getpid()}-{_dump_count}.prof"
+            profiler.dump_stats(os.path.join(_cprofile_dir, filename))
+
+
+def profiled_action(action_name):
+    """Decorator form of action(), for GUI callbacks."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with action(action_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -4,13 +4,8 @@
 支持日志记录、历史查看和结果比较
 """
 
-import sys
-import os
-from test_draft_system import (
-    run_fifty_year_simulation_with_logging,
-    view_log_history, 
-    compare_two_logs
-)
+from simulation import run_fifty_year_simulation_with_logging, view_log_history, view_log_files
+from simcompare import compare_two_logs
 
 def show_menu():
     """显示主菜单"""
@@ -51,16 +46,7 @@ def main():
                 print("❌ 请输入有效的时间戳")
         
         elif choice == '4':
-            if os.path.exists('logs'):
-                print("\n===== logs 目录内容 =====")
-                files = os.listdir('logs')
-                if files:
-                    for file in sorted(files):
-                        print(f"  {file}")
-                else:
-                    print("  (目录为空)")
-            else:
-                print("logs 目录不存在")
+            view_log_files()
         
         elif choice == '0':
             print("👋 再见!")
@@ -0,0 +1,135 @@
+"""
+SQLite catalog of simulation runs (logs/catalog.sqlite3).
+
+Every finished run adds one row in a single transaction: timestamp, parameters,
+seed, season count, engine version, file paths and headline metrics. Listing,
+filtering and sorting runs is one indexed query instead of opening every log.
+Logs written before the catalog existed can be added with rebuild_catalog().
+"""
+
+import json
+import os
+import sqlite3
+from collections import Counter
+
+CATALOG_NAME = 'catalog.sqlite3'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    timestamp       TEXT PRIMARY KEY,
+    seasons         INTEGER NOT NULL,
+    seed            INTEGER,
+    start_year      INTEGER,
+    engine_version  TEXT,
+    params          TEXT NOT NULL,
+    log_file        TEXT NOT NULL,
+    summary_file    TEXT,
+    auto_resets     INTEGER,
+    distinct_years  INTEGER,
+    top_year        INTEGER,
+    top_year_count  INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_seasons ON runs (seasons);
+CREATE INDEX IF NOT EXISTS runs_seed ON runs (seed);
+CREATE INDEX IF NOT EXISTS runs_engine_version ON runs (engine_version);
+"""
+
+COLUMNS = ('timestamp', 'seasons', 'seed', 'start_year', 'engine_version', 'params', 'log_file',
+           'summary_file', 'auto_resets', 'distinct_years', 'top_year', 'top_year_count')
+SORTABLE = frozenset(COLUMNS) - {'params'}
+
+
+def catalog_path(log_dir):
+    return os.path.join(log_dir, CATALOG_NAME)
+
+
+def connect(log_dir):
+    os.makedirs(log_dir, exist_ok=True)
+    conn = sqlite3.connect(catalog_path(log_dir))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def record_run(log_dir, timestamp, seasons, log_file, params, seed=None, start_year=None, engine_version=None,
+               summary_file=None, auto_resets=None, distinct_years=None, top_year=None, top_year_count=None):
+    """Insert (or replace) one run; the row is committed atomically."""
+    conn = connect(log_dir)
+    try:
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                (timestamp, seasons, seed, start_year, engine_version, json.dumps(params, ensure_ascii=False),
+                 log_file, summary_file, auto_resets, distinct_years, top_year, top_year_count))
+    finally:
+        conn.close()
+
+
+def list_runs(log_dir, order_by='timestamp', descending=True, limit=None,
+              seed=None, engine_version=None, min_seasons=None, max_seasons=None):
+    """Catalog rows as dicts (params decoded), filtered and sorted in SQL."""
+    if order_by not in SORTABLE:
+        raise ValueError(f"cannot sort runs by {order_by!r}")
+    if not os.path.exists(catalog_path(log_dir)):
+        return []
+
+    where, args = [], []
+    for clause, value in (('seed = ?', seed), ('engine_version = ?', engine_version),
+                          ('seasons >= ?', min_seasons), ('seasons <= ?', max_seasons)):
+        if value is not None:
+            where.append(clause)
+            args.append(value)
+    query = "SELECT * FROM runs"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+    if limit is not None:
+        query += " LIMIT ?"
+        args.append(limit)
+
+    conn = connect(log_dir)
+    try:
+        rows = conn.execute(query, args).fetchall()
+    finally:
+        conn.close()
+    runs = []
+    for row in rows:
+        run = dict(row)
+        run['params'] = json.loads(run['params'])
+        runs.append(run)
+    return runs
+
+
+def rebuild_catalog(log_dir):
+    """Add every simulation_<timestamp>.2ksl in log_dir that isn't catalogued yet. Returns the count added."""
+    from simlog import SimLogReader
+
+    if not os.path.isdir(log_dir):
+        return 0
+    known = {run['timestamp'] for run in list_runs(log_dir)}
+    added = 0
+    for name in sorted(os.listdir(log_dir)):
+        if not (name.startswith('simulation_') and name.endswith('.2ksl')):
+            continue
+        timestamp = name[len('simulation_'):-len('.2ksl')]
+        if timestamp in known:
+            continue
+        log_file = os.path.join(log_dir, name)
+        summary_file = os.path.join(log_dir, f'summary_{timestamp}.txt')
+        with SimLogReader(log_file) as reader:
+            year_counts = Counter()
+            auto_resets = 0
+            for record in reader:
+                if record['selected_year'] is not None:
+                    year_counts[record['selected_year']] += 1
+                auto_resets += record['auto_reset']
+            params = reader.params
+            seasons, seed = reader.seasons, reader.seed
+        top_year, top_year_count = year_counts.most_common(1)[0] if year_counts else (None, None)
+        record_run(log_dir, timestamp, seasons, log_file, params, seed=seed,
+                   start_year=params.get('start_year'), engine_version=params.get('engine_version'),
+                   summary_file=summary_file if os.path.exists(summary_file) else None,
+                   auto_resets=auto_resets, distinct_years=len(year_counts),
+                   top_year=top_year, top_year_count=top_year_count)
+        added += 1
+    return added
@@ -0,0 +1,242 @@
+"""
+Streaming comparison of two simulation runs (.2ksl logs, see simlog.py).
+
+Both logs are read record by record in lockstep, so memory stays constant no
+matter how many seasons the runs have: only per-year / per-team / per-position
+counters, each run's last-use table and a bucketed reuse-gap histogram are kept.
+
+Reported:
+- per-year selection frequency deltas
+- team / position loss deltas
+- reuse-gap distributions (seasons between two selections of the same year)
+- chi-square homogeneity tests for years, teams and positions
+- the first divergent season when both runs share a seed
+"""
+
+import math
+import os
+from collections import Counter
+from itertools import zip_longest
+
+from simlog import SimLogReader, NO_DRAFT
+
+GAP_BUCKET = 10
+GAP_MAX_BUCKET = 100        # gaps >= this go into one bucket
+SIGNIFICANCE_LEVEL = 0.05
+TOP_DELTAS = 10
+
+
+class _RunStats:
+    def __init__(self, reader):
+        self.reader = reader
+        self.seasons = 0
+        self.year_counts = Counter()
+        self.code_counts = Counter()
+        self.gap_counts = Counter()
+        self.last_used = {}
+
+    def add(self, raw):
+        self.seasons += 1
+        sim_year, drafted = raw[0], raw[1]
+        if drafted == NO_DRAFT:
+            return
+        self.year_counts[drafted] += 1
+        self.code_counts.update(raw[3:])
+        last = self.last_used.get(drafted)
+        if last is not None:
+            self.gap_counts[min((sim_year - last) // GAP_BUCKET * GAP_BUCKET, GAP_MAX_BUCKET)] += 1
+        self.last_used[drafted] = sim_year
+
+    def years(self):
+        earliest = self.reader.earliest_year
+        return {earliest + offset: count for offset, count in self.year_counts.items()}
+
+    def teams(self):
+        return self._split(0)
+
+    def positions(self):
+        return self._split(1)
+
+    def _split(self, part):
+        counts = Counter()
+        for code, count in self.code_counts.items():
+            counts[self.reader.decode_players((code,))[0][part]] += count
+        return counts
+
+
+# --- Statistics ---
+def _upper_regularized_gamma(a, x):
+    """Q(a, x) = Γ(a, x) / Γ(a): series for x < a + 1, continued fraction otherwise."""
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        for _ in range(1000):
+            n += 1
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # Lentz's method
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return h * math.exp(log_prefix)
+
+
+def chi_square_homogeneity(counts_a, counts_b):
+    """
+    Chi-square test that two count dicts come from the same distribution.
+    Returns (statistic, degrees_of_freedom, p_value); p_value is 1.0 when there's nothing to test.
+    """
+    keys = [k for k in set(counts_a) | set(counts_b) if counts_a.get(k, 0) + counts_b.get(k, 0) > 0]
+    total_a = sum(counts_a.get(k, 0) for k in keys)
+    total_b = sum(counts_b.get(k, 0) for k in keys)
+    if len(keys) < 2 or not total_a or not total_b:
+        return 0.0, 0, 1.0
+    total = total_a + total_b
+    statistic = 0.0
+    for k in keys:
+        column = counts_a.get(k, 0) + counts_b.get(k, 0)
+        for observed, row_total in ((counts_a.get(k, 0), total_a), (counts_b.get(k, 0), total_b)):
+            expected = row_total * column / total
+            statistic += (observed - expected) ** 2 / expected
+    df = len(keys) - 1
+    return statistic, df, _upper_regularized_gamma(df / 2, statistic / 2)
+
+
+def _deltas(counts_a, counts_b, seasons_a, seasons_b):
+    """Per-key (count_a, count_b, rate delta per season), largest absolute delta first."""
+    rows = []
+    for key in set(counts_a) | set(counts_b):
+        a, b = counts_a.get(key, 0), counts_b.get(key, 0)
+        delta = (b / seasons_b if seasons_b else 0.0) - (a / seasons_a if seasons_a else 0.0)
+        rows.append((key, a, b, delta))
+    rows.sort(key=lambda row: (-abs(row[3]), row[0]))
+    return rows
+
+
+# --- Comparison ---
+def compare_runs(path_a, path_b):
+    with SimLogReader(path_a) as reader_a, SimLogReader(path_b) as reader_b:
+        stats_a, stats_b = _RunStats(reader_a), _RunStats(reader_b)
+        same_seed = reader_a.seed is not None and reader_a.seed == reader_b.seed
+        first_divergence = None
+
+        for index, (raw_a, raw_b) in enumerate(zip_longest(reader_a.raw_records(), reader_b.raw_records())):
+            if raw_a is not None:
+                stats_a.add(raw_a)
+            if raw_b is not None:
+                stats_b.add(raw_b)
+            if same_seed and first_divergence is None and not _same_season(reader_a, raw_a, reader_b, raw_b):
+                first_divergence = {
+                    'index': index,
+                    'a': reader_a.decode(raw_a) if raw_a is not None else None,
+                    'b': reader_b.decode(raw_b) if raw_b is not None else None,
+                }
+
+        years_a, years_b = stats_a.years(), stats_b.years()
+        teams_a, teams_b = stats_a.teams(), stats_b.teams()
+        positions_a, positions_b = stats_a.positions(), stats_b.positions()
+        return {
+            'a': {'path': path_a, 'seed': reader_a.seed, 'seasons': stats_a.seasons, 'params': reader_a.params},
+            'b': {'path': path_b, 'seed': reader_b.seed, 'seasons': stats_b.seasons, 'params': reader_b.params},
+            'same_seed': same_seed,
+            'first_divergence': first_divergence,
+            'year_deltas': _deltas(years_a, years_b, stats_a.seasons, stats_b.seasons),
+            'team_deltas': _deltas(teams_a, teams_b, stats_a.seasons, stats_b.seasons),
+            'position_deltas': _deltas(positions_a, positions_b, stats_a.seasons, stats_b.seasons),
+            'gaps': (dict(stats_a.gap_counts), dict(stats_b.gap_counts)),
+            'chi_square': {
+                'years': chi_square_homogeneity(years_a, years_b),
+                'teams': chi_square_homogeneity(teams_a, teams_b),
+                'positions': chi_square_homogeneity(positions_a, positions_b),
+                'gaps': chi_square_homogeneity(stats_a.gap_counts, stats_b.gap_counts),
+            },
+        }
+
+
+def _same_season(reader_a, raw_a, reader_b, raw_b):
+    if raw_a is None or raw_b is None:
+        return raw_a is raw_b
+    if reader_a.params == reader_b.params and reader_a.earliest_year == reader_b.earliest_year:
+        return raw_a == raw_b
+    return reader_a.decode(raw_a) == reader_b.decode(raw_b)
+
+
+def _gap_label(bucket):
+    if bucket >= GAP_MAX_BUCKET:
+        return f"{GAP_MAX_BUCKET}+"
+    return f"{bucket}-{bucket + GAP_BUCKET - 1}"
+
+
+def format_report(result):
+    a, b = result['a'], result['b']
+    lines = [
+        "===== 模拟结果比较 =====",
+        f"A: {a['path']} (赛季数 {a['seasons']}, 种子 {a['seed']})",
+        f"B: {b['path']} (赛季数 {b['seasons']}, 种子 {b['seed']})",
+    ]
+    if result['same_seed']:
+        divergence = result['first_divergence']
+        if divergence is None:
+            lines.append("两次运行种子相同，所有赛季完全一致")
+        else:
+            season = divergence['a'] or divergence['b']
+            lines.append(f"两次运行种子相同，第一个不同的赛季: 第 {divergence['index'] + 1} 个 "
+                         f"(模拟年份 {season['sim_year']})")
+
+    for title, key in (("选中年份频率差异 (B - A, 每赛季)", 'year_deltas'),
+                       ("球队失去球员差异 (B - A, 每赛季)", 'team_deltas'),
+                       ("位置失去球员差异 (B - A, 每赛季)", 'position_deltas')):
+        lines.append("")
+        lines.append(f"--- {title} ---")
+        for name, count_a, count_b, delta in result[key][:TOP_DELTAS]:
+            lines.append(f"  {name}: A={count_a} B={count_b} Δ={delta:+.4f}")
+
+    lines.append("")
+    lines.append("--- 年份复用间隔分布 (赛季) ---")
+    gaps_a, gaps_b = result['gaps']
+    for bucket in sorted(set(gaps_a) | set(gaps_b)):
+        lines.append(f"  {_gap_label(bucket)}: A={gaps_a.get(bucket, 0)} B={gaps_b.get(bucket, 0)}")
+
+    lines.append("")
+    lines.append(f"--- 卡方同质性检验 (显著性水平 {SIGNIFICANCE_LEVEL}) ---")
+    labels = {'years': "选中年份", 'teams': "球队", 'positions': "位置", 'gaps': "复用间隔"}
+    for key, (statistic, df, p_value) in result['chi_square'].items():
+        verdict = "差异显著" if p_value < SIGNIFICANCE_LEVEL else "无显著差异"
+        lines.append(f"  {labels[key]}: χ²={statistic:.2f} df={df} p={p_value:.4g} → {verdict}")
+    return "\n".join(lines)
+
+
+def log_path(timestamp, log_dir='logs'):
+    return os.path.join(log_dir, f'simulation_{timestamp}.2ksl')
+
+
+def compare_two_logs(timestamp1, timestamp2, log_dir='logs'):
+    """Compare two runs by timestamp (YYYYMMDD_HHMMSS) and print the report."""
+    path_a, path_b = log_path(timestamp1, log_dir), log_path(timestamp2, log_dir)
+    for path in (path_a, path_b):
+        if not os.path.exists(path):
+            print(f"❌ 找不到日志文件: {path}")
+            return None
+    result = compare_runs(path_a, path_b)
+    print(format_report(result))
+    return result
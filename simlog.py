@@ -0,0 +1,266 @@
+"""
+Compact binary format for simulation logs (.2ksl).
+
+Layout (little-endian):
+
+    header   magic b'2KSL', format version, flags, record size, players per season,
+             code size, earliest draft year, team count, position count,
+             records per compressed block, seed, season count, params JSON length
+    params   UTF-8 JSON: teams, positions, cooldown, engine version and any run parameters
+    records  fixed-width records, or zlib blocks of them when FLAG_ZLIB is set
+
+Each record is one season, 14 bytes with the default league:
+
+    sim_year        uint32
+    drafted_year    uint8   offset from earliest draft year, 255 = nothing drafted
+    flags           uint8   bit 0 = auto-reset before this draft
+    codes           NUM_PLAYERS_TO_LOSE x uint8 (uint16 for leagues with > 255 team/position pairs)
+                    code = team_index * position_count + position_index; zero padding
+                    when nothing was drafted, decoded as no players
+
+SimLogReader memory-maps the file. Uncompressed logs are iterated in place
+with struct.iter_unpack, and numpy() returns a zero-copy structured array.
+Names are only resolved, and text only rendered through i18n.t(), on demand.
+"""
+
+import json
+import mmap
+import struct
+import zlib
+
+from core import EARLIEST_DRAFT_YEAR, NBA_TEAMS, POSITIONS, NUM_PLAYERS_TO_LOSE
+
+MAGIC = b'2KSL'
+FORMAT_VERSION = 1
+FLAG_ZLIB = 0x1
+FLAG_HAS_SEED = 0x2
+RECORD_AUTO_RESET = 0x1
+NO_DRAFT = 0xFF
+DEFAULT_BLOCK_RECORDS = 4096
+
+_HEADER = struct.Struct('<4sHHHBBHHHIqQI')
+_BLOCK_HEADER = struct.Struct('<II')     # compressed length, record count
+_SEASONS_OFFSET = 4 + 2 + 2 + 2 + 1 + 1 + 2 + 2 + 2 + 4 + 8
+
+
+def _record_struct(players, code_size):
+    return struct.Struct('<IBB' + ('B' if code_size == 1 else 'H') * players)
+
+
+class SimLogWriter:
+    def __init__(self, path, params=None, seed=None, compress=False, block_records=DEFAULT_BLOCK_RECORDS,
+                 teams=NBA_TEAMS, positions=POSITIONS, earliest_year=EARLIEST_DRAFT_YEAR,
+                 players_per_season=NUM_PLAYERS_TO_LOSE):
+        self.path = path
+        self.teams = list(teams)
+        self.positions = list(positions)
+        self.earliest_year = earliest_year
+        self.players_per_season = players_per_season
+        self.compress = compress
+        self.block_records = block_records
+        self.seasons = 0
+
+        self.code_size = 1 if len(self.teams) * len(self.positions) <= 256 else 2
+        self._record = _record_struct(players_per_season, self.code_size)
+        self._team_index = {team: i for i, team in enumerate(self.teams)}
+        self._position_index = {pos: i for i, pos in enumerate(self.positions)}
+        self._block = []
+
+        header_params = dict(params or {})
+        header_params.update({'teams': self.teams, 'positions': self.positions})
+        params_bytes = json.dumps(header_params, ensure_ascii=False).encode('utf-8')
+        flags = (FLAG_ZLIB if compress else 0) | (FLAG_HAS_SEED if seed is not None else 0)
+
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(
+            MAGIC, FORMAT_VERSION, flags, self._record.size, players_per_season, self.code_size,
+            earliest_year, len(self.teams), len(self.positions), block_records,
+            seed if seed is not None else 0, 0, len(params_bytes)))
+        self._file.write(params_bytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record):
+        """Append one season; record is a dict as returned by LeagueState.draft()."""
+        selected = record['selected_year']
+        drafted = NO_DRAFT if selected is None else selected - self.earliest_year
+        num_positions = len(self.positions)
+        codes = [self._team_index[team] * num_positions + self._position_index[pos]
+                 for team, pos in record['players']]
+        if selected is None:
+            codes = [0] * self.players_per_season
+        elif len(codes) != self.players_per_season:
+            raise ValueError(f"expected {self.players_per_season} players for season {record['sim_year']}, "
+                             f"got {len(codes)}")
+        packed = self._record.pack(record['sim_year'], drafted,
+                                   RECORD_AUTO_RESET if record.get('auto_reset') else 0, *codes)
+        self.seasons += 1
+        if self.compress:
+            self._block.append(packed)
+            if len(self._block) >= self.block_records:
+                self._flush_block()
+        else:
+            self._file.write(packed)
+
+    def _flush_block(self):
+        if not self._block:
+            return
+        data = zlib.compress(b''.join(self._block))
+        self._file.write(_BLOCK_HEADER.pack(len(data), len(self._block)))
+        self._file.write(data)
+        self._block = []
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush_block()
+        self._file.seek(_SEASONS_OFFSET)
+        self._file.write(struct.pack('<Q', self.seasons))
+        self._file.close()
+
+
+class SimLogReader:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, flags, record_size, self.players_per_season, self.code_size,
+         self.earliest_year, num_teams, num_positions, self.block_records,
+         seed, self.seasons, params_length) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a simulation log")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"unsupported simulation log version {version}")
+
+        self.compressed = bool(flags & FLAG_ZLIB)
+        self.seed = seed if flags & FLAG_HAS_SEED else None
+        start = _HEADER.size
+        self.params = json.loads(bytes(self._mm[start:start + params_length]).decode('utf-8'))
+        self.teams = self.params['teams']
+        self.positions = self.params['positions']
+        self.data_offset = start + params_length
+        self._record = _record_struct(self.players_per_season, self.code_size)
+        if self._record.size != record_size or len(self.teams) != num_teams \
+                or len(self.positions) != num_positions:
+            self.close()
+            raise ValueError(f"{path} has an inconsistent header")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.seasons
+
+    def close(self):
+        try:
+            if not self._mm.closed:
+                self._mm.close()
+        finally:
+            self._file.close()
+
+    def raw_records(self):
+        """Yield (sim_year, drafted_offset, flags, code, ...) tuples straight from the map."""
+        if not self.compressed:
+            # Copy a block of records at a time rather than holding a memoryview of the map:
+            # an exported buffer would make close() fail while a generator is suspended.
+            size = self._record.size
+            end = self.data_offset + self.seasons * size
+            for offset in range(self.data_offset, end, DEFAULT_BLOCK_RECORDS * size):
+                yield from self._record.iter_unpack(self._mm[offset:min(offset + DEFAULT_BLOCK_RECORDS * size, end)])
+            return
+        for block in self._blocks():
+            yield from self._record.iter_unpack(block)
+
+    def _blocks(self):
+        offset = self.data_offset
+        remaining = self.seasons
+        while remaining > 0:
+            length, count = _BLOCK_HEADER.unpack_from(self._mm, offset)
+            offset += _BLOCK_HEADER.size
+            yield zlib.decompress(self._mm[offset:offset + length])
+            offset += length
+            remaining -= count
+
+    def __iter__(self):
+        """Yield decoded records as dicts with the same keys LeagueState.draft() returns."""
+        for raw in self.raw_records():
+            yield self.decode(raw)
+
+    def decode(self, raw):
+        sim_year, drafted, flags = raw[0], raw[1], raw[2]
+        return {
+            'sim_year': sim_year,
+            'selected_year': None if drafted == NO_DRAFT else self.earliest_year + drafted,
+            'auto_reset': bool(flags & RECORD_AUTO_RESET),
+            'players': [] if drafted == NO_DRAFT else self.decode_players(raw[3:]),
+        }
+
+    def decode_players(self, codes):
+        num_positions = len(self.positions)
+        return [(self.teams[code // num_positions], self.positions[code % num_positions]) for code in codes]
+
+    def numpy_dtype(self):
+        import numpy as np
+        code_type = 'u1' if self.code_size == 1 else '<u2'
+        return np.dtype([('sim_year', '<u4'), ('drafted_offset', 'u1'), ('flags', 'u1'),
+                         ('codes', code_type, (self.players_per_season,))])
+
+    def numpy(self):
+        """
+        Structured NumPy array of all records. Uncompressed logs are a zero-copy
+        view of the mapped file (keep the reader open while using it); compressed
+        logs are decompressed into a new array. Requires numpy.
+        """
+        import numpy as np
+        dtype = self.numpy_dtype()
+        if not self.compressed:
+            return np.frombuffer(self._mm, dtype=dtype, count=self.seasons, offset=self.data_offset)
+        return np.frombuffer(b''.join(self._blocks()), dtype=dtype, count=self.seasons)
+
+
+def render_record(record):
+    """Localized text for one decoded record, rendered with i18n.t()."""
+    from i18n import t, sort_players
+    if record['selected_year'] is None:
+        return t('no_available_msg')
+    teams_dict = t('teams')
+    positions_dict = t('positions')
+    lines = [t('sim_year', year=record['sim_year']), t('selected_year', year=record['selected_year'])]
+    for i, (team, position) in enumerate(sort_players(record['players'])):
+        lines.append(t('player_line', index=i + 1, team=teams_dict.get(team, team),
+                       position=positions_dict.get(position, position), team_en=team))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Print seasons from a binary simulation log.")
+    parser.add_argument("path")
+    parser.add_argument("--start", type=int, default=0, help="first season index")
+    parser.add_argument("--limit", type=int, default=10, help="number of seasons to print")
+    args = parser.parse_args(argv)
+
+    with SimLogReader(args.path) as reader:
+        print(f"{reader.seasons} seasons, seed={reader.seed}, params={json.dumps(reader.params, ensure_ascii=False)}")
+        for index, raw in enumerate(reader.raw_records()):
+            if index < args.start:
+                continue
+            if index >= args.start + args.limit:
+                break
+            print()
+            print(render_record(reader.decode(raw)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,390 @@
+"""
+In-memory league engine for batch simulation.
+
+LeagueState applies the same rules as core.py (20-year window, COOL_DOWN_PERIOD,
+auto-reset when nothing is available) but keeps the state in plain dicts, so
+long runs and stress tests don't serialize JSON on every season.
+"""
+
+import heapq
+import os
+import random
+from collections import Counter
+from datetime import datetime
+
+from core import (
+    year_status, year_weight, next_weight_change, FenwickSampler, SELECTION_UNIFORM, SELECTION_WEIGHTED,
+    INITIAL_SIMULATION_YEAR, EARLIEST_DRAFT_YEAR,
+    COOL_DOWN_PERIOD, NBA_TEAMS, POSITIONS, NUM_PLAYERS_TO_LOSE, YEAR_AVAILABLE, LEAGUE,
+)
+
+DRAFT_YEARS = LEAGUE.draft_years
+LOG_DIR = 'logs'
+# Bump when LeagueState's rules or random draws change, so catalogued runs stay comparable
+ENGINE_VERSION = '1'
+
+
+class LeagueState:
+    def __init__(self, sim_year=INITIAL_SIMULATION_YEAR, last_used=None, cooldown=COOL_DOWN_PERIOD,
+                 selection=SELECTION_UNIFORM):
+        self.sim_year = sim_year
+        self.last_used = dict(last_used or {})
+        self.cooldown = cooldown
+        self.selection = selection
+        # Weighted selection: a FenwickSampler over DRAFT_YEARS plus a heap of the seasons at
+        # which a year's weight changes next, so each season only touches the years that change.
+        # Built lazily; set_year(), reset() and fork() drop it.
+        self._sampler = None
+        # Copy-on-write: after fork() parent and branches share last_used until one of them drafts
+        self._shared = False
+        # Branches record their drafts in a persistent linked list (record, previous node), so
+        # forks of forks share the common prefix; _base is the state the first fork started from
+        self._tracking = False
+        self._log = None
+        self._base = None
+
+    def __repr__(self):
+        return f"LeagueState(sim_year={self.sim_year}, used={len(self.last_used)})"
+
+    @classmethod
+    def from_core(cls):
+        """The persisted league (core.py's current storage backend) as an in-memory state."""
+        import core
+        weights = core.load_draft_weights()
+        return cls(core.get_current_year(),
+                   {year: data['last_used_year'] for year, data in weights.items()
+                    if data['last_used_year'] is not None})
+
+    def is_available(self, year):
+        if self.cooldown == COOL_DOWN_PERIOD:
+            return year_status(year, self.sim_year, self.last_used.get(year)) == YEAR_AVAILABLE
+        return year in self.available_years()
+
+    def available_years(self):
+        # year_status() unrolled for the hot loop; stress_invariants.py cross-checks it against core
+        sim_year = self.sim_year
+        cooldown = self.cooldown
+        window_start = sim_year - cooldown
+        last_used = self.last_used
+        return [year for year in DRAFT_YEARS
+                if not window_start < year <= sim_year
+                and (year not in last_used or sim_year - last_used[year] >= cooldown)]
+
+    def set_year(self, sim_year):
+        """Same as core.save_current_year(): cooldown records are kept."""
+        self.sim_year = sim_year
+        self._sampler = None
+
+    def reset(self):
+        """Same as core.reset_weights(): clear every cooldown record."""
+        self._sampler = None
+        if self._shared:
+            self.last_used = {}
+            self._shared = False
+        else:
+            self.last_used.clear()
+
+    def fork(self, cooldown=None):
+        """
+        A what-if branch that starts from this state. Nothing is copied up front: the
+        cooldown table is shared copy-on-write and the branch's draft log shares this
+        state's log. cooldown overrides the rule for the branch only.
+        """
+        branch = LeagueState.__new__(LeagueState)
+        branch.sim_year = self.sim_year
+        branch.last_used = self.last_used
+        branch.cooldown = self.cooldown if cooldown is None else cooldown
+        branch.selection = self.selection
+        branch._sampler = None
+        branch._shared = self._shared = True
+        branch._tracking = True
+        branch._log = self._log
+        branch._base = self._base if self._tracking else (self.sim_year, self.last_used)
+        return branch
+
+    def records(self):
+        """Drafts run on this branch (and the branches it was forked from), oldest first."""
+        records = []
+        node = self._log
+        while node is not None:
+            records.append(node[0])
+            node = node[1]
+        records.reverse()
+        return records
+
+    def draft(self, rng=None):
+        """
+        Run one draft and advance the year, like core.perform_draft().
+        Returns a dict with sim_year, selected_year, players and auto_reset.
+        """
+        rng = rng or random
+        if self.selection == SELECTION_WEIGHTED:
+            return self._draft_weighted(rng)
+
+        auto_reset = False
+        available_years = self.available_years()
+        if not available_years:
+            self.reset()
+            auto_reset = True
+            available_years = self.available_years()
+
+        record = {'sim_year': self.sim_year, 'selected_year': None, 'players': [], 'auto_reset': auto_reset}
+        if not available_years:
+            return record
+        # Same distribution as the PseudoRandomPicker bag in core.perform_draft(): one pick
+        # from a fresh bag is a uniform choice.
+        return self._finish_draft(rng, record, rng.choice(available_years))
+
+    def _draft_weighted(self, rng):
+        auto_reset = False
+        if self._sampler is None:
+            self._build_sampler()
+        if not self._sampler.nonzero:
+            self.reset()
+            auto_reset = True
+            self._build_sampler()
+
+        record = {'sim_year': self.sim_year, 'selected_year': None, 'players': [], 'auto_reset': auto_reset}
+        if not self._sampler.nonzero:
+            return record
+        selected_year = DRAFT_YEARS[self._sampler.sample(rng)]
+        record = self._finish_draft(rng, record, selected_year)
+        self._refresh_weight(selected_year)
+        events = self._events
+        while events and events[0][0] <= self.sim_year:
+            season, year = heapq.heappop(events)
+            if self._next_event.get(year) == season:
+                self._refresh_weight(year)
+        return record
+
+    def _build_sampler(self):
+        sim_year, cooldown, last_used = self.sim_year, self.cooldown, self.last_used
+        self._sampler = FenwickSampler([year_weight(year, sim_year, last_used.get(year), SELECTION_WEIGHTED, cooldown)
+                                        for year in DRAFT_YEARS])
+        self._events = []
+        self._next_event = {}
+        for year in DRAFT_YEARS:
+            self._schedule(year)
+
+    def _schedule(self, year):
+        season = next_weight_change(year, self.sim_year, self.last_used.get(year), self.cooldown)
+        self._next_event[year] = season
+        if season is not None:
+            heapq.heappush(self._events, (season, year))
+
+    def _refresh_weight(self, year):
+        self._sampler.update(year - EARLIEST_DRAFT_YEAR, year_weight(
+            year, self.sim_year, self.last_used.get(year), SELECTION_WEIGHTED, self.cooldown))
+        self._schedule(year)
+
+    def _finish_draft(self, rng, record, selected_year):
+        # Same distributions as the team/position bags in core.perform_draft(), with fewer rng
+        # calls: k picks from a fresh team bag are a sample without replacement, and the
+        # position bag refills every len(POSITIONS).
+        teams = rng.sample(NBA_TEAMS, NUM_PLAYERS_TO_LOSE)
+        positions = []
+        while len(positions) < NUM_PLAYERS_TO_LOSE:
+            positions.extend(rng.sample(POSITIONS, len(POSITIONS)))
+        players = sorted(zip(teams, positions), key=lambda x: x[0])
+
+        if self._shared:
+            self.last_used = dict(self.last_used)
+            self._shared = False
+        self.last_used[selected_year] = self.sim_year
+        self.sim_year += 1
+        record['selected_year'] = selected_year
+        record['players'] = players
+        if self._tracking:
+            self._log = (record, self._log)
+        return record
+
+
+def simulate(seasons, seed=None, state=None):
+    """Yield one draft record per season from an in-memory league."""
+    rng = random.Random(seed)
+    state = state or LeagueState()
+    for _ in range(seasons):
+        yield state.draft(rng)
+
+
+
+# --- What-if branches ---
+def _run_branch(args):
+    branch, seed, seasons = args
+    rng = random.Random(seed)
+    for _ in range(seasons):
+        branch.draft(rng)
+    return branch
+
+
+def preview_branches(state, candidates, seasons, workers=1):
+    """
+    Fork `state` once per candidate and run `seasons` drafts on each branch.
+    A candidate is a seed, or a dict with 'seed' and optionally 'cooldown' (a rule change
+    for that branch). Branches are independent, so workers > 1 runs them in a process pool.
+    Returns the branches in candidate order; `state` itself is left untouched.
+    """
+    jobs = []
+    for candidate in candidates:
+        if not isinstance(candidate, dict):
+            candidate = {'seed': candidate}
+        jobs.append((state.fork(cooldown=candidate.get('cooldown')), candidate.get('seed'), seasons))
+    if workers <= 1:
+        return [_run_branch(job) for job in jobs]
+    import multiprocessing
+    with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+        return pool.map(_run_branch, jobs)
+
+
+def compare_branches(branches):
+    """One summary row per branch, for side-by-side comparison."""
+    rows = []
+    for branch in branches:
+        records = branch.records()
+        team_losses = Counter(team for record in records for team, _ in record['players'])
+        rows.append({
+            'cooldown': branch.cooldown,
+            'end_year': branch.sim_year,
+            'selected_years': [record['selected_year'] for record in records],
+            'auto_resets': sum(record['auto_reset'] for record in records),
+            'available_after': len(branch.available_years()),
+            'most_hit_team': team_losses.most_common(1)[0] if team_losses else None,
+        })
+    return rows
+
+
+def format_branch_table(rows, labels=None):
+    lines = []
+    for index, row in enumerate(rows):
+        label = labels[index] if labels else f"#{index + 1}"
+        team = f"{row['most_hit_team'][0]} x{row['most_hit_team'][1]}" if row['most_hit_team'] else "-"
+        lines.append(f"{label:>8} | 冷却期 {row['cooldown']:>2} | 自动重置 {row['auto_resets']} | "
+                     f"结束后可用 {row['available_after']:>2} | 失去最多 {team:<18} | "
+                     f"{' '.join(str(year) for year in row['selected_years'])}")
+    return "\n".join(lines)
+
+
+def commit_branch(branch):
+    """
+    Persist a branch through core.py: history entries (undoable, like perform_draft()),
+    the branch's cooldown table and sim year. The persisted league must still be in the
+    state the branch was forked from, otherwise ValueError is raised and nothing is written.
+    """
+    import core
+
+    if branch._base is None:
+        raise ValueError("only a forked branch can be committed")
+    if branch.cooldown != COOL_DOWN_PERIOD:
+        raise ValueError("branches with a different cooldown can only be previewed")
+    base_year, base_last_used = branch._base
+    current = LeagueState.from_core()
+    if current.sim_year != base_year or current.last_used != base_last_used:
+        raise ValueError("the league has changed since this branch was forked")
+
+    last_used = dict(base_last_used)
+    for record in branch.records():
+        selected_year = record['selected_year']
+        if selected_year is None:
+            continue
+        reset_snapshot = None
+        if record['auto_reset']:
+            reset_snapshot = {str(year): used for year, used in last_used.items()}
+            last_used = {}
+        undo = {'prev_last_used_year': last_used.get(selected_year)}
+        if reset_snapshot is not None:
+            undo['reset_snapshot'] = reset_snapshot
+        last_used[selected_year] = record['sim_year']
+        core.append_draft_history(record['sim_year'], selected_year, record['players'], undo)
+
+    weights = {year: {'available': 1 if branch.is_available(year) else 0,
+                      'last_used_year': branch.last_used.get(year)}
+               for year in DRAFT_YEARS}
+    core.save_draft_weights(weights)
+    core.save_current_year(branch.sim_year)
+    core.clear_redo()
+
+
+def run_logged_simulation(seasons=50, seed=None, log_dir=LOG_DIR, compress=False, start_year=INITIAL_SIMULATION_YEAR,
+                          selection=SELECTION_UNIFORM):
+    """
+    Simulate `seasons` drafts into logs/simulation_<timestamp>.2ksl (see simlog.py)
+    plus a short text summary. Returns (log_file, summary_file).
+    """
+    from simcatalog import record_run, rebuild_catalog, catalog_path
+    from simlog import SimLogWriter
+
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(62)
+    os.makedirs(log_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_file = os.path.join(log_dir, f'simulation_{timestamp}.2ksl')
+    summary_file = os.path.join(log_dir, f'summary_{timestamp}.txt')
+
+    params = {'seasons': seasons, 'start_year': start_year, 'league': LEAGUE.name, 'cooldown': COOL_DOWN_PERIOD,
+              'selection': selection, 'engine_version': ENGINE_VERSION}
+    year_counts = Counter()
+    auto_resets = 0
+    with SimLogWriter(log_file, params=params, seed=seed, compress=compress) as writer:
+        for record in simulate(seasons, seed=seed, state=LeagueState(start_year, selection=selection)):
+            writer.write(record)
+            if record['selected_year'] is not None:
+                year_counts[record['selected_year']] += 1
+            auto_resets += record['auto_reset']
+
+    most_common = ", ".join(f"{year} x{count}" for year, count in year_counts.most_common(5))
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write(f"模拟时间: {timestamp}\n")
+        f.write(f"模拟赛季数: {seasons} ({start_year} - {start_year + seasons - 1})\n")
+        f.write(f"随机种子: {seed}\n")
+        f.write(f"自动重置次数: {auto_resets}\n")
+        f.write(f"使用过的选秀年份数: {len(year_counts)}\n")
+        f.write(f"最常选中的年份: {most_common}\n")
+        f.write(f"详细日志: {log_file}\n")
+
+    if not os.path.exists(catalog_path(log_dir)):
+        rebuild_catalog(log_dir)    # pick up logs written before the catalog existed
+    top_year, top_year_count = year_counts.most_common(1)[0] if year_counts else (None, None)
+    record_run(log_dir, timestamp, seasons, log_file, params, seed=seed, start_year=start_year,
+               engine_version=ENGINE_VERSION, summary_file=summary_file, auto_resets=auto_resets,
+               distinct_years=len(year_counts), top_year=top_year, top_year_count=top_year_count)
+    return log_file, summary_file
+
+
+def run_fifty_year_simulation_with_logging(seed=None):
+    return run_logged_simulation(50, seed=seed)
+
+
+def view_log_history(log_dir=LOG_DIR, order_by='timestamp', descending=True, limit=None, **filters):
+    """Print catalogued runs (see simcatalog.py) with a single query."""
+    from simcatalog import list_runs, rebuild_catalog, catalog_path
+
+    if not os.path.exists(catalog_path(log_dir)):
+        rebuild_catalog(log_dir)
+    runs = list_runs(log_dir, order_by=order_by, descending=descending, limit=limit, **filters)
+    if not runs:
+        print("没有找到模拟日志")
+        return runs
+    print("\n===== 历史模拟记录 =====")
+    for run in runs:
+        print(f"  {run['timestamp']}  赛季数: {run['seasons']}  种子: {run['seed']}  "
+              f"引擎版本: {run['engine_version']}  自动重置: {run['auto_resets']}  "
+              f"最常选中: {run['top_year']} x{run['top_year_count']}")
+    return runs
+
+
+def view_log_files(log_dir=LOG_DIR):
+    """Print the files of every catalogued run."""
+    from simcatalog import list_runs, rebuild_catalog, catalog_path
+
+    if not os.path.exists(catalog_path(log_dir)):
+        rebuild_catalog(log_dir)
+    runs = list_runs(log_dir, descending=False)
+    if not runs:
+        print("logs 目录中没有已登记的模拟")
+        return runs
+    print(f"\n===== {log_dir} 目录内容 =====")
+    for run in runs:
+        print(f"  {run['timestamp']}: {run['log_file']}")
+        if run['summary_file']:
+            print(f"  {' ' * len(run['timestamp'])}  {run['summary_file']}")
+    return runs
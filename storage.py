@@ -0,0 +1,216 @@
+"""
+Persistence backends for league state.
+
+core.py reads and writes its state files (current_year.json, draft_weights.json,
+draft_history.jsonl ...) by name through one of these backends:
+
+- FileStorage: files in a directory (the app data dir by default)
+- MemoryStorage: a dict of texts, for tests and in-process simulations
+
+Missing entries raise FileNotFoundError, so callers handle both backends the
+same way they handle a missing file.
+"""
+
+import os
+from pathlib import Path
+
+
+class FileStorage:
+    def __init__(self, data_dir):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self):
+        return f"FileStorage({str(self.data_dir)!r})"
+
+    def path(self, name):
+        return str(self.data_dir / name)
+
+    def fingerprint(self, name):
+        """(mtime_ns, size, inode) — changes whenever the file is rewritten."""
+        st = os.stat(self.path(name))
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def read_text(self, name):
+        with open(self.path(name), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def iter_lines(self, name):
+        """Lines (without newlines) read one at a time; raises FileNotFoundError on first use if missing."""
+        with open(self.path(name), 'r', encoding='utf-8') as f:
+            for line in f:
+                yield line.rstrip('\r\n')
+
+    def tail_lines(self, name, count):
+        """The last count non-empty lines (oldest first), reading backwards from the end only as far as needed."""
+        with open(self.path(name), 'rb') as f:
+            lines = _tail_lines(_blocks_backwards(f), count)
+        return [line.decode('utf-8') for line in lines]
+
+    def write_text(self, name, text, atomic=False):
+        path = self.path(name)
+        target = path + '.tmp' if atomic else path
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(text)
+        if atomic:
+            os.replace(target, path)
+
+    def append_text(self, name, text):
+        with open(self.path(name), 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def pop_last_line(self, name):
+        """
+        Remove and return the last non-empty line (without its newline), or None if there is none.
+        Reads backwards from the end only as far as the previous newline.
+        """
+        with open(self.path(name), 'rb+') as f:
+            pos = f.seek(0, os.SEEK_END)
+            tail = b''
+            while True:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+                content = tail.rstrip(b'\r\n')
+                cut = content.rfind(b'\n')
+                if cut != -1 or pos == 0:
+                    break
+            if not content:
+                return None
+            f.truncate(pos + cut + 1)
+        return content[cut + 1:].decode('utf-8')
+
+    def delete(self, name):
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+
+class MemoryStorage:
+    def __init__(self):
+        self._chunks = {}      # name -> list of text chunks as written or appended
+        self._joined = {}      # name -> (version, joined text), the last read_text()
+        self._versions = {}
+
+    def __repr__(self):
+        return f"MemoryStorage({sorted(self._chunks)})"
+
+    def fingerprint(self, name):
+        if name not in self._chunks:
+            raise FileNotFoundError(name)
+        return (self._versions[name],)
+
+    def exists(self, name):
+        return name in self._chunks
+
+    def read_text(self, name):
+        try:
+            chunks = self._chunks[name]
+        except KeyError:
+            raise FileNotFoundError(name) from None
+        if len(chunks) <= 1:
+            return chunks[0] if chunks else ''
+        # keep the chunks as appended so pop_last_line/tail_lines only touch the last few
+        joined = self._joined.get(name)
+        if joined is None or joined[0] != self._versions[name]:
+            joined = self._joined[name] = (self._versions[name], ''.join(chunks))
+        return joined[1]
+
+    def iter_lines(self, name):
+        try:
+            chunks = self._chunks[name]
+        except KeyError:
+            raise FileNotFoundError(name) from None
+        partial = ''
+        for chunk in list(chunks):
+            lines = (partial + chunk).split('\n')
+            partial = lines.pop()
+            yield from lines
+        if partial:
+            yield partial
+
+    def write_text(self, name, text, atomic=False):
+        self._chunks[name] = [text]
+        self._bump(name)
+
+    def append_text(self, name, text):
+        self._chunks.setdefault(name, []).append(text)
+        self._bump(name)
+
+    def tail_lines(self, name, count):
+        try:
+            chunks = self._chunks[name]
+        except KeyError:
+            raise FileNotFoundError(name) from None
+        return _tail_lines(reversed(chunks), count)
+
+    def pop_last_line(self, name):
+        try:
+            chunks = self._chunks[name]
+        except KeyError:
+            raise FileNotFoundError(name) from None
+        # take chunks off the end until they hold the whole last line
+        tail = ''
+        while chunks:
+            content = tail.rstrip('\r\n')
+            if '\n' in content or (content and chunks[-1].endswith('\n')):
+                break
+            tail = chunks.pop() + tail
+        content = tail.rstrip('\r\n')
+        if not content:
+            if tail:
+                chunks.append(tail)
+            return None
+        cut = content.rfind('\n')
+        if cut != -1:
+            chunks.append(content[:cut + 1])
+        self._bump(name)
+        return content[cut + 1:]
+
+    def delete(self, name):
+        self._chunks.pop(name, None)
+        self._joined.pop(name, None)
+
+    def _bump(self, name):
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+
+def _blocks_backwards(f, size=4096):
+    pos = f.seek(0, os.SEEK_END)
+    while pos > 0:
+        step = min(size, pos)
+        pos -= step
+        f.seek(pos)
+        yield f.read(step)
+
+
+def _tail_lines(blocks, count):
+    """Last count non-empty lines (oldest first) of the text or bytes blocks, given last block first."""
+    lines = []
+    partial = cr = None
+    for block in blocks:
+        if partial is None:
+            newline, cr = ('\n', '\r') if isinstance(block, str) else (b'\n', b'\r')
+            partial = block[:0]
+        end = len(block)
+        while len(lines) < count:
+            cut = block.rfind(newline, 0, end)
+            if cut == -1:
+                partial = block[:end] + partial
+                break
+            line = (block[cut + 1:end] + partial).rstrip(cr)
+            partial = block[:0]
+            end = cut
+            if line.strip():
+                lines.append(line)
+        if len(lines) >= count:
+            return lines[::-1]
+    if partial and partial.strip():
+        # the first line of the file
+        lines.append(partial.rstrip(cr))
+    return lines[::-1]
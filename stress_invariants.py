@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+High-volume invariant checker for the window / cooldown rules.
+
+Drives random operation sequences (drafts, jumps of the sim year via
+save_current_year, manual resets; auto-resets happen on their own) and after
+every draft checks the selected year against an independent oracle:
+
+- the year is not inside the 20-year window (sim_year-20, sim_year]
+- the year was not drafted less than COOL_DOWN_PERIOD seasons ago (since the last reset)
+- an auto-reset only happens when the oracle also sees no available year
+- the sim year advances by exactly one and NUM_PLAYERS_TO_LOSE players from distinct teams are lost
+
+Engines:
+    memory -- simulation.LeagueState (fast path)
+    core   -- the real core.py functions on a MemoryStorage backend
+    memory-weighted / core-weighted -- the same with weighted year selection
+
+    python stress_invariants.py --sequences 1000000 --steps 60 --workers 8
+    python stress_invariants.py --engine core --sequences 20000
+
+Failures are shrunk to a minimal operation list and printed as JSON.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import core
+from core import (
+    COOL_DOWN_PERIOD, EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR, NUM_PLAYERS_TO_LOSE,
+)
+from simulation import LeagueState
+from storage import MemoryStorage
+
+DRAFT_YEARS = range(EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR + 1)
+
+
+# --- Operation sequences ---
+def generate_ops(seed, steps):
+    """A reproducible random sequence of ('draft', rng_seed) / ('set_year', y) / ('reset',)."""
+    rng = random.Random(seed)
+    ops = [('set_year', rng.randint(1960, 2100))]
+    for _ in range(steps):
+        roll = rng.random()
+        if roll < 0.06:
+            ops.append(('set_year', rng.randint(1960, 2100)))
+        elif roll < 0.09:
+            ops.append(('reset',))
+        else:
+            ops.append(('draft', rng.getrandbits(32)))
+    return ops
+
+
+# --- Engines ---
+class MemoryEngine:
+    selection = core.SELECTION_UNIFORM
+
+    def __init__(self):
+        self.state = LeagueState(selection=self.selection)
+
+    def set_year(self, year):
+        self.state.set_year(year)
+
+    def reset(self):
+        self.state.reset()
+
+    def current_year(self):
+        return self.state.sim_year
+
+    def draft(self, draft_seed):
+        return self.state.draft(random.Random(draft_seed))
+
+    def close(self):
+        pass
+
+
+class WeightedMemoryEngine(MemoryEngine):
+    selection = core.SELECTION_WEIGHTED
+
+
+class CoreEngine:
+    """Uses core.py end to end on a private MemoryStorage; close() restores the previous backend."""
+    selection = core.SELECTION_UNIFORM
+
+    def __init__(self):
+        self._previous_storage = core.set_storage(MemoryStorage())
+        core.save_current_year(core.INITIAL_SIMULATION_YEAR)
+
+    def set_year(self, year):
+        core.save_current_year(year)
+
+    def reset(self):
+        core.reset_weights()
+
+    def current_year(self):
+        return core.get_current_year()
+
+    def draft(self, draft_seed):
+        result = core.perform_draft(random.Random(draft_seed), self.selection)
+        return {'sim_year': result['sim_year'], 'selected_year': result['selected_year'],
+                'players': result['players'], 'auto_reset': result['auto_reset']}
+
+    def close(self):
+        core.set_storage(self._previous_storage)
+
+
+class WeightedCoreEngine(CoreEngine):
+    selection = core.SELECTION_WEIGHTED
+
+
+ENGINES = {
+    'memory': MemoryEngine,
+    'memory-weighted': WeightedMemoryEngine,
+    'core': CoreEngine,
+    'core-weighted': WeightedCoreEngine,
+}
+
+
+# --- Oracle ---
+def _oracle_available(year, sim_year, last_use):
+    if sim_year - COOL_DOWN_PERIOD < year <= sim_year:
+        return False
+    return last_use is None or sim_year - last_use >= COOL_DOWN_PERIOD
+
+
+def check_ops(ops, engine_name='memory'):
+    """
+    Replay ops and return None, or (step index, message) for the first violation.
+    """
+    engine = ENGINES[engine_name]()
+    try:
+        return _check_ops(engine, ops)
+    finally:
+        engine.close()
+
+
+def _check_ops(engine, ops):
+    uses = {}   # oracle's own record: drafted year -> last sim year used since the last reset
+
+    for index, op in enumerate(ops):
+        kind = op[0]
+        if kind == 'set_year':
+            engine.set_year(op[1])
+            continue
+        if kind == 'reset':
+            engine.reset()
+            uses.clear()
+            continue
+
+        sim_year = engine.current_year()
+        record = engine.draft(op[1])
+
+        if record['auto_reset']:
+            oracle_available = [y for y in DRAFT_YEARS if _oracle_available(y, sim_year, uses.get(y))]
+            if oracle_available:
+                return index, f"auto-reset at {sim_year} while {len(oracle_available)} years were available"
+            uses.clear()
+        selected = record['selected_year']
+        if selected is None:
+            return index, f"no year selected at {sim_year}"
+        if record['sim_year'] != sim_year:
+            return index, f"draft reported sim year {record['sim_year']}, expected {sim_year}"
+        if sim_year - COOL_DOWN_PERIOD < selected <= sim_year:
+            return index, f"{selected} selected at {sim_year} inside the 20-year window"
+        last_use = uses.get(selected)
+        if last_use is not None and sim_year - last_use < COOL_DOWN_PERIOD:
+            return index, f"{selected} selected at {sim_year}, last used {last_use} (cooldown {COOL_DOWN_PERIOD})"
+        if engine.current_year() != sim_year + 1:
+            return index, f"sim year went from {sim_year} to {engine.current_year()}"
+        players = record['players']
+        if len(players) != NUM_PLAYERS_TO_LOSE or len({team for team, _ in players}) != len(players):
+            return index, f"bad lost-player list {players}"
+        uses[selected] = sim_year
+    return None
+
+
+# --- Shrinking ---
+def shrink(ops, still_fails):
+    """
+    Delta-debugging: drop chunks of operations while still_fails(ops) stays true.
+    Each draft op carries its own rng seed, so removing other ops keeps replays deterministic.
+    """
+    chunk = max(1, len(ops) // 2)
+    while chunk >= 1:
+        start = 0
+        while start < len(ops):
+            candidate = ops[:start] + ops[start + chunk:]
+            if candidate and still_fails(candidate):
+                ops = candidate
+            else:
+                start += chunk
+        if chunk == 1:
+            break
+        chunk //= 2
+    return ops
+
+
+def minimal_reproducer(ops, engine_name):
+    return shrink(ops, lambda candidate: check_ops(candidate, engine_name) is not None)
+
+
+# --- Runner ---
+def run_chunk(args):
+    engine_name, first_seed, count, steps = args
+    for seed in range(first_seed, first_seed + count):
+        ops = generate_ops(seed, steps)
+        failure = check_ops(ops, engine_name)
+        if failure is not None:
+            return {'seed': seed, 'ops': ops, 'failure': failure}
+    return None
+
+
+def run(sequences, steps, workers, engine_name='memory', seed=0, chunk_size=2000):
+    """Check `sequences` random sequences; returns the first failure (shrunk) or None."""
+    chunks = [(engine_name, seed + start, min(chunk_size, sequences - start), steps)
+              for start in range(0, sequences, chunk_size)]
+    if workers <= 1:
+        results = map(run_chunk, chunks)
+        failure = next((r for r in results if r), None)
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            failure = next((r for r in pool.imap_unordered(run_chunk, chunks) if r), None)
+            pool.terminate()
+
+    if failure is None:
+        return None
+    failure['minimal_ops'] = minimal_reproducer(failure['ops'], engine_name)
+    failure['minimal_failure'] = check_ops(failure['minimal_ops'], engine_name)
+    return failure
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress-test the draft window/cooldown invariants.")
+    parser.add_argument("--sequences", type=int, default=100000)
+    parser.add_argument("--steps", type=int, default=60, help="operations per sequence")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="memory")
+    parser.add_argument("--seed", type=int, default=0, help="first sequence seed")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    failure = run(args.sequences, args.steps, args.workers, args.engine, args.seed)
+    elapsed = time.perf_counter() - start
+
+    if failure is None:
+        rate = args.sequences * args.steps / elapsed if elapsed else float("inf")
+        print(f"OK: {args.sequences} sequences x {args.steps} steps ({args.engine} engine) "
+              f"in {elapsed:.1f}s, {rate:,.0f} steps/s")
+        return 0
+
+    print(f"FAILED (seed {failure['seed']}): step {failure['failure'][0]}: {failure['failure'][1]}")
+    print("Minimal reproducer:")
+    print(json.dumps({'engine': args.engine, 'ops': failure['minimal_ops'],
+                      'failure': failure['minimal_failure']}, indent=2))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
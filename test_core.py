@@ -4,10 +4,21 @@
 或:   python -m unittest test_core -v
 """
 
+import csv
+import dataclasses
+import io
+import json
 import tempfile
 import os
 import shutil
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+import types
 import unittest
+from unittest import mock
 
 # 设置隔离的测试数据目录（必须在 import core 之前）
 _test_data_dir = tempfile.mkdtemp()
@@ -15,28 +26,63 @@ os.environ['DRAFT_PICKER_DATA_DIR'] = _test_data_dir
 os.environ.pop('SIMULATION_START_YEAR', None)
 
 import core
+import draftclasses
+import export
+import hooks
+import i18n
+import league
+import profiling
 from core import (
     load_draft_weights, save_draft_weights, reset_weights,
     is_all_weights_zero, get_current_year, save_current_year,
     increment_year, PseudoRandomPicker, random_lose_player,
-    NBA_TEAMS, POSITIONS,
+    append_draft_history, load_draft_history, filter_draft_history,
+    perform_draft, year_status,
+    YEAR_AVAILABLE, YEAR_IN_WINDOW, YEAR_COOLING, YEAR_USED,
+    NBA_TEAMS, POSITIONS, NUM_PLAYERS_TO_LOSE,
     EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR,
-    COOL_DOWN_PERIOD, CURRENT_YEAR_FILE, DRAFT_WEIGHTS_FILE,
+    COOL_DOWN_PERIOD, CURRENT_YEAR_NAME, DRAFT_HISTORY_NAME,
+    get_state_version, undo_last_draft, redo_draft, can_undo, can_redo,
+    FenwickSampler, year_weight, next_weight_change, SELECTION_WEIGHTED, SELECTION_UNIFORM,
+    LEGENDARY_DRAFT_CLASSES, WeightedLotteryPicker, load_team_lottery_config, save_team_lottery_config,
+    team_lottery_weights, recent_team_losses,
+    LossLedger, load_loss_ledger, fairness_report, LOSS_LEDGER_NAME,
+    plan_draft_calendar, load_draft_calendar, clear_draft_calendar, DRAFT_CALENDAR_NAME,
+    draft_calendar_stats, CALENDAR_RANDOM, CALENDAR_SPREAD,
+    HistoryTimeline, load_history_timeline, iter_draft_history, reset_to_year,
 )
+from storage import FileStorage, MemoryStorage
 from main import run_draft
 
 # load_dotenv 可能从 .env 加载了 SIMULATION_START_YEAR，需要移除
 os.environ.pop('SIMULATION_START_YEAR', None)
 
 
-def _clean_data_files():
-    for f in [CURRENT_YEAR_FILE, DRAFT_WEIGHTS_FILE]:
-        if os.path.exists(f):
-            os.remove(f)
-    # Also clean settings.json for i18n tests
-    settings_file = os.path.join(_test_data_dir, "settings.json")
-    if os.path.exists(settings_file):
-        os.remove(settings_file)
+class IsolatedStorageTestCase(unittest.TestCase):
+    """每个测试使用独立的内存存储，测试之间互不干扰，可并行运行"""
+
+    def make_storage(self):
+        return MemoryStorage()
+
+    def setUp(self):
+        os.environ.pop('SIMULATION_START_YEAR', None)
+        self.storage = self.make_storage()
+        self._previous_storage = core.set_storage(self.storage)
+
+    def tearDown(self):
+        core.set_storage(self._previous_storage)
+
+
+class TempDirStorageTestCase(IsolatedStorageTestCase):
+    """每个测试使用独立的临时目录，用于需要真实文件的测试"""
+
+    def make_storage(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        return FileStorage(self.tmp_dir)
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
 
 
 def _available_years(weights):
@@ -47,16 +93,9 @@ def _unavailable_years(weights):
     return [y for y, d in weights.items() if d['available'] == 0]
 
 
-class TestYearAvailabilityRule(unittest.TestCase):
+class TestYearAvailabilityRule(IsolatedStorageTestCase):
     """测试年份可用性规则：近20年窗口 (sim_year-20, sim_year] 内不可用"""
 
-    def setUp(self):
-        _clean_data_files()
-        os.environ.pop('SIMULATION_START_YEAR', None)
-
-    def tearDown(self):
-        _clean_data_files()
-
     def test_sim_year_2026(self):
         """2026年：1980-2006可用，2007-2025不可用"""
         save_current_year(2026)
@@ -117,16 +156,9 @@ class TestYearAvailabilityRule(unittest.TestCase):
         self.assertEqual(len(_available_years(weights)), 30)
 
 
-class TestCooldownAfterUse(unittest.TestCase):
+class TestCooldownAfterUse(IsolatedStorageTestCase):
     """测试使用后的冷却期"""
 
-    def setUp(self):
-        _clean_data_files()
-        os.environ.pop('SIMULATION_START_YEAR', None)
-
-    def tearDown(self):
-        _clean_data_files()
-
     def test_used_year_blocked(self):
         """刚使用的年份不可用"""
         save_current_year(2026)
@@ -177,15 +209,32 @@ class TestCooldownAfterUse(unittest.TestCase):
         self.assertEqual(weights[1990]['available'], 0, "1990冷却期未满（2046-2030=16）")
 
 
-class TestResetWeights(unittest.TestCase):
-    """测试重置功能"""
+class TestYearStatus(IsolatedStorageTestCase):
+    """测试 year_status 与 load_draft_weights 规则一致"""
 
-    def setUp(self):
-        _clean_data_files()
-        os.environ.pop('SIMULATION_START_YEAR', None)
+    def test_window(self):
+        self.assertEqual(year_status(2010, 2026, None), YEAR_IN_WINDOW)
+        self.assertEqual(year_status(2026, 2026, None), YEAR_IN_WINDOW)
+        self.assertEqual(year_status(2006, 2026, None), YEAR_AVAILABLE)
 
-    def tearDown(self):
-        _clean_data_files()
+    def test_used_then_cooling_then_available(self):
+        self.assertEqual(year_status(1990, 2026, 2026), YEAR_USED)
+        self.assertEqual(year_status(1990, 2030, 2026), YEAR_COOLING)
+        self.assertEqual(year_status(1990, 2045, 2026), YEAR_COOLING)
+        self.assertEqual(year_status(1990, 2046, 2026), YEAR_AVAILABLE)
+
+    def test_matches_load_draft_weights(self):
+        save_current_year(2030)
+        weights = load_draft_weights()
+        weights[1990]['last_used_year'] = 2026
+        save_draft_weights(weights)
+        for year, data in load_draft_weights().items():
+            status = year_status(year, 2030, data['last_used_year'])
+            self.assertEqual(data['available'] == 1, status == YEAR_AVAILABLE)
+
+
+class TestResetWeights(IsolatedStorageTestCase):
+    """测试重置功能"""
 
     def test_reset_clears_usage(self):
         """重置后清除使用记录"""
@@ -219,16 +268,9 @@ class TestResetWeights(unittest.TestCase):
         self.assertIsNone(weights[1990]['last_used_year'])
 
 
-class TestYearPersistence(unittest.TestCase):
+class TestYearPersistence(IsolatedStorageTestCase):
     """测试年份持久化"""
 
-    def setUp(self):
-        _clean_data_files()
-        os.environ.pop('SIMULATION_START_YEAR', None)
-
-    def tearDown(self):
-        _clean_data_files()
-
     def test_save_and_load(self):
         save_current_year(2030)
         self.assertEqual(get_current_year(), 2030)
@@ -283,16 +325,9 @@ class TestPseudoRandomPicker(unittest.TestCase):
         self.assertEqual(items, [1, 2, 3])
 
 
-class TestRunDraft(unittest.TestCase):
+class TestRunDraft(IsolatedStorageTestCase):
     """测试完整选秀流程"""
 
-    def setUp(self):
-        _clean_data_files()
-        os.environ.pop('SIMULATION_START_YEAR', None)
-
-    def tearDown(self):
-        _clean_data_files()
-
     def test_draft_increments_year(self):
         save_current_year(2026)
         run_draft()
@@ -331,6 +366,180 @@ class TestRunDraft(unittest.TestCase):
         self.assertEqual(used_count, 5)
 
 
+class TestFenwickSampler(unittest.TestCase):
+    """测试加权抽样树"""
+
+    def test_distribution_follows_weights(self):
+        import random
+        sampler = FenwickSampler([1, 0, 3, 6])
+        rng = random.Random(5)
+        counts = [0] * 4
+        for _ in range(20000):
+            counts[sampler.sample(rng)] += 1
+        self.assertEqual(counts[1], 0)
+        for index, weight in ((0, 0.1), (2, 0.3), (3, 0.6)):
+            self.assertAlmostEqual(counts[index] / 20000, weight, delta=0.02)
+
+    def test_update(self):
+        import random
+        sampler = FenwickSampler([1.0] * 10)
+        for i in range(9):
+            sampler.update(i, 0)
+        self.assertEqual(sampler.nonzero, 1)
+        self.assertAlmostEqual(sampler.total(), 1.0)
+        rng = random.Random(1)
+        self.assertTrue(all(sampler.sample(rng) == 9 for _ in range(100)))
+        sampler.update(9, 0)
+        with self.assertRaises(ValueError):
+            sampler.sample(rng)
+
+    def test_many_updates_stay_consistent(self):
+        import random
+        rng = random.Random(2)
+        weights = [rng.random() for _ in range(50)]
+        sampler = FenwickSampler(weights)
+        for _ in range(5000):
+            i = rng.randrange(50)
+            weights[i] = rng.choice([0.0, rng.random() * 3])
+            sampler.update(i, weights[i])
+        self.assertAlmostEqual(sampler.total(), sum(weights), places=9)
+        self.assertEqual(sampler.nonzero, sum(1 for w in weights if w > 0))
+        for _ in range(500):
+            self.assertGreater(weights[sampler.sample(rng)], 0)
+
+
+class TestYearWeight(IsolatedStorageTestCase):
+    """测试加权选秀模式"""
+
+    def test_zero_when_unavailable(self):
+        import random
+        rng = random.Random(3)
+        for _ in range(500):
+            sim_year = rng.randint(1960, 2120)
+            year = rng.randint(EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR)
+            last_used = rng.choice([None, rng.randint(sim_year - 40, sim_year)])
+            available = year_status(year, sim_year, last_used) == YEAR_AVAILABLE
+            for mode in (SELECTION_UNIFORM, SELECTION_WEIGHTED):
+                self.assertEqual(year_weight(year, sim_year, last_used, mode) > 0, available)
+
+    def test_weighting(self):
+        self.assertGreater(year_weight(1980, 2100, None, SELECTION_WEIGHTED),
+                           year_weight(2000, 2100, None, SELECTION_WEIGHTED))
+        legendary = LEGENDARY_DRAFT_CLASSES[0]
+        self.assertGreater(year_weight(legendary, 2100, None, SELECTION_WEIGHTED),
+                           year_weight(legendary - 1, 2100, None, SELECTION_WEIGHTED))
+        # 刚结束冷却的年份权重较低，之后逐步恢复
+        just_back = year_weight(1990, 2050, 2050 - COOL_DOWN_PERIOD, SELECTION_WEIGHTED)
+        later = year_weight(1990, 2055, 2050 - COOL_DOWN_PERIOD, SELECTION_WEIGHTED)
+        self.assertLess(just_back, later)
+        self.assertLessEqual(later, year_weight(1990, 2055, None, SELECTION_WEIGHTED))
+
+    def test_next_weight_change(self):
+        import random
+        rng = random.Random(4)
+        for _ in range(500):
+            sim_year = rng.randint(1960, 2120)
+            year = rng.randint(EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR)
+            last_used = rng.choice([None, rng.randint(sim_year - 60, sim_year)])
+            change = next_weight_change(year, sim_year, last_used)
+            weight = year_weight(year, sim_year, last_used, SELECTION_WEIGHTED)
+            until = change if change is not None else sim_year + 100
+            for later in range(sim_year, until):
+                self.assertEqual(year_weight(year, later, last_used, SELECTION_WEIGHTED), weight)
+
+    def test_weighted_perform_draft(self):
+        import random
+        save_current_year(2026)
+        rng = random.Random(6)
+        for _ in range(40):
+            weights = load_draft_weights()
+            result = perform_draft(rng, SELECTION_WEIGHTED)
+            self.assertEqual(weights[result['selected_year']]['available'], 1)
+
+    def test_selection_mode_from_env(self):
+        os.environ['DRAFT_PICKER_SELECTION'] = 'weighted'
+        try:
+            self.assertEqual(core.get_selection_mode(), SELECTION_WEIGHTED)
+        finally:
+            del os.environ['DRAFT_PICKER_SELECTION']
+        self.assertEqual(core.get_selection_mode(), SELECTION_UNIFORM)
+
+
+class TestTeamLottery(IsolatedStorageTestCase):
+    """测试加权球队抽签"""
+
+    def test_picker_without_replacement(self):
+        import random
+        teams = [f"T{i}" for i in range(500)]
+        picker = WeightedLotteryPicker(teams, range(1, 501), random.Random(1))
+        drawn = [picker.pick() for _ in range(500)]
+        self.assertEqual(sorted(drawn), sorted(teams))
+        # 全部抽完后重新装满
+        self.assertIn(picker.pick(), teams)
+
+    def test_picker_follows_weights(self):
+        import random
+        rng = random.Random(2)
+        firsts = {"A": 0, "B": 0}
+        for _ in range(4000):
+            firsts[WeightedLotteryPicker(["A", "B"], [3, 1], rng).pick()] += 1
+        self.assertAlmostEqual(firsts["A"] / 4000, 0.75, delta=0.03)
+
+    def test_weights(self):
+        config = dict(load_team_lottery_config(), standings={"Lakers": 1, "Celtics": 2, "Heat": 3},
+                      payroll_tiers={"Bulls": "high"}, recent_loss_penalty=1.0)
+        weights = dict(zip(NBA_TEAMS, team_lottery_weights(config, recent_losses={"Spurs": 2})))
+        self.assertAlmostEqual(weights["Lakers"], 2.0)
+        self.assertAlmostEqual(weights["Celtics"], 1.5)
+        self.assertAlmostEqual(weights["Heat"], 1.0)
+        self.assertAlmostEqual(weights["Bulls"], 1.5)
+        self.assertAlmostEqual(weights["Spurs"], 0.25)
+        self.assertAlmostEqual(weights["Jazz"], 1.0)
+
+    def test_recent_losses_only_reads_tail(self):
+        history = [{'players': [("Lakers", "PG")]}, {'players': [("Lakers", "C"), ("Heat", "C")]}]
+        self.assertEqual(recent_team_losses(1, history), {"Lakers": 1, "Heat": 1})
+        self.assertEqual(recent_team_losses(5, history), {"Lakers": 2, "Heat": 1})
+        self.assertEqual(recent_team_losses(0, history), {})
+
+    def test_recent_losses_parse_only_the_last_seasons(self):
+        save_current_year(2026)
+        for _ in range(6):
+            perform_draft()
+        history = load_draft_history()
+        expected = recent_team_losses(2, history)
+        parse = core._parse_draft_history
+
+        def parse_tail(text):
+            self.assertLessEqual(len(text.strip().splitlines()), 2, "parsed the whole history")
+            return parse(text)
+
+        with mock.patch.object(core, '_parse_draft_history', parse_tail):
+            self.assertEqual(recent_team_losses(2), expected)
+
+    def test_config_round_trip_and_validation(self):
+        self.assertFalse(load_team_lottery_config()['enabled'])
+        save_team_lottery_config({'enabled': True, 'position_constraints': {
+            "Lakers": ["C", "XX"], "Nowhere": ["PG"], "Heat": ["XX"]}})
+        config = load_team_lottery_config()
+        self.assertTrue(config['enabled'])
+        self.assertEqual(config['position_constraints'], {"Lakers": frozenset({"C"})})
+        self.assertEqual(config['recent_seasons'], 5)
+
+    def test_draft_respects_position_constraints(self):
+        import random
+        constraints = {team: ["C"] if i % 2 else ["PG", "SG"] for i, team in enumerate(NBA_TEAMS)}
+        save_team_lottery_config({'enabled': True, 'position_constraints': constraints,
+                                  'standings': {"Lakers": 1, "Celtics": 30}})
+        save_current_year(2026)
+        rng = random.Random(3)
+        for _ in range(30):
+            result = perform_draft(rng)
+            self.assertEqual(len({team for team, _ in result['players']}), NUM_PLAYERS_TO_LOSE)
+            for team, position in result['players']:
+                self.assertIn(position, constraints[team])
+
+
 class TestRandomLosePlayer(unittest.TestCase):
     def test_returns_valid_team_and_position(self):
         teams = ["Lakers", "Warriors", "Bulls"]
@@ -344,16 +553,9 @@ class TestRandomLosePlayer(unittest.TestCase):
             self.assertIn(pos, positions)
 
 
-class TestWeightsPersistence(unittest.TestCase):
+class TestWeightsPersistence(IsolatedStorageTestCase):
     """测试权重文件的保存和加载"""
 
-    def setUp(self):
-        _clean_data_files()
-        os.environ.pop('SIMULATION_START_YEAR', None)
-
-    def tearDown(self):
-        _clean_data_files()
-
     def test_save_and_reload_preserves_usage(self):
         save_current_year(2026)
         weights = load_draft_weights()
@@ -372,6 +574,1198 @@ class TestWeightsPersistence(unittest.TestCase):
         self.assertEqual(len(weights), LATEST_HISTORICAL_DRAFT_YEAR - EARLIEST_DRAFT_YEAR + 1)
 
 
+class TestDraftHistory(IsolatedStorageTestCase):
+    """测试选秀历史记录"""
+
+    def test_empty_without_file(self):
+        self.assertEqual(load_draft_history(), [])
+
+    def test_append_and_load(self):
+        append_draft_history(2026, 1990, [("Lakers", "PG"), ("Bulls", "C")])
+        append_draft_history(2027, 1985, [("Heat", "SF")])
+
+        history = load_draft_history()
+        self.assertEqual(len(history), 2)
+        self.assertEqual(history[0]['sim_year'], 2026)
+        self.assertEqual(history[0]['drafted_year'], 1990)
+        self.assertEqual(history[0]['players'], [("Lakers", "PG"), ("Bulls", "C")])
+        self.assertEqual(history[1]['drafted_year'], 1985)
+
+    def test_skips_corrupt_lines(self):
+        append_draft_history(2026, 1990, [("Lakers", "PG")])
+        self.storage.append_text(DRAFT_HISTORY_NAME, "{not json\n")
+        append_draft_history(2027, 1991, [("Bulls", "C")])
+        self.assertEqual([e['sim_year'] for e in load_draft_history()], [2026, 2027])
+
+    def test_filter(self):
+        append_draft_history(2026, 1990, [("Lakers", "PG"), ("Bulls", "C")])
+        append_draft_history(2027, 1985, [("Heat", "SF")])
+        append_draft_history(2028, 1990, [("Heat", "C")])
+        history = load_draft_history()
+
+        self.assertEqual(len(filter_draft_history(history, drafted_year=1990)), 2)
+        self.assertEqual(len(filter_draft_history(history, sim_year=2027)), 1)
+        self.assertEqual([e['sim_year'] for e in filter_draft_history(history, team="Heat")], [2027, 2028])
+        self.assertEqual([e['sim_year'] for e in filter_draft_history(history, position="C")], [2026, 2028])
+        self.assertEqual(len(filter_draft_history(history, team="Heat", position="C")), 1)
+        self.assertEqual(filter_draft_history(history, team="Spurs"), [])
+
+    def test_perform_draft_records_history(self):
+        save_current_year(2026)
+        result = perform_draft()
+
+        history = load_draft_history()
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0]['sim_year'], 2026)
+        self.assertEqual(history[0]['drafted_year'], result['selected_year'])
+        self.assertEqual(history[0]['players'], result['players'])
+        self.assertEqual(len(result['players']), NUM_PLAYERS_TO_LOSE)
+        self.assertEqual(result['new_sim_year'], 2027)
+
+
+class TestUndoRedo(IsolatedStorageTestCase):
+    """测试撤销/重做选秀"""
+
+    def test_undo_reads_only_the_tail(self):
+        # 撤销/重做不解析整个历史：只读选秀历史和重置记录的最后一行
+        save_current_year(2026)
+        for _ in range(5):
+            perform_draft()
+        reset_weights()
+        perform_draft()
+        parse = core._parse_draft_history
+
+        def parse_one_line(text):
+            self.assertLessEqual(len(text.strip().splitlines()), 1, "parsed the whole history")
+            return parse(text)
+
+        with mock.patch.object(core, '_parse_draft_history', parse_one_line):
+            self.assertTrue(can_undo())
+            self.assertIsNotNone(undo_last_draft())
+            self.assertFalse(can_undo())
+            self.assertIsNone(undo_last_draft())
+            self.assertIsNotNone(redo_draft())
+
+    def _state(self):
+        weights = load_draft_weights()
+        return get_current_year(), weights, load_draft_history()
+
+    def test_undo_restores_previous_state(self):
+        save_current_year(2026)
+        perform_draft()
+        before = self._state()
+        self.assertTrue(can_undo())
+
+        result = perform_draft()
+        entry = undo_last_draft()
+        self.assertEqual(entry['sim_year'], 2027)
+        self.assertEqual(entry['drafted_year'], result['selected_year'])
+        self.assertEqual(self._state(), before)
+
+    def test_redo_replays_same_draft(self):
+        save_current_year(2026)
+        perform_draft()
+        after = self._state()
+        undo_last_draft()
+        self.assertTrue(can_redo())
+        entry = redo_draft()
+        self.assertEqual(entry['sim_year'], 2026)
+        self.assertEqual(self._state(), after)
+        self.assertFalse(can_redo())
+
+    def test_multiple_undo_and_redo(self):
+        save_current_year(2026)
+        states = [self._state()]
+        for _ in range(5):
+            perform_draft()
+            states.append(self._state())
+        for expected in reversed(states[:-1]):
+            undo_last_draft()
+            self.assertEqual(self._state(), expected)
+        self.assertIsNone(undo_last_draft())
+        for expected in states[1:]:
+            redo_draft()
+            self.assertEqual(self._state(), expected)
+        self.assertIsNone(redo_draft())
+
+    def test_undo_auto_reset(self):
+        save_current_year(2026)
+        weights = load_draft_weights()
+        for year, data in weights.items():
+            data['available'] = 0
+            data['last_used_year'] = 2020 if year <= 2026 - COOL_DOWN_PERIOD else None
+        save_draft_weights(weights)
+        before = self._state()
+
+        result = perform_draft()
+        self.assertTrue(result['auto_reset'])
+        undo_last_draft()
+        self.assertEqual(self._state(), before)
+        redo_draft()
+        used = {year: data['last_used_year'] for year, data in load_draft_weights().items()
+                if data['last_used_year'] is not None}
+        self.assertEqual(used, {result['selected_year']: 2026})
+
+    def test_new_draft_clears_redo(self):
+        save_current_year(2026)
+        perform_draft()
+        undo_last_draft()
+        perform_draft()
+        self.assertFalse(can_redo())
+        self.assertIsNone(redo_draft())
+
+    def test_cannot_undo_after_year_change_or_legacy_entry(self):
+        save_current_year(2026)
+        perform_draft()
+        save_current_year(2040)
+        self.assertFalse(can_undo())
+        self.assertIsNone(undo_last_draft())
+        self.assertEqual(len(load_draft_history()), 1)
+
+        append_draft_history(2040, 1990, [("Lakers", "PG")])
+        save_current_year(2041)
+        self.assertIsNone(undo_last_draft())
+        self.assertEqual(len(load_draft_history()), 2)
+
+    def test_undo_does_not_rewrite_history(self):
+        save_current_year(2026)
+        for _ in range(3):
+            perform_draft()
+        before = self.storage.read_text(DRAFT_HISTORY_NAME)
+        undo_last_draft()
+        after = self.storage.read_text(DRAFT_HISTORY_NAME)
+        self.assertTrue(before.startswith(after))
+        self.assertEqual(after.count('\n'), 2)
+
+
+class TestLossLedger(IsolatedStorageTestCase):
+    """测试球队失去球员累计统计"""
+
+    def _counts_from_history(self):
+        teams = {}
+        for entry in load_draft_history():
+            for team, _ in entry['players']:
+                teams[team] = teams.get(team, 0) + 1
+        return teams
+
+    def _ledger_teams(self):
+        return {team: count for team, count in load_loss_ledger().teams.items() if count}
+
+    def test_drafts_update_ledger(self):
+        save_current_year(2026)
+        for _ in range(5):
+            perform_draft()
+        ledger = load_loss_ledger()
+        self.assertEqual(ledger.drafts, 5)
+        self.assertEqual(self._ledger_teams(), self._counts_from_history())
+        self.assertEqual(sum(ledger.positions.values()), 5 * NUM_PLAYERS_TO_LOSE)
+
+    def test_undo_and_redo_keep_ledger_consistent(self):
+        save_current_year(2026)
+        for _ in range(3):
+            perform_draft()
+        undo_last_draft()
+        self.assertEqual(load_loss_ledger().drafts, 2)
+        self.assertEqual(self._ledger_teams(), self._counts_from_history())
+        redo_draft()
+        self.assertEqual(load_loss_ledger().drafts, 3)
+        self.assertEqual(self._ledger_teams(), self._counts_from_history())
+
+    def test_rebuilds_from_history_when_missing(self):
+        append_draft_history(2026, 1990, [("Lakers", "PG"), ("Bulls", "C")])
+        append_draft_history(2027, 1985, [("Lakers", "SF")])
+        self.storage.delete(LOSS_LEDGER_NAME)
+        core.clear_read_cache()
+        ledger = load_loss_ledger()
+        self.assertEqual(ledger.drafts, 2)
+        self.assertEqual(ledger.teams, {"Lakers": 2, "Bulls": 1})
+        self.assertEqual(ledger.positions, {"PG": 1, "C": 1, "SF": 1})
+
+    def test_fewest_losses_uses_counts_and_updates(self):
+        import random
+        ledger = LossLedger(teams={"Lakers": 3, "Bulls": 1, "Heat": 0, "Suns": 2})
+        candidates = ["Lakers", "Bulls", "Heat", "Suns"]
+        rng = random.Random(1)
+        self.assertEqual(ledger.fewest_losses(2, candidates, rng), ["Heat", "Bulls"])
+        ledger.record([("Heat", "PG"), ("Heat", "C"), ("Bulls", "SF")])
+        self.assertEqual(ledger.fewest_losses(2, candidates, rng), ["Suns", "Bulls"])
+        ledger.record([("Heat", "PG"), ("Heat", "C"), ("Bulls", "SF")], sign=-1)
+        self.assertEqual(ledger.fewest_losses(1, candidates, rng), ["Heat"])
+
+    def test_balance_mode_picks_least_hit_teams(self):
+        import random
+        save_team_lottery_config({'enabled': True, 'balance': True})
+        save_current_year(2026)
+        rng = random.Random(7)
+        drafts = len(NBA_TEAMS) // NUM_PLAYERS_TO_LOSE * 4
+        for _ in range(drafts):
+            result = perform_draft(rng)
+            self.assertEqual(len({team for team, _ in result['players']}), NUM_PLAYERS_TO_LOSE)
+        report = fairness_report()
+        self.assertLessEqual(report['max'] - report['min'], 1)
+
+    def test_report_statistics(self):
+        report = LossLedger(teams={"A": 0, "B": 0, "C": 0, "D": 4}, drafts=1).report(["A", "B", "C", "D"])
+        self.assertEqual(report['teams'][-1], ("D", 4))
+        self.assertEqual((report['min'], report['max']), (0, 4))
+        self.assertAlmostEqual(report['mean'], 1.0)
+        self.assertAlmostEqual(report['stdev'], 3 ** 0.5)
+        self.assertAlmostEqual(report['gini'], 0.75)
+        self.assertEqual(LossLedger().report(["A", "B"])['gini'], 0.0)
+
+
+class TestDraftCalendar(IsolatedStorageTestCase):
+    """测试多届选秀日程及其增量修复"""
+
+    def _assert_valid(self, calendar):
+        """按冷却规则逐届模拟日程，每一届的计划年份都必须可选"""
+        last_used = {year: data['last_used_year'] for year, data in load_draft_weights().items()}
+        last_used = {year: used for year, used in last_used.items() if used is not None}
+        for entry in calendar.entries:
+            available = core._available_years(entry['sim_year'], last_used)
+            if entry['auto_reset']:
+                self.assertEqual(available, [])
+                last_used = {}
+                available = sorted(core.LEAGUE.eligible_years(entry['sim_year']))
+            self.assertIn(entry['year'], available)
+            last_used[entry['year']] = entry['sim_year']
+
+    def test_plan_is_valid_and_deterministic(self):
+        save_current_year(2026)
+        calendar = plan_draft_calendar(30, seed=7)
+        self.assertEqual([entry['sim_year'] for entry in calendar.entries], list(range(2026, 2056)))
+        self._assert_valid(calendar)
+        self.assertEqual(plan_draft_calendar(30, seed=7).entries, calendar.entries)
+
+    def test_invalid_seasons(self):
+        with self.assertRaises(ValueError):
+            plan_draft_calendar(0)
+
+    def test_no_calendar(self):
+        self.assertIsNone(load_draft_calendar())
+        plan_draft_calendar(5, seed=1)
+        clear_draft_calendar()
+        self.assertIsNone(load_draft_calendar())
+        self.assertFalse(self.storage.exists(DRAFT_CALENDAR_NAME))
+
+    def test_draft_follows_calendar_and_rolls_forward(self):
+        save_current_year(2026)
+        planned = [entry['year'] for entry in plan_draft_calendar(10, seed=3).entries]
+        for expected in planned[:5]:
+            self.assertEqual(perform_draft()['selected_year'], expected)
+        calendar = load_draft_calendar()
+        self.assertEqual([entry['sim_year'] for entry in calendar.entries], list(range(2031, 2041)))
+        self.assertEqual([entry['year'] for entry in calendar.entries[:5]], planned[5:])
+        self._assert_valid(calendar)
+
+    def test_state_change_repairs_only_affected_entries(self):
+        save_current_year(2026)
+        planned = plan_draft_calendar(10, seed=5).entries
+        # 手动让第 4 届的计划年份进入冷却：之前的条目保留，之后的条目重新检查
+        weights = load_draft_weights()
+        weights[planned[3]['year']] = {'available': 0, 'last_used_year': 2025}
+        save_draft_weights(weights)
+        calendar = load_draft_calendar()
+        self.assertEqual(calendar.entries[:3], planned[:3])
+        self.assertNotEqual(calendar.entries[3]['year'], planned[3]['year'])
+        self._assert_valid(calendar)
+
+    def test_reset_and_year_change_repair(self):
+        save_current_year(2026)
+        plan_draft_calendar(10, seed=9)
+        for _ in range(3):
+            perform_draft()
+        reset_weights()
+        self._assert_valid(load_draft_calendar())
+        save_current_year(2040)
+        calendar = load_draft_calendar()
+        self.assertEqual(calendar.entries[0]['sim_year'], 2040)
+        self._assert_valid(calendar)
+
+    def test_rule_change_repairs(self):
+        # 在冷却期 10 的规则下规划并选秀一届（状态版本一致），冷却期改为 20 后读取日程仍需修复
+        save_current_year(2026)
+        with mock.patch.multiple(core, LEAGUE=dataclasses.replace(core.LEAGUE, cooldown=10), COOL_DOWN_PERIOD=10):
+            plan_draft_calendar(60, seed=13)
+            perform_draft()
+            self.assertEqual(load_draft_calendar().rules['cooldown'], 10)
+        calendar = load_draft_calendar()
+        self.assertEqual(calendar.rules['cooldown'], COOL_DOWN_PERIOD)
+        self.assertEqual(len(calendar.entries), 60)
+        self._assert_valid(calendar)
+
+    def test_undo_restores_plan(self):
+        save_current_year(2026)
+        before = load_draft_calendar() or plan_draft_calendar(8, seed=11)
+        result = perform_draft()
+        self.assertEqual(result['selected_year'], before.entries[0]['year'])
+        undo_last_draft()
+        self.assertEqual(load_draft_calendar().entries, before.entries)
+
+    def test_auto_reset_entries(self):
+        save_current_year(2026)
+        weights = load_draft_weights()
+        for year, data in weights.items():
+            data['available'] = 0
+            data['last_used_year'] = 2020 if year <= 2026 - COOL_DOWN_PERIOD else None
+        save_draft_weights(weights)
+        calendar = plan_draft_calendar(5, seed=2)
+        self.assertTrue(calendar.entries[0]['auto_reset'])
+        self._assert_valid(calendar)
+        for entry in calendar.entries:
+            result = perform_draft()
+            self.assertEqual(result['selected_year'], entry['year'])
+            self.assertEqual(result['auto_reset'], entry['auto_reset'])
+
+
+class TestSpreadCalendar(IsolatedStorageTestCase):
+    """测试均匀分散的选秀日程策略"""
+
+    def test_spread_beats_random(self):
+        save_current_year(2026)
+        random_stats = draft_calendar_stats(plan_draft_calendar(200, seed=1, strategy=CALENDAR_RANDOM))
+        spread = plan_draft_calendar(200, seed=1, strategy=CALENDAR_SPREAD)
+        spread_stats = draft_calendar_stats(spread)
+        self.assertLess(spread_stats['max_gap'], random_stats['max_gap'])
+        self.assertEqual(spread_stats['auto_resets'], 0)
+        # 可选年份全部进入范围后轮流使用：任意连续"可选年份数"届内不重复
+        pool = len(core.LEAGUE.eligible_years(2300))
+        years = [entry['year'] for entry in spread.entries if entry['sim_year'] >= 2026 + 2 * pool]
+        for i in range(len(years) - pool):
+            self.assertEqual(len(set(years[i:i + pool])), pool)
+
+    def test_spread_prefers_longest_idle(self):
+        save_current_year(2026)
+        weights = load_draft_weights()
+        for year, data in weights.items():
+            if data['available'] == 1:
+                data['last_used_year'] = 2006 + (year % 3)
+        weights[1985] = {'available': 1, 'last_used_year': 1990}
+        save_draft_weights(weights)
+        self.assertEqual(plan_draft_calendar(1, seed=4, strategy=CALENDAR_SPREAD).entries[0]['year'], 1985)
+
+    def test_spread_minimizes_auto_resets(self):
+        # 可选年份少于冷却期：每次自动重置前用遍所有年份
+        save_current_year(2026)
+        weights = load_draft_weights()
+        for year, data in weights.items():
+            data['available'] = 0
+            data['last_used_year'] = 2020 if year <= 2026 - COOL_DOWN_PERIOD else None
+        save_draft_weights(weights)
+        calendar = plan_draft_calendar(12, seed=8, strategy=CALENDAR_SPREAD)
+        resets = [entry['sim_year'] for entry in calendar.entries if entry['auto_reset']]
+        self.assertEqual(resets, [2026])
+        self.assertEqual(len({entry['year'] for entry in calendar.entries}), 12)
+
+    def test_randomness_and_persistence(self):
+        save_current_year(2026)
+        pure = plan_draft_calendar(50, seed=6, strategy=CALENDAR_SPREAD)
+        blended = plan_draft_calendar(50, seed=6, strategy=CALENDAR_SPREAD, randomness=0.5)
+        self.assertNotEqual(pure.entries, blended.entries)
+        loaded = load_draft_calendar()
+        self.assertEqual((loaded.strategy, loaded.randomness), (CALENDAR_SPREAD, 0.5))
+        self.assertEqual(loaded.entries, blended.entries)
+        for entry in loaded.entries[:10]:
+            self.assertEqual(perform_draft()['selected_year'], entry['year'])
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            plan_draft_calendar(10, strategy="best")
+        with self.assertRaises(ValueError):
+            plan_draft_calendar(10, strategy=CALENDAR_SPREAD, randomness=1.5)
+
+
+class TestHistoryTimeline(IsolatedStorageTestCase):
+    """测试按届查询历史状态"""
+
+    @staticmethod
+    def _counts(ledger):
+        # 撤销后持久化的计数表里会留下 0
+        return ({team: n for team, n in ledger.teams.items() if n},
+                {pos: n for pos, n in ledger.positions.items() if n}, ledger.drafts)
+
+    def _snapshot(self):
+        return get_current_year(), load_draft_weights(), self._counts(load_loss_ledger())
+
+    def _assert_matches(self, snapshots):
+        timeline = load_history_timeline()
+        for sim_year, weights, counts in snapshots:
+            self.assertEqual(timeline.weights_as_of(sim_year), weights, sim_year)
+            self.assertEqual(self._counts(timeline.ledger_as_of(sim_year)), counts, sim_year)
+
+    def test_matches_replayed_state(self):
+        # 跨越多个检查点，中间有手动重置，每届开始时的状态都应与当时一致
+        save_current_year(2026)
+        snapshots = []
+        for season in range(150):
+            snapshots.append(self._snapshot())
+            if season in (40, 41, 97):
+                reset_weights()
+            perform_draft()
+        snapshots.append(self._snapshot())
+        self._assert_matches(snapshots)
+        timeline = load_history_timeline()
+        self.assertEqual(len(timeline), 150)
+        self.assertEqual(timeline.resets_before(2026 + 150), 3)
+        self.assertEqual(timeline.resets_before(2026 + 41), 1)
+        self.assertEqual(timeline.draft_at(2030)[0], load_draft_history()[4]['drafted_year'])
+        self.assertIsNone(timeline.draft_at(2025))
+
+    def test_auto_reset(self):
+        save_current_year(2026)
+        weights = load_draft_weights()
+        for year, data in weights.items():
+            data['available'] = 0
+            data['last_used_year'] = 2020 if year <= 2026 - COOL_DOWN_PERIOD else None
+        save_draft_weights(weights)
+        snapshots = [self._snapshot()]
+        self.assertTrue(perform_draft()['auto_reset'])
+        snapshots.append(self._snapshot())
+        perform_draft()
+        snapshots.append(self._snapshot())
+        # 第一届之前的冷却记录不在历史中，只比较之后的状态
+        self._assert_matches(snapshots[1:])
+        self.assertEqual(load_history_timeline().resets_before(2028), 1)
+        self.assertFalse(self.storage.exists(core.RESET_LOG_NAME))
+
+    def test_season_status_after_reset(self):
+        # 两届选秀之间手动重置：之后各届的状态与当时的权重表一致，而不是仍按重置前的使用记录冷却
+        save_current_year(2026)
+        first = perform_draft()['selected_year']
+        reset_weights()
+        second = perform_draft()['selected_year']
+        before = load_draft_weights()
+        third = perform_draft()['selected_year']
+        timeline = load_history_timeline()
+        self.assertEqual(timeline.season_status(first, 2026), YEAR_USED)
+        self.assertEqual(timeline.season_status(second, 2027), YEAR_USED)
+        self.assertEqual(timeline.season_status(third, 2028), YEAR_USED)
+        for year, data in before.items():
+            if year != third:
+                self.assertEqual(timeline.season_status(year, 2028) == YEAR_AVAILABLE, data['available'] == 1, year)
+        if first not in (second, third):
+            self.assertEqual(timeline.season_status(first, 2028), YEAR_AVAILABLE)
+
+    def test_no_undo_across_reset(self):
+        # 手动重置记下的位置不随撤销移动，撤销被拒绝，时间线与当前状态保持一致
+        save_current_year(2026)
+        perform_draft()
+        reset_weights()
+        self.assertFalse(can_undo())
+        self.assertIsNone(undo_last_draft())
+        self.assertEqual(len(load_draft_history()), 1)
+        for _ in range(3):
+            perform_draft()
+        self.assertTrue(can_undo())
+        current = get_current_year()
+        self.assertEqual(load_history_timeline().weights_as_of(current), load_draft_weights())
+
+    def test_undo_and_rewind(self):
+        save_current_year(2026)
+        for _ in range(5):
+            perform_draft()
+        undo_last_draft()
+        self.assertEqual(len(load_history_timeline()), 4)
+        # 年份改回过去后只索引新的时代
+        save_current_year(2026)
+        reset_weights()
+        snapshots = [self._snapshot()]
+        perform_draft()
+        snapshots.append(self._snapshot())
+        timeline = load_history_timeline()
+        self.assertEqual(len(timeline), 1)
+        self._assert_matches(snapshots)
+
+    def test_cached_until_history_changes(self):
+        save_current_year(2026)
+        perform_draft()
+        timeline = load_history_timeline()
+        self.assertIs(load_history_timeline(), timeline)
+        perform_draft()
+        self.assertIsNot(load_history_timeline(), timeline)
+        self.assertEqual(len(HistoryTimeline()), 0)
+        self.assertEqual(HistoryTimeline().ledger_as_of(2030).drafts, 0)
+
+
+class TestExport(TempDirStorageTestCase):
+    """测试选秀历史的流式导出"""
+
+    def setUp(self):
+        super().setUp()
+        self._language = i18n.get_language()
+        i18n.set_language("zh")
+
+    def tearDown(self):
+        i18n.set_language(self._language)
+        super().tearDown()
+
+    def _draft(self, seasons):
+        save_current_year(2026)
+        for _ in range(seasons):
+            perform_draft()
+        return load_draft_history()
+
+    def test_csv(self):
+        history = self._draft(3)
+        out = io.StringIO()
+        self.assertEqual(export.export_history(out, 'csv'), 3)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(rows[0], ["模拟年份", "选秀年份", "被废球员球队", "位置"])
+        teams, positions = i18n.t('teams'), i18n.t('positions')
+        for row, entry in zip(rows[1:], history):
+            players = i18n.sort_players(entry['players'])
+            self.assertEqual(row, [str(entry['sim_year']), str(entry['drafted_year']),
+                                   ", ".join(teams[team] for team, _ in players),
+                                   ", ".join(positions[pos] for _, pos in players)])
+
+    def test_jsonl_and_markdown(self):
+        history = self._draft(2)
+        out = io.StringIO()
+        i18n.set_language("en")
+        export.export_history(out, 'jsonl')
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r['drafted_year'] for r in records], [e['drafted_year'] for e in history])
+        self.assertEqual(sorted((p['team'], p['position']) for p in records[0]['players']),
+                         sorted(history[0]['players']))
+        self.assertEqual(records[0]['players'][0]['team_name'], i18n.t('teams')[records[0]['players'][0]['team']])
+
+        out = io.StringIO()
+        fake = [{'sim_year': 2026, 'drafted_year': 1990, 'players': [("A|B", "C")]}]
+        self.assertEqual(export.export_history(out, 'md', history=fake), 1)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "# Draft History")
+        self.assertEqual(lines[-1], "| 2026 | 1990 | A\\|B | Center |")
+
+    def _export_peak(self, seasons, sink):
+        with open(self.storage.path(DRAFT_HISTORY_NAME), 'w', encoding='utf-8') as f:
+            for i in range(seasons):
+                f.write(json.dumps({'sim_year': 2026 + i, 'drafted_year': 1980 + i % 27,
+                                    'players': [[team, "C"] for team in NBA_TEAMS[:NUM_PLAYERS_TO_LOSE]]}) + '\n')
+        tracemalloc.start()
+        try:
+            self.assertEqual(export.export_history(sink, 'jsonl', chunk_rows=100), seasons)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_streams_in_bounded_chunks(self):
+        # 每次写入不超过 chunk_rows 行，历史长 4 倍时内存峰值基本不变
+        class Sink:
+            def __init__(self):
+                self.writes = 0
+                self.largest = 0
+
+            def write(self, text):
+                self.writes += 1
+                self.largest = max(self.largest, text.count('\n'))
+
+        short_peak = self._export_peak(1000, Sink())
+        sink = Sink()
+        long_peak = self._export_peak(4000, sink)
+        self.assertEqual(sink.writes, 40)
+        self.assertEqual(sink.largest, 100)
+        self.assertLess(long_peak, short_peak * 1.5)
+
+    def test_export_to_path(self):
+        self._draft(2)
+        path = os.path.join(self.tmp_dir, "history.md")
+        self.assertEqual(export.format_for_path(path), 'md')
+        self.assertEqual(export.export_to_path(path), 2)
+        with open(path, encoding='utf-8') as f:
+            self.assertTrue(f.read().startswith("# 选秀历史"))
+        with self.assertRaises(ValueError):
+            export.HistoryExport('xlsx')
+
+    def test_iter_draft_history(self):
+        self.assertEqual(list(iter_draft_history()), [])
+        history = self._draft(3)
+        self.storage.append_text(DRAFT_HISTORY_NAME, "not json\n")
+        self.assertEqual(list(iter_draft_history()), history)
+
+
+class TestHookDispatcher(unittest.TestCase):
+    """测试钩子的异步分发、背压策略和统计"""
+
+    def _blocked(self, dispatcher):
+        """注册一个阻塞的钩子，让工作线程停在第一个事件上"""
+        started, release = threading.Event(), threading.Event()
+
+        def slow(payload):
+            started.set()
+            release.wait(5)
+
+        dispatcher.register(hooks.EVENT_DRAFT_COMPLETED, slow, name="slow")
+        self.addCleanup(dispatcher.close)
+        self.addCleanup(release.set)
+        dispatcher.emit(hooks.EVENT_DRAFT_COMPLETED, n=0)
+        self.assertTrue(started.wait(5))
+        return release
+
+    def test_delivers_in_worker_thread(self):
+        dispatcher = hooks.HookDispatcher()
+        self.addCleanup(dispatcher.close)
+        received = []
+        dispatcher.register(hooks.EVENT_WEIGHTS_RESET,
+                            lambda payload: received.append((payload, threading.current_thread())), name="record")
+        self.assertTrue(dispatcher.emit(hooks.EVENT_WEIGHTS_RESET, sim_year=2030))
+        self.assertTrue(dispatcher.flush(5))
+        payload, thread = received[0]
+        self.assertEqual((payload['event'], payload['sim_year']), (hooks.EVENT_WEIGHTS_RESET, 2030))
+        self.assertIsNot(thread, threading.current_thread())
+        stats = dispatcher.stats()['hooks']['weights_reset:record']
+        self.assertEqual((stats['calls'], stats['errors']), (1, 0))
+
+    def test_no_hooks_no_thread(self):
+        dispatcher = hooks.HookDispatcher()
+        self.assertTrue(dispatcher.emit(hooks.EVENT_YEAR_RESET, sim_year=2026))
+        self.assertIsNone(dispatcher._worker)
+        self.assertEqual(dispatcher.stats()['emitted'], 0)
+
+    def test_slow_hook_does_not_block_emit(self):
+        dispatcher = hooks.HookDispatcher(maxsize=10)
+        self._blocked(dispatcher)
+        start = time.perf_counter()
+        for n in range(1, 6):
+            dispatcher.emit(hooks.EVENT_DRAFT_COMPLETED, n=n)
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(dispatcher.stats()['queued'], 5)
+
+    def _received_after_overflow(self, policy):
+        dispatcher = hooks.HookDispatcher(maxsize=2, policy=policy, block_timeout=0.05)
+        release = self._blocked(dispatcher)
+        received = []
+        dispatcher.register(hooks.EVENT_DRAFT_COMPLETED, lambda payload: received.append(payload['n']), name="record")
+        results = [dispatcher.emit(hooks.EVENT_DRAFT_COMPLETED, n=n) for n in range(1, 5)]
+        release.set()
+        self.assertTrue(dispatcher.flush(5))
+        self.assertEqual(dispatcher.stats()['dropped'], 2)
+        return results, received
+
+    def test_drop_oldest(self):
+        results, received = self._received_after_overflow(hooks.POLICY_DROP_OLDEST)
+        self.assertEqual(results, [True] * 4)
+        self.assertEqual(received, [3, 4])
+
+    def test_drop_newest(self):
+        results, received = self._received_after_overflow(hooks.POLICY_DROP_NEWEST)
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(received, [1, 2])
+
+    def test_block_with_timeout(self):
+        start = time.perf_counter()
+        results, received = self._received_after_overflow(hooks.POLICY_BLOCK)
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(received, [1, 2])
+        self.assertLess(time.perf_counter() - start, 2)
+
+    def test_failing_hook_is_isolated(self):
+        dispatcher = hooks.HookDispatcher()
+        self.addCleanup(dispatcher.close)
+        received = []
+
+        def broken(payload):
+            raise RuntimeError("spreadsheet locked")
+
+        dispatcher.register(hooks.EVENT_YEAR_RESET, broken, name="broken")
+        dispatcher.register(hooks.EVENT_YEAR_RESET, received.append, name="ok")
+        dispatcher.emit(hooks.EVENT_YEAR_RESET, sim_year=2026)
+        dispatcher.flush(5)
+        self.assertEqual(len(received), 1)
+        stats = dispatcher.stats()['hooks']
+        self.assertEqual(stats['year_reset:broken']['errors'], 1)
+        self.assertEqual(stats['year_reset:broken']['last_error'], "RuntimeError: spreadsheet locked")
+        self.assertIn("year_reset:broken", hooks.format_stats(dispatcher.stats()))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            hooks.HookDispatcher(policy="drop_all")
+        with self.assertRaises(ValueError):
+            hooks.HookDispatcher().register("draft_started", print)
+
+
+class TestCoreHooks(IsolatedStorageTestCase):
+    """测试 core 在状态变化后发出的事件"""
+
+    def setUp(self):
+        super().setUp()
+        self.events = []
+        for event in hooks.EVENTS:
+            hooks.register(event, self.events.append, name="test")
+            self.addCleanup(hooks.unregister, event, self.events.append)
+
+    def _flushed(self):
+        self.assertTrue(hooks.flush(5))
+        return [(payload['event'], payload['sim_year']) for payload in self.events]
+
+    def test_draft_and_resets(self):
+        save_current_year(2026)
+        result = perform_draft()
+        reset_weights()
+        reset_to_year(2040)
+        self.assertEqual(self._flushed(), [(hooks.EVENT_DRAFT_COMPLETED, 2026), (hooks.EVENT_WEIGHTS_RESET, 2027),
+                                           (hooks.EVENT_WEIGHTS_RESET, 2040), (hooks.EVENT_YEAR_RESET, 2040)])
+        draft = self.events[0]
+        self.assertEqual(draft['selected_year'], result['selected_year'])
+        self.assertEqual(draft['players'], result['players'])
+        self.assertEqual((draft['auto_reset'], draft['new_sim_year']), (False, 2027))
+        self.assertEqual(get_current_year(), 2040)
+
+    def test_load_plugins(self):
+        plugin = types.ModuleType("draft_picker_test_plugin")
+        plugin.register_hooks = lambda dispatcher: dispatcher.register(
+            hooks.EVENT_YEAR_RESET, self.events.append, name="plugin")
+        sys.modules[plugin.__name__] = plugin
+        self.addCleanup(sys.modules.pop, plugin.__name__)
+        failures = hooks.load_plugins([plugin.__name__, "draft_picker_missing_plugin"])
+        self.assertEqual([name for name, _ in failures], ["draft_picker_missing_plugin"])
+        reset_to_year(2030)
+        self.assertEqual(self._flushed().count((hooks.EVENT_YEAR_RESET, 2030)), 2)
+
+
+class TestLeagueProfile(unittest.TestCase):
+    """测试联盟配置及其缓存的派生表"""
+
+    def test_default_profile_matches_core_constants(self):
+        self.assertEqual(core.LEAGUE.name, "NBA")
+        self.assertEqual(list(core.LEAGUE.teams), NBA_TEAMS)
+        self.assertEqual(list(core.LEAGUE.positions), POSITIONS)
+        self.assertEqual(core.LEAGUE.draft_years, range(EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR + 1))
+        self.assertEqual(core.LEAGUE.legendary_classes, LEGENDARY_DRAFT_CLASSES)
+
+    def test_derived_tables_are_cached(self):
+        profile = league.LeagueProfile("Test", ["A", "B", "C"], ["G", "F"], 2000, 2010, cooldown=5,
+                                       players_to_lose=2)
+        self.assertIs(profile.team_index, profile.team_index)
+        self.assertEqual(profile.team_index["C"], 2)
+        self.assertEqual(profile.position_set, frozenset({"G", "F"}))
+        self.assertIs(profile.eligible_years(2008), profile.eligible_years(2008))
+        self.assertEqual(sorted(profile.eligible_years(2008)), [2000, 2001, 2002, 2003, 2009, 2010])
+
+    def test_eligible_years_match_window_rule(self):
+        for sim_year in (2000, 2026, 2045, 2100):
+            expected = {year for year in core.LEAGUE.draft_years
+                        if year_status(year, sim_year, None) == YEAR_AVAILABLE}
+            self.assertEqual(core.LEAGUE.eligible_years(sim_year), expected)
+
+    def test_profile_is_frozen(self):
+        import dataclasses
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            league.NBA.cooldown = 5
+
+    def test_validation(self):
+        for kwargs in ({'teams': []}, {'teams': ["A", "A"]}, {'earliest_year': 2030},
+                       {'cooldown': 0}, {'players_to_lose': 4}, {'latest_year': "2025"}):
+            args = {'name': "Bad", 'teams': ["A", "B", "C"], 'positions': ["C"],
+                    'earliest_year': 2000, 'latest_year': 2025}
+            args.update(kwargs)
+            with self.assertRaises(ValueError):
+                league.LeagueProfile(**args)
+
+    def test_load_profiles_from_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "leagues.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"Classic": {"base": "NBA", "earliest_year": 1950},
+                       "Mini": {"teams": ["X", "Y"], "positions": ["G"], "earliest_year": 2010,
+                                "latest_year": 2020, "players_to_lose": 1,
+                                "names": {"zh": {"teams": {"X": "甲"}}}}}, f)
+        classic = league.get_profile("Classic", path)
+        self.assertEqual(classic.draft_years, range(1950, 2026))
+        self.assertEqual(classic.teams, league.NBA.teams)
+        mini = league.get_profile("Mini", path)
+        self.assertEqual(mini.display_names("teams", "zh"), {"X": "甲", "Y": "Y"})
+        self.assertEqual(mini.ids_by_display_name("teams", "zh")["甲"], "X")
+        self.assertIs(league.get_profile(None, path), league.NBA)
+        with self.assertRaises(ValueError):
+            league.get_profile("Unknown", path)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"Broken": {"base": "Nope"}}, f)
+        with self.assertRaises(ValueError):
+            league.load_profiles(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("{not json")
+        self.assertEqual(set(league.load_profiles(path)), set(league.BUILTIN_PROFILES))
+
+    def test_load_league_skips_broken_profiles(self):
+        # 启动时不因 leagues.json 出错而失败：跳过有问题的联盟，选中的联盟不可用时退回 NBA
+        path = os.path.join(tempfile.mkdtemp(), "leagues.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"bad": {"teams": []}, "Classic": {"base": "NBA", "earliest_year": 1950},
+                       "orphan": {"base": "bad"}, "typo": {"cooldwn": 5}}, f)
+        profile, problems = league.load_league("Classic", path)
+        self.assertEqual(profile.earliest_year, 1950)
+        self.assertEqual(len(problems), 3)
+        self.assertIn("'bad'", problems[0])
+        for name in ("bad", "Nope"):
+            profile, problems = league.load_league(name, path)
+            self.assertIs(profile, league.NBA)
+            self.assertIn(f"unknown league {name!r}; using NBA", problems[-1])
+        self.assertEqual(league.load_league(None, None), (league.NBA, []))
+
+    def test_import_with_broken_leagues_file(self):
+        import subprocess
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, True)
+        with open(os.path.join(data_dir, "leagues.json"), 'w', encoding='utf-8') as f:
+            json.dump({"bad": {"teams": []}}, f)
+        env = dict(os.environ, DRAFT_PICKER_DATA_DIR=data_dir, DRAFT_PICKER_LEAGUE="bad")
+        code = "import core; print(core.LEAGUE.name, len(core.LEAGUE_PROBLEMS))"
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ["NBA", "2"])
+
+    def test_display_names_cover_league(self):
+        from i18n import t
+        teams = t('teams')
+        self.assertEqual(set(teams), set(NBA_TEAMS))
+        self.assertIs(t('teams'), teams)
+        wnba = league.WNBA
+        self.assertEqual(wnba.display_names("positions", "en", {"G": "ignored"})["G"], "Guard")
+
+
+class TestCollation(unittest.TestCase):
+    """测试按显示名称排序（中文按拼音）"""
+
+    def setUp(self):
+        import i18n
+        self._language = i18n.get_language()
+
+    def tearDown(self):
+        import i18n
+        i18n.set_language(self._language)
+
+    def test_collation_key_orders_pinyin(self):
+        names = ["湖人", "公牛", "76人", "勇士", "凯尔特人", "快船", "开拓者"]
+        ordered = sorted(names, key=lambda name: league.collation_key(name, "zh"))
+        self.assertEqual(ordered, ["76人", "公牛", "湖人", "开拓者", "凯尔特人", "快船", "勇士"])
+        self.assertEqual(sorted(["bulls", "Celtics", "76ers"], key=lambda name: league.collation_key(name, "en")),
+                         ["76ers", "bulls", "Celtics"])
+
+    def test_pinyin_table_covers_builtin_names(self):
+        from i18n import TRANSLATIONS
+        tables = [TRANSLATIONS["zh"]["teams"], TRANSLATIONS["zh"]["positions"]]
+        tables += [league.WNBA.names["zh"][kind] for kind in league.NAME_KINDS]
+        for table in tables:
+            for name in table.values():
+                for ch in name:
+                    self.assertTrue(ch.isascii() or ch in league.PINYIN, f"{ch} ({name}) missing from PINYIN")
+
+    def test_sort_players_follows_language(self):
+        from i18n import set_language, sort_players, sort_ranks
+        players = [("Lakers", "PG"), ("Bulls", "C"), ("Warriors", "SF"), ("76ers", "PF")]
+        set_language("zh")
+        self.assertEqual([team for team, _ in sort_players(players)], ["76ers", "Bulls", "Lakers", "Warriors"])
+        self.assertIs(sort_ranks("teams"), sort_ranks("teams"))
+        set_language("en")
+        self.assertEqual([team for team, _ in sort_players(players)], ["76ers", "Bulls", "Lakers", "Warriors"])
+        self.assertEqual(sort_players([("Heat", "C"), ("Heat", "PG"), ("Nowhere", "C")])[-1], ("Nowhere", "C"))
+
+    def test_ranks_differ_between_languages(self):
+        from i18n import set_language, sort_ranks
+        set_language("zh")
+        zh = sort_ranks("teams")
+        set_language("en")
+        en = sort_ranks("teams")
+        # 热火 (re) 在拼音中排在 雷霆 (lei) 之后，英文 Heat 在 Thunder 之前
+        self.assertGreater(zh["Heat"], zh["Thunder"])
+        self.assertLess(en["Heat"], en["Thunder"])
+
+
+class TestDraftClassStore(unittest.TestCase):
+    """测试按年份索引的选秀名单存储"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "classes.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_round_trip_with_gaps(self):
+        draftclasses.write_store(self.path, {
+            2001: [(2, "Tyson Chandler", "C", "Bulls"), (1, "Kwame Brown", "C", "Wizards")],
+            2003: [(1, "勒布朗·詹姆斯", "SF", "Cavaliers", "St. Vincent-St. Mary (HS)")],
+        })
+        with draftclasses.DraftClassStore(self.path) as store:
+            self.assertEqual(store.years, range(2001, 2004))
+            self.assertEqual([p.player for p in store.draft_class(2001)], ["Kwame Brown", "Tyson Chandler"])
+            self.assertEqual(store.draft_class(2002), [])
+            self.assertEqual(store.draft_class(2003)[0].player, "勒布朗·詹姆斯")
+            self.assertEqual(store.draft_class(2003)[0].college, "St. Vincent-St. Mary (HS)")
+            self.assertEqual(store.draft_class(2001)[0].college, "")
+            self.assertEqual(store.draft_class(1999), [])
+            self.assertEqual(store.max_class_size(), 2)
+        self.assertFalse(draftclasses.first_picks_only(self.path))
+        draftclasses._stores.pop(self.path).close()
+        self.assertTrue(draftclasses.first_picks_only())
+
+    def test_reads_version_1_without_college(self):
+        # 第 1 版格式每个顺位只有球员、位置、球队三个字符串
+        block = struct.pack('<HH', 1, 1) + b''.join(bytes((len(v),)) + v for v in (b"Yao Ming", b"C", b"Rockets"))
+        with open(self.path, 'wb') as f:
+            f.write(struct.pack('<4sHHH', b'2KDC', 1, 2002, 1) + struct.pack('<II', 0, len(block)) + block)
+        with draftclasses.DraftClassStore(self.path) as store:
+            self.assertEqual(store.draft_class(2002), [draftclasses.DraftPick(1, "Yao Ming", "C", "Rockets")])
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"NOPE" + bytes(10))
+        with self.assertRaises(ValueError):
+            draftclasses.DraftClassStore(self.path)
+
+    def test_build_from_csv(self):
+        source = os.path.join(self.tmpdir, "classes.csv")
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write("year,pick,player,position,team,college\n1984,1,Hakeem Olajuwon,C,Rockets,Houston\n"
+                    "1984,3,Michael Jordan,SG,Bulls,North Carolina\n")
+        self.assertEqual(draftclasses.main(["build", source, "-o", self.path]), 0)
+        with draftclasses.DraftClassStore(self.path) as store:
+            picks = store.draft_class(1984)
+        self.assertEqual([(p.pick, p.player, p.college) for p in picks],
+                         [(1, "Hakeem Olajuwon", "Houston"), (3, "Michael Jordan", "North Carolina")])
+
+    def test_bundled_store_covers_league(self):
+        with draftclasses.DraftClassStore() as store:
+            for year in range(EARLIEST_DRAFT_YEAR, LATEST_HISTORICAL_DRAFT_YEAR + 1):
+                picks = store.draft_class(year)
+                self.assertTrue(picks, f"no draft class for {year}")
+                for pick in picks:
+                    self.assertIn(pick.team, NBA_TEAMS)
+                    self.assertIn(pick.position, POSITIONS)
+
+    def test_render(self):
+        from i18n import set_language, get_language
+        language = get_language()
+        try:
+            set_language("en")
+            # 内置数据每年只有状元：单独一行，并注明只收录了哪个顺位
+            self.assertEqual(draftclasses.render_draft_class(2003),
+                             "2003 Draft (pick #1 only): LeBron James (Cavaliers, Small Forward)")
+            self.assertEqual(draftclasses.render_draft_class(1900), "(no draft data for 1900)")
+        finally:
+            set_language(language)
+
+
+class TestDraftClassSearch(unittest.TestCase):
+    """测试选秀名单搜索索引"""
+
+    def setUp(self):
+        picks = [
+            (2003, draftclasses.DraftPick(1, "LeBron James", "SF", "Cavaliers"), ["骑士", "小前锋"]),
+            (2003, draftclasses.DraftPick(3, "Carmelo Anthony", "SF", "Nuggets"), ["掘金", "小前锋"]),
+            (2018, draftclasses.DraftPick(3, "Luka Dončić", "PG", "Hawks"), ["老鹰", "控球后卫"]),
+            (1984, draftclasses.DraftPick(1, "Hakeem Olajuwon", "C", "Rockets"), ["火箭", "中锋"]),
+        ]
+        self.index = draftclasses.SearchIndex(
+            [(year, pick, [pick.player, pick.team, pick.position] + names) for year, pick, names in picks])
+
+    def _players(self, query, **kwargs):
+        return [pick.player for _, pick in self.index.search(query, **kwargs)]
+
+    def test_substring_ordered_by_year(self):
+        self.assertEqual(self._players("anthony"), ["Carmelo Anthony"])
+        self.assertEqual(self._players("on"), [])           # 短查询只匹配词首
+        self.assertEqual(self._players("ron"), ["LeBron James"])
+        self.assertEqual(self._players("h"), ["Hakeem Olajuwon", "Luka Dončić"])
+
+    def test_accents_case_and_localized_names(self):
+        self.assertEqual(self._players("DONCIC"), ["Luka Dončić"])
+        self.assertEqual(self._players("前锋"), ["LeBron James", "Carmelo Anthony"])
+        self.assertEqual(self._players("锋"), ["Hakeem Olajuwon", "LeBron James", "Carmelo Anthony"])
+        self.assertEqual(self._players("   "), [])
+
+    def test_year_filter_and_limit(self):
+        self.assertEqual(self._players("sf", years={2003}, limit=1), ["LeBron James"])
+        self.assertEqual(self._players("sf", years={1984}), [])
+
+    def test_bundled_index_covers_league_years(self):
+        index = draftclasses.search_index()
+        self.assertIs(index, draftclasses.search_index())
+        results = index.search("wembanyama")
+        self.assertEqual([(year, pick.team) for year, pick in results], [(2023, "Spurs")])
+        self.assertTrue(all(EARLIEST_DRAFT_YEAR <= year <= LATEST_HISTORICAL_DRAFT_YEAR
+                            for year, _ in index.search("c")))
+        self.assertTrue(index.search("马刺"))
+        # 学校（或选秀前球队）也建了索引
+        self.assertEqual([pick.player for _, pick in index.search("wake forest")], ["Tim Duncan"])
+
+
+class TestReadCache(TempDirStorageTestCase):
+    """测试基于文件指纹的读缓存"""
+
+    def test_repeated_reads_hit_cache(self):
+        save_current_year(2026)
+        load_draft_weights()
+        before = core.get_read_cache_stats()
+        for _ in range(5):
+            self.assertEqual(get_current_year(), 2026)
+        after = core.get_read_cache_stats()
+        self.assertEqual(after['hits'] - before['hits'], 5)
+        self.assertEqual(after['misses'], before['misses'])
+
+    def test_own_write_invalidates(self):
+        save_current_year(2026)
+        self.assertEqual(get_current_year(), 2026)
+        save_current_year(2027)
+        self.assertEqual(get_current_year(), 2027)
+
+    def test_external_write_detected(self):
+        """其他进程修改文件后应重新读取"""
+        save_current_year(2026)
+        self.assertEqual(get_current_year(), 2026)
+        with open(self.storage.path(CURRENT_YEAR_NAME), 'w', encoding='utf-8') as f:
+            f.write('{"current_year": 2031}')
+        self.assertEqual(get_current_year(), 2031)
+
+    def test_history_cache_returns_fresh_list(self):
+        append_draft_history(2026, 1990, [("Lakers", "PG")])
+        first = load_draft_history()
+        first.clear()
+        self.assertEqual(len(load_draft_history()), 1)
+
+
+class TestStateVersion(IsolatedStorageTestCase):
+    """测试跨进程变更通知用的状态版本号"""
+
+    def test_starts_at_zero(self):
+        self.assertEqual(get_state_version(), 0)
+
+    def test_every_write_bumps(self):
+        save_current_year(2026)
+        v1 = get_state_version()
+        save_draft_weights(load_draft_weights())
+        v2 = get_state_version()
+        append_draft_history(2026, 1990, [("Lakers", "PG")])
+        v3 = get_state_version()
+        self.assertTrue(0 < v1 < v2 < v3)
+
+    def test_reads_do_not_bump(self):
+        save_current_year(2026)
+        version = get_state_version()
+        get_current_year()
+        load_draft_weights()
+        load_draft_history()
+        self.assertEqual(get_state_version(), version)
+
+    def test_draft_bumps(self):
+        save_current_year(2026)
+        version = get_state_version()
+        perform_draft()
+        self.assertGreater(get_state_version(), version)
+
+
+class TestProfiling(IsolatedStorageTestCase):
+    """测试性能埋点开关"""
+
+    def setUp(self):
+        super().setUp()
+        profiling.disable()
+        profiling.reset()
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+        super().tearDown()
+
+    def test_disabled_records_nothing(self):
+        save_current_year(2026)
+        get_current_year()
+        self.assertEqual(profiling.snapshot()['calls'], {})
+
+    def test_action_reports_calls_and_io(self):
+        import io
+        profiling.enable()
+        save_current_year(2026)
+        stream = io.StringIO()
+        with profiling.action('run_draft', stream=stream):
+            perform_draft()
+
+        report = stream.getvalue()
+        self.assertIn('[profile] run_draft', report)
+        self.assertIn('core.get_current_year', report)
+        self.assertIn('core.save_draft_weights', report)
+        self.assertIn('PseudoRandomPicker.shuffle', report)
+
+        stats = profiling.snapshot()
+        self.assertGreater(stats['io']['write'][0], 0)
+        self.assertGreater(stats['io']['write'][1], 0)
+
+    def test_nested_actions_fold(self):
+        import io
+        profiling.enable()
+        stream = io.StringIO()
+        with profiling.action('outer', stream=stream):
+            with profiling.action('inner', stream=stream):
+                get_current_year()
+        self.assertEqual(stream.getvalue().count('[profile]'), 1)
+
+
+class TestStorageBackends(unittest.TestCase):
+    """测试存储后端的基本语义一致"""
+
+    def _check_backend(self, storage):
+        with self.assertRaises(FileNotFoundError):
+            storage.read_text("missing.json")
+        with self.assertRaises(FileNotFoundError):
+            storage.fingerprint("missing.json")
+
+        storage.write_text("a.json", "one")
+        first = storage.fingerprint("a.json")
+        storage.append_text("a.json", "two")
+        self.assertEqual(storage.read_text("a.json"), "onetwo")
+        self.assertNotEqual(storage.fingerprint("a.json"), first)
+
+        storage.write_text("a.json", "three", atomic=True)
+        self.assertEqual(storage.read_text("a.json"), "three")
+
+        storage.write_text("b.jsonl", "1\n" + "x" * 10000 + "\n3\n\n")
+        self.assertEqual(storage.pop_last_line("b.jsonl"), "3")
+        self.assertEqual(storage.pop_last_line("b.jsonl"), "x" * 10000)
+        self.assertEqual(storage.read_text("b.jsonl"), "1\n")
+        self.assertEqual(storage.pop_last_line("b.jsonl"), "1")
+        self.assertIsNone(storage.pop_last_line("b.jsonl"))
+        with self.assertRaises(FileNotFoundError):
+            storage.pop_last_line("missing.jsonl")
+        with self.assertRaises(FileNotFoundError):
+            list(storage.iter_lines("missing.jsonl"))
+        storage.write_text("c.jsonl", "1\n2")
+        storage.append_text("c.jsonl", "2\n\n3\n")
+        storage.append_text("c.jsonl", "4")
+        self.assertEqual(list(storage.iter_lines("c.jsonl")), ["1", "22", "", "3", "4"])
+        self.assertEqual(storage.tail_lines("c.jsonl", 2), ["3", "4"])
+        self.assertEqual(storage.tail_lines("c.jsonl", 10), ["1", "22", "3", "4"])
+        storage.write_text("d.jsonl", "".join(f"{i} {'y' * 500}\r\n" for i in range(40)))
+        self.assertEqual(storage.tail_lines("d.jsonl", 12), [f"{i} {'y' * 500}" for i in range(28, 40)])
+        self.assertEqual(storage.tail_lines("d.jsonl", 0), [])
+        with self.assertRaises(FileNotFoundError):
+            storage.tail_lines("missing.jsonl", 1)
+        storage.delete("a.json")
+        self.assertFalse(storage.exists("a.json"))
+
+    def test_memory_storage(self):
+        self._check_backend(MemoryStorage())
+
+    def test_file_storage(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            self._check_backend(FileStorage(tmp_dir))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_set_storage_isolates_state(self):
+        first, second = MemoryStorage(), MemoryStorage()
+        previous = core.set_storage(first)
+        try:
+            save_current_year(2030)
+            core.set_storage(second)
+            self.assertEqual(get_current_year(), core.INITIAL_SIMULATION_YEAR)
+            core.set_storage(first)
+            self.assertEqual(get_current_year(), 2030)
+        finally:
+            core.set_storage(previous)
+
+
 class TestI18n(unittest.TestCase):
     """测试 i18n 模块"""
 
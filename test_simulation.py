@@ -0,0 +1,360 @@
+"""
+批量模拟相关测试
+运行: python -m pytest test_simulation.py -v
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+# 设置隔离的测试数据目录（必须在 import core 之前）
+os.environ['DRAFT_PICKER_DATA_DIR'] = os.environ.get('DRAFT_PICKER_DATA_DIR') or tempfile.mkdtemp()
+os.environ.pop('SIMULATION_START_YEAR', None)
+
+import core
+from core import year_status, YEAR_AVAILABLE, COOL_DOWN_PERIOD, NUM_PLAYERS_TO_LOSE, NBA_TEAMS, POSITIONS
+from simulation import (
+    LeagueState, simulate, run_logged_simulation, preview_branches, compare_branches, commit_branch,
+    format_branch_table, DRAFT_YEARS,
+)
+from storage import MemoryStorage
+import simcatalog
+import simcompare
+import simlog
+import stress_invariants
+
+os.environ.pop('SIMULATION_START_YEAR', None)
+
+
+class TestLeagueState(unittest.TestCase):
+    """测试内存引擎与 core 规则一致"""
+
+    def test_available_years_match_year_status(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            sim_year = rng.randint(1960, 2120)
+            last_used = {y: rng.randint(sim_year - 40, sim_year) for y in rng.sample(list(DRAFT_YEARS), 10)}
+            state = LeagueState(sim_year, last_used)
+            expected = [y for y in DRAFT_YEARS
+                        if year_status(y, sim_year, last_used.get(y)) == YEAR_AVAILABLE]
+            self.assertEqual(state.available_years(), expected)
+
+    def test_draft_advances_and_cools(self):
+        state = LeagueState(2026)
+        record = state.draft(random.Random(1))
+        self.assertEqual(record['sim_year'], 2026)
+        self.assertEqual(state.sim_year, 2027)
+        self.assertEqual(len(record['players']), NUM_PLAYERS_TO_LOSE)
+        self.assertFalse(state.is_available(record['selected_year']))
+
+    def test_auto_reset(self):
+        state = LeagueState(2026, {y: 2026 for y in DRAFT_YEARS})
+        self.assertEqual(state.available_years(), [])
+        record = state.draft(random.Random(1))
+        self.assertTrue(record['auto_reset'])
+        self.assertIsNotNone(record['selected_year'])
+
+    def test_weighted_selection_updates_incrementally(self):
+        state = LeagueState(2026, selection=core.SELECTION_WEIGHTED)
+        rng = random.Random(9)
+        for _ in range(300):
+            record = state.draft(rng)
+            self.assertIsNotNone(record['selected_year'])
+            expected = [core.year_weight(y, state.sim_year, state.last_used.get(y), core.SELECTION_WEIGHTED)
+                        for y in DRAFT_YEARS]
+            actual = [state._sampler.weight(i) for i in range(len(DRAFT_YEARS))]
+            self.assertEqual(actual, expected)
+
+    def test_weighted_selection_favors_legendary_classes(self):
+        state = LeagueState(2026, selection=core.SELECTION_WEIGHTED)
+        counts = {}
+        for record in simulate(4000, seed=1, state=state):
+            counts[record['selected_year']] = counts.get(record['selected_year'], 0) + 1
+        legendary = core.LEGENDARY_DRAFT_CLASSES[0]
+        self.assertGreater(counts[legendary], counts[legendary + 1])
+
+    def test_simulate_is_reproducible(self):
+        first = [r['selected_year'] for r in simulate(100, seed=42)]
+        second = [r['selected_year'] for r in simulate(100, seed=42)]
+        self.assertEqual(first, second)
+
+
+class TestStressInvariants(unittest.TestCase):
+    """测试不变量检查器本身"""
+
+    def test_memory_engine_passes(self):
+        self.assertIsNone(stress_invariants.run(300, 60, workers=1, engine_name='memory'))
+
+    def test_core_engine_passes_and_restores_storage(self):
+        storage = core.get_storage()
+        self.assertIsNone(stress_invariants.run(20, 40, workers=1, engine_name='core'))
+        self.assertIs(core.get_storage(), storage)
+
+    def test_detects_and_shrinks_cooldown_bug(self):
+        class BrokenState(LeagueState):
+            def available_years(self):
+                # 忽略冷却期，只检查20年窗口
+                return [y for y in DRAFT_YEARS if not self.sim_year - COOL_DOWN_PERIOD < y <= self.sim_year]
+
+        class BrokenEngine(stress_invariants.MemoryEngine):
+            def __init__(self):
+                self.state = BrokenState()
+
+        stress_invariants.ENGINES['broken'] = BrokenEngine
+        try:
+            failure = stress_invariants.run(50, 80, workers=1, engine_name='broken')
+        finally:
+            del stress_invariants.ENGINES['broken']
+
+        self.assertIsNotNone(failure)
+        self.assertIn('last used', failure['minimal_failure'][1])
+        self.assertLess(len(failure['minimal_ops']), len(failure['ops']))
+        # 同一组操作在正确的引擎上不违反规则
+        self.assertIsNone(stress_invariants.check_ops(failure['minimal_ops'], 'memory'))
+
+
+class TestBranches(unittest.TestCase):
+    """测试 what-if 分支"""
+
+    def setUp(self):
+        self._previous_storage = core.set_storage(MemoryStorage())
+        core.save_current_year(2026)
+
+    def tearDown(self):
+        core.set_storage(self._previous_storage)
+
+    def test_fork_shares_until_write(self):
+        state = LeagueState(2026, {1990: 2010})
+        branches = [state.fork() for _ in range(300)]
+        self.assertTrue(all(branch.last_used is state.last_used for branch in branches))
+
+        branches[0].draft(random.Random(1))
+        self.assertIsNot(branches[0].last_used, state.last_used)
+        self.assertEqual(state.last_used, {1990: 2010})
+        self.assertEqual(state.sim_year, 2026)
+        self.assertIs(branches[1].last_used, state.last_used)
+
+        state.reset()
+        self.assertEqual(branches[1].last_used, {1990: 2010})
+
+    def test_branch_matches_plain_simulation(self):
+        state = LeagueState(2026)
+        branch, = preview_branches(state, [42], 30)
+        self.assertEqual(branch.records(), list(simulate(30, seed=42, state=LeagueState(2026))))
+        self.assertEqual(state.last_used, {})
+
+    def test_nested_forks_share_prefix(self):
+        branch = LeagueState(2026).fork()
+        rng = random.Random(3)
+        for _ in range(5):
+            branch.draft(rng)
+        child = branch.fork()
+        child.draft(rng)
+        self.assertEqual(len(child.records()), 6)
+        self.assertEqual(child.records()[:5], branch.records())
+        self.assertIs(child._base, branch._base)
+
+    def test_compare_and_rule_change(self):
+        branches = preview_branches(LeagueState(2026), [1, 2, {'seed': 1, 'cooldown': 10}], 25)
+        rows = compare_branches(branches)
+        self.assertEqual([row['cooldown'] for row in rows], [COOL_DOWN_PERIOD, COOL_DOWN_PERIOD, 10])
+        self.assertEqual(len(rows[0]['selected_years']), 25)
+        self.assertNotEqual(rows[0]['selected_years'], rows[1]['selected_years'])
+        self.assertIn('#3', format_branch_table(rows))
+
+    def test_parallel_matches_serial(self):
+        serial = preview_branches(LeagueState(2026), range(4), 20)
+        parallel = preview_branches(LeagueState(2026), range(4), 20, workers=2)
+        self.assertEqual([b.records() for b in serial], [b.records() for b in parallel])
+
+    def test_commit_chosen_branch(self):
+        core.perform_draft(random.Random(0))
+        state = LeagueState.from_core()
+        branches = preview_branches(state, [5, 6, 7], 10)
+        chosen = branches[1]
+        commit_branch(chosen)
+
+        self.assertEqual(core.get_current_year(), 2037)
+        self.assertEqual(LeagueState.from_core().last_used, chosen.last_used)
+        history = core.load_draft_history()
+        self.assertEqual([e['drafted_year'] for e in history[1:]],
+                         [r['selected_year'] for r in chosen.records()])
+        # 提交的记录和普通选秀一样可以撤销
+        for _ in range(10):
+            self.assertIsNotNone(core.undo_last_draft())
+        self.assertEqual(LeagueState.from_core().last_used, state.last_used)
+
+        # 联盟已改变后，其他分支不能再提交
+        core.redo_draft()
+        with self.assertRaises(ValueError):
+            commit_branch(branches[0])
+
+
+class TestSimLog(unittest.TestCase):
+    """测试二进制模拟日志"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def _write(self, records, **kwargs):
+        path = os.path.join(self.tmp, 'run.2ksl')
+        with simlog.SimLogWriter(path, params={'seasons': len(records)}, seed=42, **kwargs) as writer:
+            for record in records:
+                writer.write(record)
+        return path
+
+    def test_round_trip(self):
+        records = list(simulate(300, seed=42))
+        path = self._write(records)
+        with simlog.SimLogReader(path) as reader:
+            self.assertEqual(len(reader), 300)
+            self.assertEqual(reader.seed, 42)
+            self.assertEqual(reader.params['seasons'], 300)
+            self.assertEqual(list(reader), records)
+        # 每条记录约十几个字节
+        self.assertEqual(reader._record.size, 6 + NUM_PLAYERS_TO_LOSE)
+
+    def test_compressed_round_trip(self):
+        records = list(simulate(1000, seed=7))
+        path = self._write(records, compress=True, block_records=128)
+        with simlog.SimLogReader(path) as reader:
+            self.assertTrue(reader.compressed)
+            self.assertEqual(list(reader), records)
+
+    def test_close_while_iterating(self):
+        # 跨过读取块的边界后中途停止，close() 仍应释放映射和文件
+        records = list(simulate(simlog.DEFAULT_BLOCK_RECORDS + 100, seed=5))
+        path = self._write(records)
+        reader = simlog.SimLogReader(path)
+        it = iter(reader)
+        partial = [next(it) for _ in range(simlog.DEFAULT_BLOCK_RECORDS + 1)]
+        self.assertEqual(partial, records[:len(partial)])
+        reader.close()
+        self.assertTrue(reader._file.closed)
+        with simlog.SimLogReader(path) as reader:
+            self.assertEqual(list(reader), records)
+
+    def test_empty_draft_and_seedless_log(self):
+        path = os.path.join(self.tmp, 'empty.2ksl')
+        with simlog.SimLogWriter(path) as writer:
+            writer.write({'sim_year': 2030, 'selected_year': None, 'players': [], 'auto_reset': True})
+        with simlog.SimLogReader(path) as reader:
+            self.assertIsNone(reader.seed)
+            record = next(iter(reader))
+        self.assertIsNone(record['selected_year'])
+        self.assertTrue(record['auto_reset'])
+        self.assertEqual(record['players'], [])
+
+    def test_rejects_short_player_list(self):
+        path = os.path.join(self.tmp, 'short.2ksl')
+        with simlog.SimLogWriter(path) as writer:
+            with self.assertRaises(ValueError):
+                writer.write({'sim_year': 2030, 'selected_year': 2000, 'players': [(NBA_TEAMS[0], POSITIONS[0])]})
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.tmp, 'not_a_log.2ksl')
+        with open(path, 'wb') as f:
+            f.write(b'x' * 64)
+        with self.assertRaises(ValueError):
+            simlog.SimLogReader(path)
+
+    def test_render_record(self):
+        record = next(simulate(1, seed=1))
+        text = simlog.render_record(record)
+        self.assertIn(str(record['selected_year']), text)
+        self.assertEqual(len(text.splitlines()), 2 + NUM_PLAYERS_TO_LOSE)
+
+    def test_run_logged_simulation(self):
+        log_file, summary_file = run_logged_simulation(50, seed=3, log_dir=self.tmp)
+        with simlog.SimLogReader(log_file) as reader:
+            self.assertEqual(list(reader), list(simulate(50, seed=3)))
+        with open(summary_file, encoding='utf-8') as f:
+            self.assertIn('3', f.read())
+
+
+class TestSimCompare(unittest.TestCase):
+    """测试两次模拟结果的流式比较"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def _log(self, name, seasons, seed, records=None):
+        path = os.path.join(self.tmp, name)
+        with simlog.SimLogWriter(path, seed=seed) as writer:
+            for record in records if records is not None else simulate(seasons, seed=seed):
+                writer.write(record)
+        return path
+
+    def test_chi_square_p_value(self):
+        # 已知值: df=1 时 χ²=3.841 对应 p≈0.05；df=10 时 χ²=18.307 对应 p≈0.05
+        self.assertAlmostEqual(simcompare._upper_regularized_gamma(0.5, 3.841 / 2), 0.05, places=3)
+        self.assertAlmostEqual(simcompare._upper_regularized_gamma(5, 18.307 / 2), 0.05, places=3)
+        self.assertAlmostEqual(simcompare._upper_regularized_gamma(5, 0.5), 0.999828, places=5)
+        statistic, df, p_value = simcompare.chi_square_homogeneity({'x': 50, 'y': 50}, {'x': 50, 'y': 50})
+        self.assertEqual((statistic, df, p_value), (0.0, 1, 1.0))
+
+    def test_identical_runs(self):
+        result = simcompare.compare_runs(self._log('a.2ksl', 200, 5), self._log('b.2ksl', 200, 5))
+        self.assertTrue(result['same_seed'])
+        self.assertIsNone(result['first_divergence'])
+        self.assertTrue(all(delta == 0 for *_, delta in result['year_deltas']))
+        self.assertEqual(result['chi_square']['years'][2], 1.0)
+
+    def test_first_divergence_with_same_seed(self):
+        records = list(simulate(100, seed=5))
+        records[60] = dict(records[60], selected_year=records[60]['selected_year'] - 1)
+        result = simcompare.compare_runs(self._log('a.2ksl', 100, 5), self._log('b.2ksl', 100, 5, records))
+        self.assertEqual(result['first_divergence']['index'], 60)
+
+    def test_different_seeds_report(self):
+        result = simcompare.compare_runs(self._log('a.2ksl', 500, 1), self._log('b.2ksl', 300, 2))
+        self.assertFalse(result['same_seed'])
+        self.assertEqual((result['a']['seasons'], result['b']['seasons']), (500, 300))
+        team_total = sum(count_a for _, count_a, _, _ in result['team_deltas'])
+        self.assertEqual(team_total, 500 * NUM_PLAYERS_TO_LOSE)
+        self.assertTrue(all(bucket >= COOL_DOWN_PERIOD for bucket in result['gaps'][0]))
+        text = simcompare.format_report(result)
+        self.assertIn('χ²', text)
+
+
+class TestSimCatalog(unittest.TestCase):
+    """测试模拟运行目录"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def test_run_is_catalogued(self):
+        log_file, summary_file = run_logged_simulation(30, seed=11, log_dir=self.tmp)
+        runs = simcatalog.list_runs(self.tmp)
+        self.assertEqual(len(runs), 1)
+        run = runs[0]
+        self.assertEqual((run['seasons'], run['seed'], run['log_file'], run['summary_file']),
+                         (30, 11, log_file, summary_file))
+        self.assertEqual(run['params']['seasons'], 30)
+        self.assertIsNotNone(run['top_year'])
+
+    def test_filter_and_sort(self):
+        for i, seasons in enumerate((10, 40, 25)):
+            simcatalog.record_run(self.tmp, f'2026010{i}_000000', seasons, f'run{i}.2ksl', {}, seed=i,
+                                  engine_version='1' if i else '0')
+        runs = simcatalog.list_runs(self.tmp, order_by='seasons', descending=False)
+        self.assertEqual([r['seasons'] for r in runs], [10, 25, 40])
+        self.assertEqual([r['seed'] for r in simcatalog.list_runs(self.tmp, min_seasons=20)], [2, 1])
+        self.assertEqual(len(simcatalog.list_runs(self.tmp, engine_version='1', limit=1)), 1)
+        with self.assertRaises(ValueError):
+            simcatalog.list_runs(self.tmp, order_by='params; DROP TABLE runs')
+
+    def test_rebuild_from_existing_logs(self):
+        path = os.path.join(self.tmp, 'simulation_20250101_000000.2ksl')
+        with simlog.SimLogWriter(path, params={'start_year': 2026}, seed=9) as writer:
+            for record in simulate(20, seed=9):
+                writer.write(record)
+        self.assertEqual(simcatalog.rebuild_catalog(self.tmp), 1)
+        self.assertEqual(simcatalog.rebuild_catalog(self.tmp), 0)
+        run = simcatalog.list_runs(self.tmp)[0]
+        self.assertEqual((run['timestamp'], run['seasons'], run['seed']), ('20250101_000000', 20, 9))
+
+
+if __name__ == '__main__':
+    unittest.main()